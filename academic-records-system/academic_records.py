@@ -1,18 +1,43 @@
+import argparse
 import json
+import math
 import os
+import re
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from itertools import starmap
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 FILE_NAME = os.path.join(BASE_DIR, "students_data.json")
+JOURNAL_SUFFIX = ".journal"
+BINARY_SUFFIX = ".bin"
+PAGE_SIZE = 25 # lines per page when listing in a terminal
+
+# The repository root holds the helpers shared by all projects
+sys.path.append(os.path.dirname(BASE_DIR))
+from common import autosave, cache, codec, instrument
+from common.batch import FORMATS, field, import_file, int_field
+from common.fileio import file_version, new_digest, snapshot_digest, write_file_atomic
+from common.render import non_negative_int, render
+
+from binary_snapshot import BinarySnapshot, is_binary_snapshot, write_binary_snapshot
+from grades import decode_grade, encode_grade, is_numeric_grade
 
 # The class Course
 class Course:
+    __slots__ = ("name", "units", "grade")
+
     def __init__(self, name, units, grade):
         self.name = name
         self.units = units
         self.grade = grade # float between 1.0 and 5.0
 
     def is_numeric_grade(self):
-        return isinstance(self.grade, float)
+        return is_numeric_grade(self.grade)
     
     def to_dict(self):
         # Convert course details to dictionary for JSON
@@ -25,75 +50,281 @@ class Course:
     @staticmethod
     def from_dict(data):
         # Create a Course object from a dictionary
-        return Course(data['name'], data['units'], data['grade'])
+        return Course(sys.intern(data['name']), data['units'], data['grade'])
+
+# Compact struct-of-arrays storage for the courses of one period.
+# Names are interned, units and grades live in typed arrays ("INC" is
+# stored as NaN, other grades as floats) and items are handed out as
+# CourseView objects that read and write through to the arrays.
+class CourseStore:
+    __slots__ = ("names", "units", "grades")
+
+    def __init__(self, courses=()):
+        self.names = []
+        self.units = array('H')
+        self.grades = array('d')
+        for course in courses:
+            self.append(course)
+
+    def append(self, course):
+        self.names.append(sys.intern(course.name))
+        self.units.append(course.units)
+        self.grades.append(CourseStore.encode_grade(course.grade))
+
+    def pop(self, index=-1):
+        # Remove a course and return it as a detached Course
+        course = self[index].detach()
+        del self.names[index]
+        del self.units[index]
+        del self.grades[index]
+        return course
+
+    def __len__(self):
+        return len(self.names)
+
+    def cache_state(self):
+        return self.names, self.units.tobytes(), self.grades.tobytes()
+
+    @staticmethod
+    def from_cache_state(state):
+        store = CourseStore()
+        names, units, grades = state
+        store.names = list(names)
+        store.units.frombytes(units)
+        store.grades.frombytes(grades)
+        return store
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.names)
+        if not 0 <= index < len(self.names):
+            raise IndexError("course index out of range")
+        return CourseView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.names)):
+            yield CourseView(self, index)
+
+    encode_grade = staticmethod(encode_grade)
+    decode_grade = staticmethod(decode_grade)
+
+# A lightweight Course-like view of one row of a CourseStore
+class CourseView:
+    __slots__ = ("store", "index")
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    @property
+    def name(self):
+        return self.store.names[self.index]
+
+    @name.setter
+    def name(self, value):
+        self.store.names[self.index] = sys.intern(value)
+
+    @property
+    def units(self):
+        return self.store.units[self.index]
+
+    @units.setter
+    def units(self, value):
+        self.store.units[self.index] = value
+
+    @property
+    def grade(self):
+        return CourseStore.decode_grade(self.store.grades[self.index])
+
+    @grade.setter
+    def grade(self, value):
+        self.store.grades[self.index] = CourseStore.encode_grade(value)
+
+    def is_numeric_grade(self):
+        return not math.isnan(self.store.grades[self.index])
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "units": self.units,
+            "grade": self.grade
+        }
+
+    def detach(self):
+        # Copy this row out into a standalone Course
+        return Course(self.name, self.units, self.grade)
+
+# Grade bands compiled once into a sorted list of upper bounds, so a grade's
+# description is one bisect instead of a chain of range checks. Bands are
+# (upper bound, description) in increasing order; a grade belongs to the
+# first band whose upper bound it does not exceed, so values between the
+# listed grades (1.3) fall into the next band up (Very Good). Every band,
+# special grade and the invalid label has a number, used by batch tools.
+class GradeScale:
+    def __init__(self, bands, lowest, special=None, invalid="Invalid grade"):
+        self.bounds = [float(upper) for upper, _ in bands]
+        if not self.bounds or self.bounds != sorted(self.bounds) or lowest > self.bounds[0]:
+            raise ValueError("Grade bands must be in increasing order, starting at or above the lowest grade")
+        self.lowest = float(lowest)
+        self.highest = self.bounds[-1]
+        special = special or {}
+        # Band numbers: the bands, then the special grades, then invalid
+        self.names = [name for _, name in bands] + list(special.values()) + [invalid]
+        self.special_bands = {grade: len(bands) + i for i, grade in enumerate(special)}
+        self.invalid_band = len(self.names) - 1
+
+    def band(self, grade):
+        if not is_numeric_grade(grade):
+            return self.special_bands.get(grade, self.invalid_band)
+        if not self.lowest <= grade <= self.highest:
+            return self.invalid_band
+        return bisect_left(self.bounds, grade)
+
+    def describe(self, grade):
+        return self.names[self.band(grade)]
+
+    def bands(self, grades):
+        # Band numbers of many grades in one pass
+        band = self.band
+        return [band(grade) for grade in grades]
+
+    @staticmethod
+    def load(filename):
+        # {"lowest": 1.0, "bands": [[1.25, "Excellent"], ...], "special": {"INC": "Incomplete"}}
+        with open(filename) as f:
+            data = json.load(f)
+        return GradeScale(data["bands"], data["lowest"], data.get("special"))
+
+GRADE_SCALE = GradeScale(
+    [(1.25, "Excellent"), (1.75, "Very Good"), (2.25, "Good"), (2.75, "Satisfactory"),
+     (3.0, "Passed"), (4.0, "Conditional"), (5.0, "Failed")],
+    lowest=1.0,
+    special={"INC": "Incomplete"},
+)
 
 # The class for Academic Period 
 class AcademicPeriod:
+    __slots__ = ("year_level", "semester", "courses", "owner",
+                 "_total_units", "_graded_units", "_weighted_total")
     max_units = 21
+    grade_scale = GRADE_SCALE
+    # Keep courses in a compact CourseStore instead of a list of Course objects
+    use_course_store = False
 
-    def __init__(self, year_level, semester):
+    def __init__(self, year_level, semester, owner=None):
         self.year_level = year_level
         self.semester = semester
-        self.courses = []
+        self.courses = CourseStore() if AcademicPeriod.use_course_store else []
+        self.owner = owner # Student whose running totals follow this period
+        # Running totals, kept in step with self.courses
+        self._total_units = 0
+        self._graded_units = 0
+        self._weighted_total = 0
     
+    def cache_state(self):
+        # Plain values for the startup cache (see common/cache.py), running totals included
+        if isinstance(self.courses, CourseStore):
+            courses = self.courses.cache_state()
+        else:
+            courses = [(course.name, course.units, course.grade) for course in self.courses]
+        return (self.year_level, self.semester, courses,
+                self._total_units, self._graded_units, self._weighted_total)
+
+    @staticmethod
+    def from_cache_state(state, owner):
+        # Rebuild a period from cache_state() without re-adding every course
+        period = AcademicPeriod.__new__(AcademicPeriod)
+        (period.year_level, period.semester, courses,
+         period._total_units, period._graded_units, period._weighted_total) = state
+        if isinstance(courses, list):
+            period.courses = list(starmap(Course, courses))
+        else:
+            period.courses = CourseStore.from_cache_state(courses)
+        period.owner = owner
+        return period
+
     def get_period_name(self):
         return f"Year {self.year_level} - Semester {self.semester}"
     
     def total_units(self):
-        return sum(course.units for course in self.courses)
+        return self._total_units
     
+    def has_room(self, units):
+        # Whether a course of this many units fits under max_units
+        return self._total_units + units <= AcademicPeriod.max_units
+
     def add_course(self, name, units, grade):
-        if self.total_units() + units > AcademicPeriod.max_units:
+        if not self.has_room(units):
             print(f"Cannot add course {name}. Exceeds maximum allowed units.")
             return
         
-        self.courses.append(Course(name, units, grade))
+        self._append_course(Course(name, units, grade))
         print(f"Course {name} added successfully.")
         return True
-    
-    def compute_gwa(self):
-        total_weighted = 0
-        total_units = 0
 
-        for course in self.courses:
-            if course.is_numeric_grade():
-                total_weighted += course.grade * course.units
-                total_units += course.units
+    def remove_course(self, index):
+        # Remove the course at a zero-based index and return it
+        course = self.courses.pop(index)
+        self._track(course, -1)
+        return course
 
-        if total_units == 0:
+    def edit_course(self, index, name=None, units=None, grade=None):
+        # Change fields of the course at a zero-based index
+        course = self.courses[index]
+        new_units = course.units if units is None else units
+        if self._total_units - course.units + new_units > AcademicPeriod.max_units:
+            print(f"Cannot update course {course.name}. Exceeds maximum allowed units.")
+            return
+        
+        self._track(course, -1)
+        if name is not None:
+            course.name = name
+        course.units = new_units
+        if grade is not None:
+            course.grade = grade
+        self._track(course, 1)
+        return True
+
+    def _append_course(self, course):
+        # Append without the unit limit check (loading and journal replay)
+        self.courses.append(course)
+        self._track(self.courses[-1], 1)
+
+    def _track(self, course, sign):
+        # Add (sign=1) or take back (sign=-1) a course's share of the running totals
+        units = sign * course.units
+        self._total_units += units
+        if course.is_numeric_grade():
+            weighted = units * course.grade
+            self._graded_units += units
+            self._weighted_total += weighted
+            if self.owner is not None:
+                self.owner._apply_delta(units, weighted)
+    
+    @instrument.timed("AcademicPeriod.compute_gwa")
+    def compute_gwa(self):
+        if self._graded_units == 0:
             return 0.0
         
-        return total_weighted / total_units
+        return self._weighted_total / self._graded_units
     
     def grade_description(self, grade):
-        if grade == "INC":
-            return "Incomplete"
-        if grade == 5.0:
-            return "Failed"
-        if grade == 4.0:
-            return "Conditional"
-        if 1.00 <= grade <= 1.25:
-            return "Excellent"
-        if 1.50 <= grade <= 1.75:
-            return "Very Good"
-        if 2.00 <= grade <= 2.25:
-            return "Good"
-        if 2.50 <= grade <= 2.75:
-            return "Satisfactory"
-        if grade == 3.0:
-            return "Passed"
-        return "Invalid grade"
+        return AcademicPeriod.grade_scale.describe(grade)
     
-    def show_courses(self):
+    def course_lines(self):
+        # Lines shown by show_courses, generated one at a time
         if not self.courses:
-            print(f"No courses enrolled in {self.get_period_name()}.")
+            yield f"No courses enrolled in {self.get_period_name()}."
             return
 
-        print(f"\n--- Enrolled Courses for {self.get_period_name()} ---")
+        yield f"\n--- Enrolled Courses for {self.get_period_name()} ---"
         for i, course in enumerate(self.courses, start=1):
-            print(f"{i}, {course.name}")
-            print(f"   Units: {course.units}")
-            print(f"   Grade: {course.grade} ({self.grade_description(course.grade)})")
+            yield f"{i}, {course.name}"
+            yield f"   Units: {course.units}"
+            yield f"   Grade: {course.grade} ({self.grade_description(course.grade)})"
+
+    def show_courses(self):
+        render(self.course_lines())
 
     def to_dict(self):
         # Convert academic period details to dictionary for JSON
@@ -107,23 +338,53 @@ class AcademicPeriod:
     def from_dict(data):
         # Create an AcademicPeriod from a dictionary
         period = AcademicPeriod(data['year_level'], data['semester'])
-        period.courses = [Course.from_dict(c) for c in data['courses']]
+        for c in data['courses']:
+            period._append_course(Course.from_dict(c))
         return period
 
 # The class Student
 class Student:
+    __slots__ = ("name", "id", "periods", "_graded_units", "_weighted_total")
+
     def __init__(self, name, id):
         self.name = name
         self.id = id
         self.periods = {}
+        # Running totals over every period, updated from period deltas
+        self._graded_units = 0
+        self._weighted_total = 0
+
+    def cache_state(self):
+        periods = [period.cache_state() for period in self.periods.values()]
+        return self.name, self.id, periods, self._graded_units, self._weighted_total
+
+    @staticmethod
+    def from_cache_state(state):
+        student = Student.__new__(Student)
+        student.name, student.id, periods, student._graded_units, student._weighted_total = state
+        student.periods = {}
+        for period_state in periods:
+            period = AcademicPeriod.from_cache_state(period_state, student)
+            student.periods[(period.year_level, period.semester)] = period
+        return student
 
     def get_or_create_period(self, year_level, semester):
         # Get existing or create new academic period
         key = (year_level, semester)
         if key not in self.periods:
-            self.periods[key] = AcademicPeriod(year_level, semester)
+            self.periods[key] = AcademicPeriod(year_level, semester, owner=self)
         return self.periods[key]
 
+    def add_period(self, period):
+        # Attach an already-built period and fold in its totals
+        period.owner = self
+        self.periods[(period.year_level, period.semester)] = period
+        self._apply_delta(period._graded_units, period._weighted_total)
+
+    def _apply_delta(self, graded_units, weighted):
+        self._graded_units += graded_units
+        self._weighted_total += weighted
+
     def get_period(self, year_level, semester):
         # Get existing academic period
         key = (year_level, semester)
@@ -145,49 +406,44 @@ class Student:
         return sorted_periods
     
     def compute_overall_gwa(self):
-        # Compute overall GWA across all periods
-        total_weighted = 0
-        total_units = 0
-
-        for period in self.periods.values():
-            for course in period.courses:
-                if course.is_numeric_grade():
-                    total_weighted += course.grade * course.units
-                    total_units += course.units
-
-        if total_units == 0:
+        # Overall GWA across all periods, from the running totals
+        if self._graded_units == 0:
             return 0.0
         
-        return total_weighted / total_units
+        return self._weighted_total / self._graded_units
     
-    def show_summary(self):
-        print(f"\n{'='*50}")
-        print(f"\n--- Student Summary for {self.name} ---")
-        print(f"\n{'='*50}")
-        print(f"Student Id: {self.id}")
-        print(f"Total Academic Periods: {len(self.periods)}")
+    def summary_lines(self):
+        # Lines shown by show_summary, generated one at a time
+        yield f"\n{'='*50}"
+        yield f"\n--- Student Summary for {self.name} ---"
+        yield f"\n{'='*50}"
+        yield f"Student Id: {self.id}"
+        yield f"Total Academic Periods: {len(self.periods)}"
 
         if not self.periods:
-            print("No academic periods registered yet.")
+            yield "No academic periods registered yet."
             return
 
         # Show each period's courses
         sorted_periods = sorted(self.periods.items(), key=lambda x: (x[0][0], x[0][1]))
         for key, period in sorted_periods:
-            print(f"\n{'-'*50}")
-            period.show_courses()
+            yield f"\n{'-'*50}"
+            yield from period.course_lines()
             gwa = period.compute_gwa()
             if gwa > 0:
-                print(f"Period GWA: {gwa:.2f}")
+                yield f"Period GWA: {gwa:.2f}"
         
         # Show overall GWA
-        print(f"\n{'='*50}")
+        yield f"\n{'='*50}"
         overall_gwa = self.compute_overall_gwa()
         if overall_gwa > 0:
-            print(f"OVERALL GWA: {overall_gwa:.2f}")
+            yield f"OVERALL GWA: {overall_gwa:.2f}"
         else:
-            print("OVERALL GWA: N/A")
-        print(f"{'='*50}")
+            yield "OVERALL GWA: N/A"
+        yield f"{'='*50}"
+
+    def show_summary(self):
+        render(self.summary_lines())
 
     def to_dict(self):
         """Convert student to dictionary for JSON serialization"""
@@ -198,20 +454,495 @@ class Student:
         }
     
     @staticmethod
+    @instrument.timed("Student.from_dict")
     def from_dict(data):
         """Create student from dictionary"""
         student = Student(data['name'], data['id'])
         for period_data in data['periods']:
-            period = AcademicPeriod.from_dict(period_data)
-            key = (period.year_level, period.semester)
-            student.periods[key] = period
+            student.add_period(AcademicPeriod.from_dict(period_data))
         return student
 
+# Lazily loaded students for large registries.
+# Only student IDs and the byte offsets of their records in the snapshot are
+# read up front; a Student is parsed the first time it is looked up and kept
+# in a small LRU cache. Journal entries are kept per student and replayed
+# when that student is hydrated. Students changed since the last save are
+# pinned so they are never evicted before their changes reach the journal.
+class LazyStudents(MutableMapping):
+    def __init__(self, filename, index, cache_size=1024):
+        self.filename = filename
+        self.index = index          # student id -> (offset, length, name, period count) in the snapshot
+        self.ids = dict.fromkeys(index) # every known id, in registry order
+        self.ops = {}               # student id -> journal entries to replay
+        self.cache = OrderedDict()  # hydrated students, least recently used first
+        self.dirty = {}             # changed students not yet saved
+        self.cache_size = cache_size
+        self.lock = threading.RLock() # a snapshot may be swapped in by the compaction thread
+
+    def __getitem__(self, student_id):
+        if student_id in self.dirty:
+            return self.dirty[student_id]
+        if student_id in self.cache:
+            self.cache.move_to_end(student_id)
+            return self.cache[student_id]
+        if student_id not in self.ids:
+            raise KeyError(student_id)
+
+        student = self.hydrate(student_id)
+        self.cache[student_id] = student
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return student
+
+    def __setitem__(self, student_id, student):
+        self.ids[student_id] = None
+        self.cache.pop(student_id, None)
+        self.dirty[student_id] = student
+
+    def __delitem__(self, student_id):
+        del self.ids[student_id]
+        self.index.pop(student_id, None)
+        self.ops.pop(student_id, None)
+        self.cache.pop(student_id, None)
+        self.dirty.pop(student_id, None)
+
+    def __contains__(self, student_id):
+        return student_id in self.ids
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def read_record(self, student_id, f=None):
+        # Raw JSON bytes of one student in the snapshot, through f if it is open
+        offset, length = self.index[student_id][:2]
+        if f is None:
+            with open(self.filename, 'rb') as f:
+                f.seek(offset)
+                return f.read(length)
+        f.seek(offset)
+        return f.read(length)
+
+    def in_snapshot(self, student_id):
+        return student_id in self.index
+
+    def index_summary(self, student_id):
+        return self.index[student_id][2:]
+
+    def summary(self, student_id):
+        # (name, period count) of one student for listings. A student this
+        # session has not changed or loaded is answered from the index, so
+        # listing does not read or parse any records.
+        student = self.dirty.get(student_id)
+        if student is None:
+            student = self.cache.get(student_id)
+        if student is None:
+            with self.lock:
+                if student_id not in self.ops and self.in_snapshot(student_id):
+                    return self.index_summary(student_id)
+            student = self[student_id]
+        return student.name, len(student.periods)
+
+    def read_student(self, student_id):
+        # Parse one student's snapshot record
+        return Student.from_dict(codec.loads(self.read_record(student_id), codec.STUDENT))
+
+    def hydrate(self, student_id):
+        # Build a student from its snapshot record plus its journal entries
+        students = {}
+        with self.lock:
+            if self.in_snapshot(student_id):
+                students[student_id] = self.read_student(student_id)
+            for entry in self.ops.get(student_id, ()):
+                apply_journal_entry(students, entry)
+        return students.get(student_id)
+
+    def add_op(self, entry):
+        # Remember a journal entry for replay when its student is hydrated
+        self.ops.setdefault(entry["id"], []).append(entry)
+        if entry["op"] == "add_student":
+            self.ids[entry["id"]] = None
+
+    def record(self, entry):
+        # A change made in this session: keep it for replay and pin the student
+        student = self[entry["id"]]
+        self.add_op(entry)
+        self.cache.pop(entry["id"], None)
+        self.dirty[entry["id"]] = student
+
+    def mark_saved(self):
+        # Changes are on disk; dirty students may be evicted again
+        for student_id, student in self.dirty.items():
+            self.cache[student_id] = student
+        self.dirty = {}
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def encoded_record(self, student_id, f=None):
+        # Record bytes of one student (None if unknown); an untouched record is copied verbatim
+        if student_id in self.index and student_id not in self.ops:
+            return self.read_record(student_id, f)
+        student = self.dirty.get(student_id) or self.cache.get(student_id) or self.hydrate(student_id)
+        if student is not None:
+            return codec.dumps(student.to_dict())
+
+    def encoded_items(self):
+        # (id, record bytes) for every student
+        with open(self.filename, 'rb') as f:
+            for student_id in self.ids:
+                record = self.encoded_record(student_id, f)
+                if record is not None:
+                    yield student_id, record
+
+    def op_marks(self):
+        # How many replay entries each student has now, to tell later ones apart in reset()
+        return {student_id: len(entries) for student_id, entries in self.ops.items()}
+
+    def trim_ops(self, op_marks):
+        # Keep only the entries recorded after op_marks was taken
+        self.ops = {
+            student_id: entries[op_marks.get(student_id, 0):]
+            for student_id, entries in self.ops.items()
+            if len(entries) > op_marks.get(student_id, 0)
+        }
+
+    def reset(self, new_name, index, op_marks):
+        # Rename a freshly written snapshot into place and point at it. It holds
+        # the entries counted in op_marks; later ones are still replayed. Both
+        # happen under the lock, so hydrate() never reads the new file with the
+        # old offsets.
+        with self.lock:
+            os.replace(new_name, self.filename)
+            self.index = index
+            self.trim_ops(op_marks)
+
+    @staticmethod
+    def scan(filename):
+        # Index a one-student-per-line snapshot without parsing any records.
+        # Returns (index, digest), or None if the file uses another layout.
+        index = {}
+        digest = new_digest()
+        offset = 0
+        with open(filename, 'rb') as f:
+            for line in f:
+                digest.update(line)
+                body = line.rstrip(b"\r\n")
+                if body.startswith(b'"'):
+                    if body.endswith(b","):
+                        body = body[:-1]
+                    key_end = body.find(b'": ')
+                    if key_end < 0:
+                        return None
+                    record = body[key_end + 3:]
+                    index[int(body[1:key_end])] = (offset + key_end + 3, len(record), *record_summary(record))
+                elif body.strip() not in (b"{", b"}", b"{}", b""):
+                    # Indented (older) layout
+                    return None
+                offset += len(line)
+        return index, digest.hexdigest()
+
+
+# Students of a binary snapshot (see binary_snapshot.py), read through mmap.
+# Works like LazyStudents, but even the id index stays on disk, so opening
+# costs the same for any registry size and a lookup only reads the pages
+# holding that student.
+class BinaryStudents(LazyStudents):
+    def __init__(self, snapshot, cache_size=1024):
+        self.filename = snapshot.filename
+        self.index = snapshot
+        self.ids = SnapshotIds(snapshot)
+        self.ops = {}
+        self.cache = OrderedDict()
+        self.dirty = {}
+        self.cache_size = cache_size
+        self.lock = threading.RLock()
+
+    def __delitem__(self, student_id):
+        # The snapshot is read-only; the id set remembers the removal
+        del self.ids[student_id]
+        self.ops.pop(student_id, None)
+        self.cache.pop(student_id, None)
+        self.dirty.pop(student_id, None)
+
+    def in_snapshot(self, student_id):
+        return student_id not in self.ids.removed and student_id in self.index
+
+    def index_summary(self, student_id):
+        return self.index.summary(student_id)
+
+    def read_student(self, student_id):
+        return Student.from_dict(self.index.read(student_id))
+
+    def record_of(self, student_id):
+        # Record dict of one student (None if unknown); an untouched one is read without building objects
+        if student_id not in self.ops and self.in_snapshot(student_id):
+            return self.index.read(student_id)
+        student = self.dirty.get(student_id) or self.cache.get(student_id) or self.hydrate(student_id)
+        if student is not None:
+            return student.to_dict()
+
+    def records(self):
+        # (id, record dict) for every student
+        for student_id in self.ids:
+            record = self.record_of(student_id)
+            if record is not None:
+                yield student_id, record
+
+    def encoded_items(self):
+        return ((student_id, codec.dumps(record)) for student_id, record in self.records())
+
+    def reset(self, new_name, index, op_marks):
+        # Swap in a freshly written snapshot, as LazyStudents.reset does (index is
+        # unused: the snapshot holds its own). The old map is left to the garbage
+        # collector: another thread may still be reading it.
+        with self.lock:
+            os.replace(new_name, self.filename)
+            snapshot = BinarySnapshot(self.filename)
+            self.index = snapshot
+            self.ids = self.ids.rebase(snapshot)
+            self.trim_ops(op_marks)
+
+# The ordered id set of BinaryStudents: the snapshot's ids, which stay on
+# disk, plus students added since and minus removed ones
+class SnapshotIds(MutableMapping):
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.added = {}
+        self.removed = set()
+
+    def __getitem__(self, student_id):
+        if student_id not in self:
+            raise KeyError(student_id)
+        return None
+
+    def __setitem__(self, student_id, value):
+        if student_id not in self:
+            self.added[student_id] = None
+
+    def __delitem__(self, student_id):
+        if student_id in self.added:
+            del self.added[student_id]
+        elif student_id in self:
+            self.removed.add(student_id)
+        else:
+            raise KeyError(student_id)
+
+    def __contains__(self, student_id):
+        return student_id in self.added or (student_id not in self.removed and student_id in self.snapshot)
+
+    def __iter__(self):
+        for student_id in self.snapshot:
+            if student_id not in self.removed:
+                yield student_id
+        yield from self.added
+
+    def __len__(self):
+        return len(self.snapshot) - len(self.removed) + len(self.added)
+
+    def copy(self):
+        ids = SnapshotIds(self.snapshot)
+        ids.added = dict(self.added)
+        ids.removed = set(self.removed)
+        return ids
+
+    def rebase(self, snapshot):
+        # The same id set on top of a newer snapshot
+        ids = SnapshotIds(snapshot)
+        ids.added = {student_id: None for student_id in self.added if student_id not in snapshot}
+        ids.removed = {student_id for student_id in self.removed if student_id in snapshot}
+        return ids
+
+
+def journal_name(filename):
+    # students_data.json -> students_data.journal; a binary snapshot keeps its
+    # own journal (students_data.bin.journal) so both files can sit side by side
+    stem, extension = os.path.splitext(filename)
+    return (filename if extension == BINARY_SUFFIX else stem) + JOURNAL_SUFFIX
+
+
+# A snapshot being written while students keep changing (copy-on-write).
+# Taking one is cheap: the list of ids and the number of journal entries the
+# snapshot will hold. The first change to a student after that stores the
+# student's record as it was (see StudentSystem.before_change), so the writer
+# thread streams exactly the registry as it stood, one student at a time,
+# while the menu goes on.
+class Compaction:
+    def __init__(self, ids, entries, op_marks):
+        self.ids = ids              # student ids in registry order
+        self.entries = entries      # journal entries the snapshot holds
+        self.op_marks = op_marks    # lazy modes: replay entries per student it holds
+        self.frozen = {}            # student id -> record from before its first change
+        self.thread = None
+
+
+# Secondary indexes, so finding students by name, by a course they took or by
+# grade standing does not walk every student, period and course. Names are
+# indexed by word; courses and standings (the grade scale bands listed in
+# status_bands) point at periods, as (student id, year level, semester) keys.
+# StudentSystem builds the index on first use and keeps it up to date from
+# the journal entries it records, which every change goes through.
+class StudentIndex:
+    status_bands = ("Failed", "Conditional", "Incomplete", "Invalid grade")
+    sort_keys = ("id", "name", "gwa")
+
+    def __init__(self):
+        self.by_word = {}       # casefolded name word -> {student id: None}
+        self.by_course = {}     # casefolded course name -> {period key: number of courses}
+        self.by_status = {}     # band name -> {period key: number of courses}
+        self.period_terms = {}  # period key -> (course terms, status terms) it was indexed under
+
+    @staticmethod
+    def build(students):
+        index = StudentIndex()
+        for student_id, student in students.items():
+            index.add_student(student_id, student.name)
+            for period in student.periods.values():
+                index.index_period(student_id, period)
+        return index
+
+    def add_student(self, student_id, name):
+        for word in name.casefold().split():
+            self.by_word.setdefault(word, {})[student_id] = None
+
+    def index_period(self, student_id, period):
+        # (Re)index the courses of one period
+        key = (student_id, period.year_level, period.semester)
+        key = self.unindex_period(key)
+        scale = AcademicPeriod.grade_scale
+        course_terms = []
+        status_terms = []
+        for course in period.courses:
+            course_terms.append(course.name.casefold())
+            status = scale.describe(course.grade)
+            if status in self.status_bands:
+                status_terms.append(status)
+        for table, terms in ((self.by_course, course_terms), (self.by_status, status_terms)):
+            for term in terms:
+                postings = table.setdefault(term, {})
+                postings[key] = postings.get(key, 0) + 1
+        self.period_terms[key] = (course_terms, status_terms)
+
+    def unindex_period(self, key):
+        # Drop a period's postings; returns the key tuple already in use, so postings share it
+        for existing in self.period_terms.keys() & {key}:
+            key = existing
+        course_terms, status_terms = self.period_terms.pop(key, ((), ()))
+        for table, terms in ((self.by_course, course_terms), (self.by_status, status_terms)):
+            for term in terms:
+                postings = table[term]
+                postings[key] -= 1
+                if not postings[key]:
+                    del postings[key]
+                    if not postings:
+                        del table[term]
+        return key
+
+    def update(self, students, entry):
+        # Follow one journal entry that has just been applied to students
+        if entry["op"] == "add_student":
+            self.add_student(entry["id"], entry["name"])
+            return
+        student = students.get(entry["id"])
+        period = student.get_period(entry["year_level"], entry["semester"]) if student else None
+        if period is not None:
+            self.index_period(entry["id"], period)
+
+    def name_matches(self, name):
+        # Ids of students whose name has every word of name
+        words = name.casefold().split()
+        if not words:
+            return {}
+        postings = sorted((self.by_word.get(word, {}) for word in words), key=len)
+        return {student_id: None for student_id in postings[0] if all(student_id in p for p in postings[1:])}
+
+    def period_matches(self, course=None, status=None, year_level=None, semester=None):
+        # Period keys matching every given filter
+        candidates = []
+        if course is not None:
+            candidates.append(self.by_course.get(course.casefold(), {}))
+        if status is not None:
+            candidates.append(self.by_status.get(self.status_name(status), {}))
+        if not candidates:
+            candidates.append(self.period_terms)
+        candidates.sort(key=len)
+        return [
+            key for key in candidates[0]
+            if all(key in other for other in candidates[1:])
+            and (year_level is None or key[1] == year_level)
+            and (semester is None or key[2] == semester)
+        ]
+
+    def same_course(self, students, key, course, status):
+        # Whether the period has a course with both this name and this status,
+        # not just one course with the name and another with the status
+        period = students[key[0]].get_period(key[1], key[2])
+        course, status = course.casefold(), self.status_name(status)
+        scale = AcademicPeriod.grade_scale
+        return any(c.name.casefold() == course and scale.describe(c.grade) == status for c in period.courses)
+
+    def status_name(self, status):
+        # Band name for a status given in any case ("failed" -> "Failed")
+        for band in self.status_bands:
+            if band.casefold() == status.casefold():
+                return band
+        raise ValueError(f"Unknown status {status!r}. Use one of: {', '.join(self.status_bands)}.")
+
+    def query(self, students, name=None, course=None, status=None, year_level=None, semester=None,
+              sort="id", limit=None):
+        # Students matching every given filter, as (student, period keys) pairs.
+        # Period keys list where the course, status and term filters matched
+        # (empty when only name is given); course and status together must match
+        # the same course. sort is "id", "name" or "gwa" (best first, students
+        # without a GWA last).
+        if sort not in self.sort_keys:
+            raise ValueError(f"Unknown sort {sort!r}. Use one of: {', '.join(self.sort_keys)}.")
+        periods = {}
+        if course is not None or status is not None or year_level is not None or semester is not None:
+            for key in self.period_matches(course, status, year_level, semester):
+                if course is not None and status is not None and not self.same_course(students, key, course, status):
+                    continue
+                periods.setdefault(key[0], []).append(key[1:])
+            student_ids = periods
+            if name is not None:
+                named = self.name_matches(name)
+                student_ids = [student_id for student_id in periods if student_id in named]
+        elif name is not None:
+            student_ids = self.name_matches(name)
+        else:
+            student_ids = students
+
+        results = [(students[student_id], sorted(periods.get(student_id, ()))) for student_id in student_ids]
+        if sort == "id":
+            results.sort(key=lambda result: result[0].id)
+        elif sort == "name":
+            results.sort(key=lambda result: (result[0].name.casefold(), result[0].id))
+        else:
+            results.sort(key=lambda result: (result[0].compute_overall_gwa() or math.inf, result[0].id))
+        return results if limit is None else results[:limit]
+
+
 # This is the student management system
 class StudentSystem:
-    def __init__(self, filename=FILE_NAME):
+    # Number of journal entries after which the journal is folded into the snapshot
+    compact_threshold = 1000
+
+    def __init__(self, filename=FILE_NAME, journal_filename=None, lazy=False, cache_size=1024):
         self.students = {}
         self.filename = filename
+        self.journal_filename = journal_filename or journal_name(filename)
+        self.lazy = lazy
+        self.cache_size = cache_size
+        self.pending = []           # journal entries not yet written to disk
+        self.journal_entries = 0    # journal entries on disk and not yet in the snapshot
+        self.journal_folded = 0     # leading journal entries the snapshot already holds
+        self.snapshot_digest = None # digest of the snapshot the journal applies to
+        self.lock = threading.Lock() # guards pending against the autosave and compaction threads
+        self.journal_lock = threading.RLock() # one journal writer at a time
+        self.compaction = None      # Compaction being written, if any
+        self.autosave = None        # AutoSaver told about every change, if any
+        self.search_index = None    # StudentIndex, built on the first query
         self.load_data()
     
     def add_student(self, name, student_id):
@@ -222,52 +953,520 @@ class StudentSystem:
         
         student = Student(name, student_id)
         self.students[student_id] = student
+        self.record({"op": "add_student", "id": student_id, "name": name})
         print(f"Student {name} added successfully.")
         return student
     
     def get_student(self, student_id):
         # Get student by ID
         return self.students.get(student_id)
+
+    def get_or_create_period(self, student_id, year_level, semester):
+        # Get existing or create new academic period, journaling new periods
+        student = self.get_student(student_id)
+        if student is None:
+            print(f"No student found with ID {student_id}.")
+            return
+        
+        period = student.get_period(year_level, semester)
+        if period is None:
+            self.before_change(student_id)
+            period = student.get_or_create_period(year_level, semester)
+            self.record({
+                "op": "add_period",
+                "id": student_id,
+                "year_level": year_level,
+                "semester": semester
+            })
+        return period
+
+    def add_course(self, student_id, year_level, semester, name, units, grade):
+        # Add a course to a student's period and journal it
+        period = self.get_or_create_period(student_id, year_level, semester)
+        if period is None:
+            return
+        
+        self.before_change(student_id)
+        if not period.add_course(name, units, grade):
+            return
+        
+        self.record({
+            "op": "add_course",
+            "id": student_id,
+            "year_level": year_level,
+            "semester": semester,
+            "name": name,
+            "units": units,
+            "grade": grade
+        })
+        return True
+
+    def remove_course(self, student_id, year_level, semester, index):
+        # Remove a course by zero-based index and journal it
+        student = self.get_student(student_id)
+        period = student.get_period(year_level, semester) if student else None
+        if period is None or not 0 <= index < len(period.courses):
+            print("Course not found.")
+            return
+        
+        self.before_change(student_id)
+        course = period.remove_course(index)
+        self.record({
+            "op": "remove_course",
+            "id": student_id,
+            "year_level": year_level,
+            "semester": semester,
+            "index": index
+        })
+        return course
+
+    def edit_course(self, student_id, year_level, semester, index, name=None, units=None, grade=None):
+        # Edit a course by zero-based index and journal its new values
+        student = self.get_student(student_id)
+        period = student.get_period(year_level, semester) if student else None
+        if period is None or not 0 <= index < len(period.courses):
+            print("Course not found.")
+            return
+        
+        self.before_change(student_id)
+        if not period.edit_course(index, name, units, grade):
+            return
+        
+        course = period.courses[index]
+        self.record({
+            "op": "edit_course",
+            "id": student_id,
+            "year_level": year_level,
+            "semester": semester,
+            "index": index,
+            "name": course.name,
+            "units": course.units,
+            "grade": course.grade
+        })
+        return True
+
+    def before_change(self, student_id):
+        # Call before changing a student: while a snapshot is being written,
+        # keep the record it should get. Changes must come from one thread.
+        compaction = self.compaction
+        if compaction is None or student_id in compaction.frozen:
+            return
+        with self.lock:
+            if self.compaction is compaction and student_id in self.students:
+                compaction.frozen[student_id] = self.snapshot_record(student_id)
+
+    def record(self, entry):
+        # Queue a change for the journal
+        self.record_all([entry])
+
+    def record_all(self, entries):
+        # Queue several changes for the journal in one go
+        with self.lock:
+            self.pending.extend(entries)
+            if self.is_lazy():
+                for entry in entries:
+                    self.students.record(entry)
+        if self.search_index is not None:
+            for entry in entries:
+                self.search_index.update(self.students, entry)
+        if self.autosave is not None:
+            self.autosave.changed(len(entries))
+
+    def is_lazy(self):
+        return isinstance(self.students, LazyStudents)
+
+    def is_binary(self):
+        return isinstance(self.students, BinaryStudents)
     
-    def list_students(self):
-        # List all students
+    def query(self, **filters):
+        # Students by name, course, status, year_level and semester through the
+        # secondary indexes; see StudentIndex.query for the filters and sorting
+        if self.search_index is None:
+            self.search_index = StudentIndex.build(self.students)
+        return self.search_index.query(self.students, **filters)
+
+    def student_lines(self):
+        # One line per student, generated as the registry is walked. Lazy
+        # registries list untouched students from their index, unloaded.
+        if self.is_lazy():
+            for student_id in self.students:
+                name, period_count = self.students.summary(student_id)
+                yield f"ID: {student_id} | Name: {name} | Periods: {period_count}"
+            return
+        for student_id, student in self.students.items():
+            period_count = len(student.periods)
+            yield f"ID: {student_id} | Name: {student.name} | Periods: {period_count}"
+
+    def list_students(self, offset=0, limit=None, page_size=None):
+        # List all students, or a window of them
         if not self.students:
             print("No students registered yet.")
             return
 
         print("\n--- All Students ---")
-        for student_id, student in self.students.items():
-            period_count = len(student.periods)
-            print(f"ID: {student_id} | Name: {student.name} | Periods: {period_count}")
+        render(self.student_lines(), offset, limit, page_size)
 
+    @instrument.timed("StudentSystem.save_data")
     def save_data(self):
-        # Save all students data to JSON file 
-        data = {
-            student_id: student.to_dict() 
-            for student_id, student in self.students.items()
-        } 
+        # Append pending changes to the journal. Once it grows too long it is
+        # folded into a new snapshot by a background thread.
         try:
-            with open(self.filename, 'w') as f:
-                json.dump(data, f, indent=4)
+            self.flush_journal()
+            if self.journal_entries >= self.compact_threshold:
+                self.compact(background=True)
+            if self.is_lazy():
+                self.students.mark_saved()
             print("Data saved successfully.")
         except Exception as e:
             print(f"Error saving data: {e}")
+
+    def flush_journal(self):
+        # Append pending changes to the journal; safe to call from the autosave thread
+        with self.journal_lock:
+            with self.lock:
+                entries, self.pending = self.pending, []
+            if not entries:
+                return
+            try:
+                self.append_journal(entries)
+            except Exception:
+                # Keep them for the next try, ahead of anything queued since
+                with self.lock:
+                    self.pending[:0] = entries
+                raise
+
+    def append_journal(self, entries):
+        # Append entries as JSON lines; a new journal starts with a header naming its snapshot
+        with self.journal_lock:
+            new_journal = not os.path.exists(self.journal_filename)
+            with open(self.journal_filename, 'ab') as f:
+                if new_journal:
+                    f.write((json.dumps({"snapshot": self.snapshot_digest}) + "\n").encode())
+                data = b"".join(codec.dumps(entry) + b"\n" for entry in entries)
+                f.write(data)
+                instrument.count("students bytes written", len(data))
+                f.flush()
+                os.fsync(f.fileno())
+            self.journal_entries += len(entries)
+
+    def encoded_students(self):
+        # (id, record bytes) for every student, in registry order
+        if self.is_lazy():
+            return self.students.encoded_items()
+        return ((student_id, codec.dumps(student.to_dict()))
+                for student_id, student in self.students.items())
+
+    def student_records(self):
+        # (id, record dict) for every student, in registry order
+        if self.is_binary():
+            return self.students.records()
+        return ((student_id, student.to_dict()) for student_id, student in self.students.items())
+
+    def compact(self, background=False):
+        # Fold the journal into a full snapshot (one student per line, or binary).
+        # In the background, changes may go on meanwhile from the calling thread.
+        if self.compaction is not None:
+            if background:
+                return
+            self.wait_for_compaction()
+
+        with self.journal_lock:
+            # Everything up to now goes to the journal first, so the snapshot
+            # holds exactly its first `entries` entries
+            self.flush_journal()
+            with self.lock:
+                if self.is_binary():
+                    ids, op_marks = self.students.ids.copy(), self.students.op_marks()
+                elif self.is_lazy():
+                    ids, op_marks = list(self.students.ids), self.students.op_marks()
+                else:
+                    ids, op_marks = list(self.students), None
+                compaction = self.compaction = Compaction(ids, self.journal_entries, op_marks)
+
+        if not background:
+            self.write_compaction(compaction)
+            return
+        # Not a daemon: exiting waits for the snapshot to be finished
+        compaction.thread = threading.Thread(target=self.run_compaction, args=(compaction,), name="compaction")
+        compaction.thread.start()
+
+    def run_compaction(self, compaction):
+        try:
+            self.write_compaction(compaction)
+        except Exception as e:
+            print(f"Error saving data: {e}")
+
+    def wait_for_compaction(self):
+        compaction = self.compaction
+        if compaction is not None and compaction.thread is not None:
+            compaction.thread.join()
+
+    @instrument.timed("StudentSystem.compact")
+    def write_compaction(self, compaction):
+        # Stream the snapshot to a new file, then swap it in under a journal
+        # that keeps the entries written since (see finish_compaction)
+        new_name = self.filename + ".new"
+        try:
+            if self.is_binary():
+                digest = write_binary_snapshot(new_name, self.compaction_items(compaction))
+                index = None
+            else:
+                # Lazy records are copied from the current snapshot through one open file
+                f = open(self.filename, 'rb') if self.is_lazy() and os.path.exists(self.filename) else None
+                try:
+                    digest, index = write_snapshot(new_name, self.compaction_items(compaction, f))
+                finally:
+                    if f is not None:
+                        f.close()
+            self.finish_compaction(compaction, new_name, digest, index)
+        except Exception:
+            with self.lock:
+                self.compaction = None
+            if os.path.exists(new_name):
+                os.remove(new_name)
+            raise
+        instrument.count("students bytes written", instrument.file_size(self.filename))
+
+    def compaction_items(self, compaction, f=None):
+        # (id, record) of every student as it was when the compaction started
+        for student_id in compaction.ids:
+            with self.lock:
+                record = compaction.frozen.pop(student_id, None)
+                if record is None:
+                    record = self.snapshot_record(student_id, f)
+            if record is not None:
+                yield student_id, record
+
+    def snapshot_record(self, student_id, f=None):
+        # One student as the snapshot stores it: a dict for binary snapshots, JSON bytes otherwise
+        if self.is_binary():
+            return self.students.record_of(student_id)
+        if self.is_lazy():
+            return self.students.encoded_record(student_id, f)
+        student = self.students.get(student_id)
+        if student is not None:
+            return codec.dumps(student.to_dict())
+
+    def finish_compaction(self, compaction, new_name, digest, index):
+        # The journal is swapped first. Its header names the new snapshot, how
+        # many of its entries that snapshot holds, and the previous snapshot,
+        # so either snapshot replays the right entries if a crash lands between
+        # the two renames. Entries appended meanwhile are carried over. Once
+        # the snapshot is in place, the entries it holds are dropped.
+        with self.journal_lock:
+            entries = self.read_journal_entries()
+            header = {"snapshot": digest, "previous": self.snapshot_digest, "folded": compaction.entries}
+            write_file_atomic(self.journal_filename, (json.dumps(header) + "\n").encode() + b"".join(entries))
+            with self.lock:
+                if self.is_lazy():
+                    self.students.reset(new_name, index, compaction.op_marks)
+                else:
+                    os.replace(new_name, self.filename)
+                self.snapshot_digest = digest
+                self.journal_folded = compaction.entries
+                self.journal_entries -= compaction.entries
+                self.compaction = None
+            header = {"snapshot": digest}
+            write_file_atomic(self.journal_filename,
+                              (json.dumps(header) + "\n").encode() + b"".join(entries[compaction.entries:]))
+            with self.lock:
+                self.journal_folded = 0
+
+    def read_journal_entries(self):
+        # Lines of the journal entries not in the current snapshot
+        if not os.path.exists(self.journal_filename):
+            return []
+        with open(self.journal_filename, 'rb') as f:
+            f.readline()
+            lines = [line for line in f.read().splitlines(keepends=True) if is_entry(line)]
+        return lines[self.journal_folded:]
+
+    def convert(self, filename):
+        # Write the whole registry, journal included, to another snapshot file:
+        # binary if its name ends in .bin, the JSON layout otherwise
+        if filename.endswith(BINARY_SUFFIX):
+            digest = write_binary_snapshot(filename, self.student_records())
+        else:
+            digest, _ = write_snapshot(filename, self.encoded_students())
+        # The new file starts with an empty journal, so nothing stale is replayed on top of it
+        header = json.dumps({"snapshot": digest}) + "\n"
+        write_file_atomic(journal_name(filename), header.encode())
+        print(f"Wrote {len(self.students)} student(s) to {filename}")
     
+    @instrument.timed("StudentSystem.load_data")
     def load_data(self):
-        # Load students data from JSON file
-        if not os.path.exists(self.filename):
-            return
-        
+        # Load the JSON snapshot, then replay the journal written on top of it
         try:
-            with open(self.filename, 'r') as f:
-                data = json.load(f)
+            if is_binary_snapshot(self.filename):
+                # Binary snapshots are always read on demand; only the header is read here
+                snapshot = BinarySnapshot(self.filename)
+                self.snapshot_digest = snapshot.digest
+                self.students = BinaryStudents(snapshot, self.cache_size)
+            elif os.path.exists(self.filename):
+                scanned = LazyStudents.scan(self.filename) if self.lazy else None
+                instrument.count("students bytes read", instrument.file_size(self.filename))
+                if scanned is not None:
+                    index, self.snapshot_digest = scanned
+                    self.students = LazyStudents(self.filename, index, self.cache_size)
+                else:
+                    self.load_snapshot()
+            elif self.lazy:
+                self.students = LazyStudents(self.filename, {}, self.cache_size)
 
-            self.students = {int(student_id): Student.from_dict(student_data) for student_id, student_data in data.items()}
-            print(f"Loaded {len(self.students)} student(s) from {self.filename}")
+            self.replay_journal()
+            if instrument.ENABLED and not self.is_lazy():
+                instrument.count("students loaded", len(self.students))
+                instrument.count("periods loaded", sum(len(s.periods) for s in self.students.values()))
+                instrument.count("courses loaded", sum(len(p.courses) for s in self.students.values() for p in s.periods.values()))
+            if self.students:
+                print(f"Loaded {len(self.students)} student(s) from {self.filename}")
         except Exception as e:
             print(f"Error loading data: {e}")
             self.students = {}
 
+    def load_snapshot(self):
+        # Parse the JSON snapshot, or rebuild the students from its startup cache
+        layout = f"students 2 {'store' if AcademicPeriod.use_course_store else 'list'}"
+        with open(self.filename, 'rb') as f:
+            cached = cache.load(self.filename, layout, f)
+            if cached is not None:
+                states, self.snapshot_digest = cached
+                with cache.gc_paused():
+                    self.students = {state[1]: Student.from_cache_state(state) for state in states}
+                return
+            stamp = file_version(f)
+            f.seek(0)
+            content = f.read()
+        self.snapshot_digest = snapshot_digest(content)
+        data = codec.loads(content, codec.STUDENTS)
+        with cache.gc_paused():
+            self.students = {int(student_id): Student.from_dict(student_data) for student_id, student_data in data.items()}
+        # Before the journal is replayed: the cache holds what the snapshot holds
+        states = [student.cache_state() for student in self.students.values()]
+        cache.save(self.filename, layout, states, stamp, self.snapshot_digest)
+
+    def replay_journal(self):
+        # Apply journal entries; a journal left over from an older snapshot is ignored
+        if not os.path.exists(self.journal_filename):
+            return
+        
+        # Split the bytes on b"\n" only, as read_journal_entries does: decoded
+        # text would also split on U+2028 and other line breaks inside names
+        with open(self.journal_filename, 'rb') as f:
+            lines = f.read().split(b"\n")
+        instrument.count("students bytes read", instrument.file_size(self.journal_filename))
+        if not lines[0]:
+            return
+        
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            return
+        if not isinstance(header, dict):
+            return
+        if header.get("snapshot") == self.snapshot_digest:
+            self.journal_folded = header.get("folded", 0)
+        elif "previous" in header and header["previous"] == self.snapshot_digest:
+            # The compaction that wrote this journal stopped before renaming its snapshot
+            self.journal_folded = 0
+        else:
+            return
+        
+        # The folded lines were written whole by finish_compaction, so they are
+        # skipped by count without decoding them
+        for line in lines[1 + self.journal_folded:]:
+            try:
+                entry = codec.loads(line)
+            except ValueError:
+                # A torn final line from an interrupted append
+                continue
+            self.apply_entry(entry)
+            self.journal_entries += 1
+
+    def apply_entry(self, entry):
+        # Apply one journal entry without validation or output
+        if self.is_lazy():
+            self.students.add_op(entry)
+        else:
+            apply_journal_entry(self.students, entry)
+
+
+def apply_journal_entry(students, entry):
+    # Apply one journal entry to a dict of students
+    op = entry["op"]
+    if op == "add_student":
+        if entry["id"] not in students:
+            students[entry["id"]] = Student(entry["name"], entry["id"])
+        return
+    
+    student = students.get(entry["id"])
+    if student is None:
+        return
+    period = student.get_or_create_period(entry["year_level"], entry["semester"])
+    if op == "add_course":
+        period._append_course(Course(entry["name"], entry["units"], entry["grade"]))
+    elif op == "remove_course":
+        period.remove_course(entry["index"])
+    elif op == "edit_course":
+        course = period.courses[entry["index"]]
+        period._track(course, -1)
+        course.name, course.units, course.grade = entry["name"], entry["units"], entry["grade"]
+        period._track(course, 1)
+
+def is_entry(line):
+    # Whether a journal line holds a whole entry (not one torn by a crash)
+    try:
+        codec.loads(line)
+    except ValueError:
+        return False
+    return True
+
+# Start of a record that begins with the student's name (as a JSON string)
+NAME_KEY = re.compile(rb'\{\s*"name"\s*:\s*("(?:[^"\\]|\\.)*")')
+
+def record_summary(record):
+    # (name, period count) of one student's JSON record without building the
+    # student. Records written here start with the name, and inside a JSON
+    # string every quote is escaped, so '"year_level":' only matches the key
+    # of a period. Records laid out otherwise are parsed.
+    start = NAME_KEY.match(record)
+    if start is None:
+        data = codec.loads(record)
+        return data["name"], len(data["periods"])
+    name = start.group(1)
+    # Most names have no escapes and need no JSON decoding
+    name = json.loads(name) if b"\\" in name else name[1:-1].decode()
+    return name, record.count(b'"year_level":')
+
+def write_snapshot(filename, items):
+    # Stream (id, record bytes) pairs into a JSON object with one student per line.
+    # Returns the snapshot digest and the id -> (offset, length, name, period count)
+    # index of the new file (see LazyStudents).
+    temp_name = filename + ".tmp"
+    digest = new_digest()
+    index = {}
+    offset = 0
+    with open(temp_name, 'wb') as f:
+        def write(chunk):
+            nonlocal offset
+            f.write(chunk)
+            digest.update(chunk)
+            offset += len(chunk)
+
+        write(b"{")
+        separator = b"\n"
+        for student_id, record in items:
+            key = separator + json.dumps(str(student_id)).encode() + b": "
+            index[student_id] = (offset + len(key), len(record), *record_summary(record))
+            write(key)
+            write(record)
+            separator = b",\n"
+        write(b"\n}\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_name, filename)
+    return digest.hexdigest(), index
+
 
 def print_menu():
     print("\n--- Student Grade System ---")
@@ -306,6 +1505,89 @@ def get_valid_int(prompt, min_val=None, max_val=None):
         except ValueError:
             print("Please enter a valid number.")
 
+def parse_grade(value):
+    # A grade within the grade scale (1.0 to 5.0), or "INC"; raises ValueError with the menu's messages
+    if not isinstance(value, (str, int, float)):
+        raise ValueError("Invalid grade input. Use numeric value or 'INC'.")
+    try:
+        grade = float(value)
+    except ValueError:
+        if str(value).strip().upper() == "INC":
+            return "INC"
+        raise ValueError("Invalid grade input. Use numeric value or 'INC'.")
+    scale = AcademicPeriod.grade_scale
+    if not scale.lowest <= grade <= scale.highest:
+        raise ValueError(f"Grade must be between {scale.lowest} and {scale.highest}")
+    return grade
+
+class CourseImport:
+    # Batch import rows, validated one at a time with the menu's rules.
+    # Consecutive rows of one student share a single student lookup, and
+    # their journal entries are queued together when the next student
+    # starts, or on finish().
+    # Columns: student_id, name (needed for new students), year_level, semester, course, units, grade
+    def __init__(self, system):
+        self.system = system
+        self.student_id = None
+        self.student = None
+        self.entries = []
+
+    def add_row(self, row):
+        student_id = int_field(row, "student_id", min_val=1)
+        year_level = int_field(row, "year_level", min_val=1, max_val=4)
+        semester = int_field(row, "semester", min_val=1, max_val=2)
+        course_name = field(row, "course")
+        units = int_field(row, "units", min_val=1)
+        grade = parse_grade(field(row, "grade"))
+
+        if student_id != self.student_id:
+            self.finish()
+            self.student_id = student_id
+            self.student = self.system.get_student(student_id)
+            if self.student is not None:
+                self.system.before_change(student_id)
+
+        # Everything is checked before anything changes, so a rejected row leaves
+        # no new student or period behind
+        student = self.student
+        name = field(row, "name") if student is None else None
+        period = student.get_period(year_level, semester) if student is not None else None
+        fits = period.has_room(units) if period is not None else units <= AcademicPeriod.max_units
+        if not fits:
+            raise ValueError(f"Cannot add course {course_name}. Exceeds maximum allowed units.")
+
+        if student is None:
+            student = self.student = Student(name, student_id)
+            self.system.students[student_id] = student
+            self.entries.append({"op": "add_student", "id": student_id, "name": name})
+
+        if period is None:
+            period = student.get_or_create_period(year_level, semester)
+            self.entries.append({"op": "add_period", "id": student_id, "year_level": year_level, "semester": semester})
+
+        period._append_course(Course(course_name, units, grade))
+        self.entries.append({
+            "op": "add_course",
+            "id": student_id,
+            "year_level": year_level,
+            "semester": semester,
+            "name": course_name,
+            "units": units,
+            "grade": grade
+        })
+
+    def finish(self):
+        # Queue the current student's entries for the journal
+        if self.entries:
+            self.system.record_all(self.entries)
+            self.entries = []
+
+def import_course_row(system, row):
+    # Validate one row and queue it for the journal (one server request)
+    importer = CourseImport(system)
+    importer.add_row(row)
+    importer.finish()
+
 def create_new_student(system):
     # Add a new student in the system
     print("\n--- Add New Student ---")
@@ -314,17 +1596,17 @@ def create_new_student(system):
 
     return system.add_student(name, student_id)
 
-def select_period(student):
+def select_period(system, student):
     # Select or create an academic period for the student
     print("\n--- Select Academic Period ---")
     year_level = get_valid_int("Enter year level (1-4): ", min_val=1, max_val=4)
     semester = get_valid_int("Enter semester (1-2): ", min_val=1, max_val=2)
 
-    period = student.get_or_create_period(year_level, semester)
+    period = system.get_or_create_period(student.id, year_level, semester)
     print(f"Selected period: {period.get_period_name()}")
     return period
 
-def manage_period(student, period):
+def manage_period(system, student, period):
     # Manage a specific academic period
     while True:
         print_period_menu(student, period)
@@ -335,17 +1617,11 @@ def manage_period(student, period):
             units = get_valid_int("Enter course units: ", min_val=1)
             grade_input = input("Enter course grade (numeric or 'INC'): ")
             try:
-                grade = float(grade_input)
-                if grade < 1.0 or grade > 5.0:
-                    print("Grade must be between 1.0 and 5.0")
-                    continue
-            except ValueError:
-                if grade_input.upper() == "INC":
-                    grade = "INC"
-                else:
-                    print("Invalid grade input. Use numeric value or 'INC'.")
-                    continue
-            period.add_course(course_name, units, grade)
+                grade = parse_grade(grade_input)
+            except ValueError as e:
+                print(e)
+                continue
+            system.add_course(student.id, period.year_level, period.semester, course_name, units, grade)
         
         elif choice == '2':
             period.show_courses()
@@ -370,8 +1646,8 @@ def manage_student(student, system):
         choice = input("Choose an option: ")
 
         if choice == '1':
-            period = select_period(student)
-            manage_period(student, period)
+            period = select_period(system, student)
+            manage_period(system, student, period)
         
         elif choice == '2':
             student.list_periods()
@@ -385,8 +1661,117 @@ def manage_student(student, system):
         else:
             print("Invalid choice. Please try again.")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Student Grade System")
+    parser.add_argument("--file", default=FILE_NAME, help="students data file")
+    parser.add_argument("--lazy", action="store_true",
+                        help="index the data file and load students only when selected")
+    parser.add_argument("--compact-courses", action="store_true",
+                        help="keep each period's courses in a compact course store to save memory")
+    parser.add_argument("--sqlite", metavar="DB_FILE",
+                        help="use a SQLite database instead of the JSON file")
+    parser.add_argument("--list", action="store_true", help="print the students and exit")
+    parser.add_argument("--summary", type=int, metavar="STUDENT_ID",
+                        help="print one student's summary and exit")
+    parser.add_argument("--name", help="find students with every word of NAME in their name")
+    parser.add_argument("--course", help="find students who took COURSE")
+    parser.add_argument("--status", help="find students with a grade in this band: " + ", ".join(StudentIndex.status_bands))
+    parser.add_argument("--year-level", type=int, help="only match courses of this year level")
+    parser.add_argument("--semester", type=int, help="only match courses of this semester")
+    parser.add_argument("--sort", choices=StudentIndex.sort_keys, default="id", help="order of found students")
+    parser.add_argument("--offset", type=non_negative_int, default=0, help="skip this many lines when listing")
+    parser.add_argument("--limit", type=non_negative_int, help="print at most this many lines when listing")
+    parser.add_argument("--import", dest="import_file", metavar="FILE",
+                        help="add courses from a CSV or JSON-lines file, save once and exit")
+    parser.add_argument("--format", choices=FORMATS, help="import file format (default: from extension)")
+    parser.add_argument("--convert", metavar="FILE",
+                        help="write the data to FILE (binary snapshot if it ends in .bin, JSON otherwise) and exit")
+    parser.add_argument("--grade-scale", metavar="FILE", help="JSON file with another grading scale's bands")
+    autosave.add_arguments(parser)
+    instrument.add_arguments(parser)
+    return parser.parse_args()
+
+def query_lines(results):
+    for student, periods in results:
+        gwa = student.compute_overall_gwa()
+        gwa_str = f"{gwa:.2f}" if gwa > 0 else "N/A"
+        line = f"ID: {student.id} | Name: {student.name} | GWA: {gwa_str}"
+        if periods:
+            line += " | " + ", ".join(f"Year {year_level} - Semester {semester}" for year_level, semester in periods)
+        yield line
+
+def print_and_exit(system, args):
+    # Non-interactive listing for --list / --summary / queries
+    if args.list:
+        system.list_students(args.offset, args.limit)
+    if args.summary is not None:
+        student = system.get_student(args.summary)
+        if student is None:
+            print(f"No student found with ID {args.summary}.")
+        else:
+            render(student.summary_lines(), args.offset, args.limit)
+    if is_query(args):
+        try:
+            results = system.query(name=args.name, course=args.course, status=args.status,
+                                   year_level=args.year_level, semester=args.semester, sort=args.sort)
+        except ValueError as e:
+            print(e)
+            return
+        print(f"{len(results)} student(s) found.")
+        render(query_lines(results), args.offset, args.limit)
+
+def is_query(args):
+    return any(value is not None for value in (args.name, args.course, args.status, args.year_level, args.semester))
+
 def main():
-    system = StudentSystem()
+    args = parse_args()
+    cache.settings["freeze"] = True
+    if args.grade_scale:
+        AcademicPeriod.grade_scale = GradeScale.load(args.grade_scale)
+    if args.compact_courses:
+        AcademicPeriod.use_course_store = True
+    if args.sqlite:
+        from sqlite_backend import SQLiteStudentSystem
+        system = SQLiteStudentSystem(args.sqlite)
+    else:
+        system = StudentSystem(args.file, lazy=args.lazy)
+
+    if args.import_file:
+        if args.sqlite:
+            print("Batch import works on the JSON file; import it into SQLite afterwards.")
+            return
+        importer = CourseImport(system)
+        import_file(args.import_file, importer.add_row, args.format)
+        importer.finish()
+        system.save_data()
+        return
+
+    if args.convert:
+        if args.sqlite:
+            print("Use sqlite_backend.py to move data between SQLite and JSON.")
+            return
+        system.convert(args.convert)
+        return
+
+    if args.list or args.summary is not None or is_query(args):
+        if args.sqlite and is_query(args):
+            print("Queries work on the JSON file.")
+            return
+        print_and_exit(system, args)
+        return
+
+    # Changes reach the journal in the background shortly after they are made.
+    # Saving from the menu also folds the journal into the snapshot when due.
+    saver = None
+    if not args.sqlite:
+        saver = autosave.AutoSaver(system.flush_journal, args.autosave_delay, args.autosave_changes)
+        system.autosave = saver
+
+    def save():
+        if saver is None:
+            system.save_data()
+        else:
+            saver.flush(system.save_data)
 
     while True:
         print_menu()
@@ -396,7 +1781,7 @@ def main():
             create_new_student(system)
         
         elif choice == '2':
-            system.list_students()
+            system.list_students(page_size=PAGE_SIZE)
             if system.students:
                 student_id = get_valid_int("Enter student ID to select: ")
                 student = system.get_student(student_id)
@@ -406,13 +1791,18 @@ def main():
                     print(f"No student found with ID {student_id}.")
         
         elif choice == '3':
-            system.list_students()
+            system.list_students(page_size=PAGE_SIZE)
         
         elif choice == '4':
-            system.save_data()
+            save()
         
         elif choice == '5':
-            system.save_data()
+            save()
+            if saver is None:
+                system.close()
+            else:
+                saver.close()
+                system.wait_for_compaction()
             print("Data saved automatically and exiting the system. Goodbye!")
             break
         
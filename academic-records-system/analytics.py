@@ -0,0 +1,300 @@
+import argparse
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from academic_records import FILE_NAME, AcademicPeriod, GradeScale, StudentSystem
+
+# Batch GWA and ranking engine.
+# Courses from the whole StudentSystem are laid out once as NumPy columns and
+# every period GWA, overall GWA, percentile, ranking and grade band histogram
+# is computed with vectorized passes instead of calling methods per object.
+
+
+def require_numpy():
+    if np is None:
+        raise ImportError("analytics requires NumPy: pip install numpy")
+
+
+class CourseColumns:
+    # Columnar (struct-of-arrays) view of every course in a StudentSystem
+    def __init__(self, student_ids, student_index, year_level, semester, units, grade, numeric):
+        self.student_ids = student_ids        # one entry per student, in system order
+        self.student_index = student_index    # per course: position in student_ids
+        self.year_level = year_level
+        self.semester = semester
+        self.units = units
+        self.grade = grade                    # NaN where the grade is not numeric
+        self.numeric = numeric                # same rule as grades.is_numeric_grade
+
+    def __len__(self):
+        return len(self.units)
+
+    @staticmethod
+    def from_system(system):
+        require_numpy()
+        student_ids = []
+        student_index, year_level, semester, units, grade, numeric = [], [], [], [], [], []
+
+        for position, (student_id, student) in enumerate(system.students.items()):
+            student_ids.append(student_id)
+            for period in student.periods.values():
+                for course in period.courses:
+                    is_numeric = course.is_numeric_grade()
+                    student_index.append(position)
+                    year_level.append(period.year_level)
+                    semester.append(period.semester)
+                    units.append(course.units)
+                    grade.append(course.grade if is_numeric else np.nan)
+                    numeric.append(is_numeric)
+
+        return CourseColumns(
+            np.array(student_ids, dtype=np.int64),
+            np.array(student_index, dtype=np.int64),
+            np.array(year_level, dtype=np.int64),
+            np.array(semester, dtype=np.int64),
+            np.array(units, dtype=np.float64),
+            np.array(grade, dtype=np.float64),
+            np.array(numeric, dtype=bool),
+        )
+
+    def graded_weights(self):
+        # Units and grade*units with non-numeric grades zeroed out
+        graded_units = np.where(self.numeric, self.units, 0.0)
+        weighted = np.where(self.numeric, self.grade * self.units, 0.0)
+        return graded_units, weighted
+
+
+def gwa_from_totals(weighted, graded_units):
+    # Same convention as compute_gwa: 0.0 when nothing is graded
+    gwa = np.zeros(len(weighted), dtype=np.float64)
+    has_units = graded_units > 0
+    gwa[has_units] = weighted[has_units] / graded_units[has_units]
+    return gwa
+
+
+def overall_gwas(columns):
+    # Overall GWA for every student, aligned with columns.student_ids
+    count = len(columns.student_ids)
+    graded_units, weighted = columns.graded_weights()
+    weighted_sum = np.bincount(columns.student_index, weights=weighted, minlength=count)
+    unit_sum = np.bincount(columns.student_index, weights=graded_units, minlength=count)
+    return gwa_from_totals(weighted_sum, unit_sum)
+
+
+def period_groups(columns):
+    # Sort courses by (student, year, semester) and number the runs of equal keys.
+    # Returns (order, group of each sorted course, position of each group's first course).
+    order = np.lexsort((columns.semester, columns.year_level, columns.student_index))
+    student_index = columns.student_index[order]
+    year_level = columns.year_level[order]
+    semester = columns.semester[order]
+    starts = np.ones(len(order), dtype=bool)
+    starts[1:] = (
+        (np.diff(student_index) != 0) | (np.diff(year_level) != 0) | (np.diff(semester) != 0)
+    )
+    return order, np.cumsum(starts) - 1, np.flatnonzero(starts)
+
+
+def period_gwas(columns):
+    # GWA and total units for every period that has courses.
+    # Returns (student_ids, year_levels, semesters, gwas, total_units) arrays.
+    if len(columns) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty, np.zeros(0), np.zeros(0)
+
+    order, group, first = period_groups(columns)
+    student_index = columns.student_index[order]
+    year_level = columns.year_level[order]
+    semester = columns.semester[order]
+
+    graded_units, weighted = columns.graded_weights()
+    weighted_sum = np.bincount(group, weights=weighted[order])
+    unit_sum = np.bincount(group, weights=graded_units[order])
+    total_units = np.bincount(group, weights=columns.units[order])
+
+    return (
+        columns.student_ids[student_index[first]],
+        year_level[first],
+        semester[first],
+        gwa_from_totals(weighted_sum, unit_sum),
+        total_units,
+    )
+
+
+def rank(student_ids, gwas, top=None):
+    # Order students best (lowest GWA) first, ties broken by student id.
+    # Students without a numeric GWA (0.0) are left out.
+    graded = gwas > 0
+    ids = student_ids[graded]
+    values = gwas[graded]
+    order = np.lexsort((ids, values))
+    if top is not None:
+        order = order[:top]
+    return ids[order], values[order]
+
+
+def percentile_ranks(gwas):
+    # Percent of graded students each student is at least as good as (100 = best).
+    # Students without a numeric GWA get NaN.
+    result = np.full(len(gwas), np.nan)
+    graded = gwas > 0
+    values = gwas[graded]
+    if len(values) == 0:
+        return result
+
+    ordered = np.sort(values)
+    worse_or_equal = len(ordered) - np.searchsorted(ordered, values, side='left')
+    result[graded] = 100.0 * worse_or_equal / len(ordered)
+    return result
+
+
+def gwa_percentiles(gwas, q=(10, 25, 50, 75, 90)):
+    # Distribution of GWAs over graded students
+    values = gwas[gwas > 0]
+    if len(values) == 0:
+        return {p: None for p in q}
+    return dict(zip(q, np.percentile(values, q)))
+
+
+def grade_bands(columns, scale=None):
+    # Band number (index into scale.names) of every course, in one pass.
+    # Columns hold non-numeric grades as NaN; they count as "INC".
+    scale = scale or AcademicPeriod.grade_scale
+    grade = columns.grade
+    bands = np.searchsorted(np.array(scale.bounds), grade, side='left')
+    bands[(grade < scale.lowest) | (grade > scale.highest)] = scale.invalid_band
+    bands[~columns.numeric] = scale.special_bands.get("INC", scale.invalid_band)
+    return bands
+
+
+def band_histogram(bands, groups, group_count, band_count):
+    # counts[g, b]: courses of group g in band b
+    counts = np.bincount(groups * band_count + bands, minlength=group_count * band_count)
+    return counts.reshape(group_count, band_count)
+
+
+def student_band_histograms(columns, bands, scale=None):
+    # One row per student, aligned with columns.student_ids
+    scale = scale or AcademicPeriod.grade_scale
+    return band_histogram(bands, columns.student_index, len(columns.student_ids), len(scale.names))
+
+
+def period_band_histograms(columns, bands, scale=None):
+    # One row per period that has courses: (student_ids, year_levels, semesters, counts)
+    scale = scale or AcademicPeriod.grade_scale
+    order, group, first = period_groups(columns)
+    counts = band_histogram(bands[order], group, len(first), len(scale.names))
+    return (columns.student_ids[columns.student_index[order][first]],
+            columns.year_level[order][first], columns.semester[order][first], counts)
+
+
+def cohort_band_histograms(columns, bands, scale=None):
+    # One row per cohort, i.e. every course taken in the same year level and semester:
+    # (year_levels, semesters, counts)
+    scale = scale or AcademicPeriod.grade_scale
+    keys, groups = np.unique(np.stack([columns.year_level, columns.semester], axis=1),
+                             axis=0, return_inverse=True)
+    counts = band_histogram(bands, groups.reshape(-1), len(keys), len(scale.names))
+    return keys[:, 0], keys[:, 1], counts
+
+
+def honors(columns, gwas, bands, max_gwa, scale=None, barred=("Failed", "Conditional", "Incomplete")):
+    # Students with an overall GWA of max_gwa or better and no course in a barred band
+    # (or with an invalid grade). Returns their ids and GWAs, best first.
+    scale = scale or AcademicPeriod.grade_scale
+    counts = student_band_histograms(columns, bands, scale)
+    barred_bands = [band for band, name in enumerate(scale.names) if name in barred]
+    barred_bands.append(scale.invalid_band)
+    clean = counts[:, barred_bands].sum(axis=1) == 0
+    eligible = clean & (gwas > 0) & (gwas <= max_gwa)
+    return rank(columns.student_ids[eligible], gwas[eligible])
+
+
+def verify(system, columns=None, tolerance=1e-9):
+    # Compare the vectorized results with the per-object methods.
+    # Returns a list of mismatch descriptions; empty means everything agrees.
+    if columns is None:
+        columns = CourseColumns.from_system(system)
+    mismatches = []
+
+    for student_id, gwa in zip(columns.student_ids.tolist(), overall_gwas(columns).tolist()):
+        expected = system.get_student(student_id).compute_overall_gwa()
+        if abs(expected - gwa) > tolerance:
+            mismatches.append(f"student {student_id}: overall {gwa} != {expected}")
+
+    student_ids, year_levels, semesters, gwas, units = period_gwas(columns)
+    rows = zip(student_ids.tolist(), year_levels.tolist(), semesters.tolist(), gwas.tolist(), units.tolist())
+    for student_id, year_level, semester, gwa, total_units in rows:
+        period = system.get_student(student_id).get_period(year_level, semester)
+        if abs(period.compute_gwa() - gwa) > tolerance or period.total_units() != total_units:
+            mismatches.append(f"student {student_id} {period.get_period_name()}: {gwa} != {period.compute_gwa()}")
+
+    bands = grade_bands(columns)
+    scale = AcademicPeriod.grade_scale
+    position = 0
+    for student in system.students.values():
+        for period in student.periods.values():
+            for course in period.courses:
+                # Non-numeric grades sit in the columns as NaN, which the batch path counts as INC
+                grade = course.grade if course.is_numeric_grade() else "INC"
+                if scale.names[bands[position]] != period.grade_description(grade):
+                    mismatches.append(f"student {student.id} {course.name}: band {scale.names[bands[position]]}")
+                position += 1
+
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Registry-wide GWA rankings")
+    parser.add_argument("--file", default=FILE_NAME, help="students data file")
+    parser.add_argument("--top", type=int, default=10, help="number of students to list")
+    parser.add_argument("--verify", action="store_true", help="check results against per-student methods")
+    parser.add_argument("--bands", action="store_true", help="print grade band counts for the registry and each cohort")
+    parser.add_argument("--honors", type=float, metavar="GWA",
+                        help="list students with this overall GWA or better and no failed, conditional or incomplete course")
+    parser.add_argument("--grade-scale", metavar="FILE", help="JSON file with another grading scale's bands")
+    args = parser.parse_args()
+
+    if args.grade_scale:
+        AcademicPeriod.grade_scale = GradeScale.load(args.grade_scale)
+    system = StudentSystem(args.file)
+    columns = CourseColumns.from_system(system)
+    gwas = overall_gwas(columns)
+
+    print(f"\n--- Top {args.top} Students by Overall GWA ---")
+    for position, (student_id, gwa) in enumerate(zip(*rank(columns.student_ids, gwas, args.top)), start=1):
+        print(f"{position}. ID: {student_id} | Name: {system.get_student(int(student_id)).name} | GWA: {gwa:.2f}")
+
+    print("\n--- GWA Percentiles ---")
+    for q, value in gwa_percentiles(gwas).items():
+        print(f"P{q}: {value:.2f}" if value is not None else f"P{q}: N/A")
+
+    if args.bands or args.honors is not None:
+        bands = grade_bands(columns)
+        scale = AcademicPeriod.grade_scale
+
+    if args.bands:
+        names = scale.names
+        print("\n--- Grade Bands ---")
+        for name, count in zip(names, np.bincount(bands, minlength=len(names)).tolist()):
+            print(f"{name}: {count}")
+        print("\nCohort: " + " | ".join(names))
+        for year_level, semester, counts in zip(*cohort_band_histograms(columns, bands)):
+            print(f"Year {year_level} - Semester {semester}: " + " | ".join(str(count) for count in counts.tolist()))
+
+    if args.honors is not None:
+        ids, values = honors(columns, gwas, bands, args.honors)
+        print(f"\n--- Honors (GWA {args.honors:.2f} or better): {len(ids)} student(s) ---")
+        for student_id, gwa in zip(ids.tolist(), values.tolist()):
+            print(f"ID: {student_id} | Name: {system.get_student(student_id).name} | GWA: {gwa:.2f}")
+
+    if args.verify:
+        mismatches = verify(system, columns)
+        print("\nVerification passed." if not mismatches else "\n".join(mismatches))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+from common.fileio import new_digest
+from grades import decode_grade, encode_grade
+
+# Compact binary snapshot of the student registry, read through mmap.
+#
+# All numbers are little-endian. After a fixed header come fixed-width
+# tables, so a record is found by arithmetic instead of parsing:
+#
+#   header    magic, digest of everything after the header, table sizes
+#   students  id, name (offset and length in the string table),
+#             first period row, number of periods       - in registry order
+#   periods   first course row, number of courses, year level, semester
+#   courses   name (offset and length), units, grade    - "INC" is NaN
+#   ids       every student id, sorted                  - binary searched
+#   rows      student table row of each sorted id
+#   strings   UTF-8 student and course names; each course name is stored once
+#
+# Records are handed out in the same dict layout as Student.to_dict(), so
+# the JSON snapshot and this one convert into each other without loss
+# (numeric grades come back as floats, encoded by grades.py as in CourseStore).
+
+MAGIC = b"SREGBIN1"
+HEADER = struct.Struct("<8s16sQQQQ")   # magic, digest, students, periods, courses, string bytes
+STUDENT = struct.Struct("<qQIQH")      # id, name offset, name length, first period, period count
+PERIOD = struct.Struct("<QHBB")        # first course, course count, year level, semester
+COURSE = struct.Struct("<QIHd")        # name offset, name length, units, grade
+CHUNK_SIZE = 1 << 20
+
+
+def is_binary_snapshot(filename):
+    # Whether the file starts with the binary snapshot magic
+    try:
+        with open(filename, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def little_endian(values):
+    # Raw bytes of an array in the file's byte order
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class BinarySnapshot:
+    # Read-only view of a binary snapshot. Opening maps the file and reads
+    # the header only; each lookup reads the pages of the sorted id table it
+    # binary searches and the rows of the one student asked for.
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.map) < HEADER.size:
+            raise ValueError(f"{filename} is not a binary student snapshot")
+        magic, digest, self.count, periods, courses, strings_size = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            raise ValueError(f"{filename} is not a binary student snapshot")
+
+        self.digest = digest.hex()
+        self.students_at = HEADER.size
+        self.periods_at = self.students_at + self.count * STUDENT.size
+        self.courses_at = self.periods_at + periods * PERIOD.size
+        ids_at = self.courses_at + courses * COURSE.size
+        rows_at = ids_at + self.count * 8
+        self.strings_at = rows_at + self.count * 4
+        if self.strings_at + strings_size != len(self.map):
+            raise ValueError(f"{filename} is truncated or damaged")
+
+        view = memoryview(self.map)
+        self.ids = view[ids_at:rows_at].cast('q')
+        self.rows = view[rows_at:self.strings_at].cast('I')
+        if sys.byteorder == "big":
+            self.ids = array('q', self.ids)
+            self.ids.byteswap()
+            self.rows = array('I', self.rows)
+            self.rows.byteswap()
+        self.names = {}   # course name offset -> str, shared by every record
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, student_id):
+        return self.find(student_id) is not None
+
+    def __iter__(self):
+        # Student ids in registry order
+        table = memoryview(self.map)[self.students_at:self.periods_at]
+        for fields in STUDENT.iter_unpack(table):
+            yield fields[0]
+
+    def find(self, student_id):
+        # Row of a student in the student table, or None
+        if not isinstance(student_id, int):
+            return None
+        position = bisect_left(self.ids, student_id)
+        if position < self.count and self.ids[position] == student_id:
+            return self.rows[position]
+        return None
+
+    def read(self, student_id):
+        # One student as a Student.to_dict() style record
+        row = self.find(student_id)
+        if row is None:
+            raise KeyError(student_id)
+        return self.record(row)
+
+    def summary(self, student_id):
+        # (name, period count) of one student, from its student row alone
+        row = self.find(student_id)
+        if row is None:
+            raise KeyError(student_id)
+        _, name_offset, name_length, _, period_count = STUDENT.unpack_from(
+            self.map, self.students_at + row * STUDENT.size)
+        return self.string(name_offset, name_length), period_count
+
+    def record(self, row):
+        student_id, name_offset, name_length, first_period, period_count = STUDENT.unpack_from(
+            self.map, self.students_at + row * STUDENT.size)
+        start = self.periods_at + first_period * PERIOD.size
+        periods = []
+        for first_course, course_count, year_level, semester in PERIOD.iter_unpack(
+                self.map[start:start + period_count * PERIOD.size]):
+            start = self.courses_at + first_course * COURSE.size
+            courses = [
+                {"name": self.course_name(offset, length), "units": units, "grade": decode_grade(grade)}
+                for offset, length, units, grade in COURSE.iter_unpack(
+                    self.map[start:start + course_count * COURSE.size])
+            ]
+            periods.append({"year_level": year_level, "semester": semester, "courses": courses})
+        return {"name": self.string(name_offset, name_length), "id": student_id, "periods": periods}
+
+    def records(self):
+        # (id, record) for every student, in registry order
+        for row in range(self.count):
+            record = self.record(row)
+            yield record["id"], record
+
+    def string(self, offset, length):
+        start = self.strings_at + offset
+        return self.map[start:start + length].decode()
+
+    def course_name(self, offset, length):
+        name = self.names.get(offset)
+        if name is None:
+            name = self.names[offset] = sys.intern(self.string(offset, length))
+        return name
+
+    def close(self):
+        # The memoryviews must go before the map can be closed
+        if isinstance(self.ids, memoryview):
+            self.ids.release()
+            self.rows.release()
+        self.map.close()
+
+
+def write_binary_snapshot(filename, records):
+    # Stream (id, record) pairs, records in the Student.to_dict() layout, into
+    # a binary snapshot. The tables are spooled to temporary files next to the
+    # target, so only the id list and the course names are held in memory.
+    # Returns the snapshot digest.
+    import tempfile   # only needed for writing, so not at startup
+    directory = os.path.dirname(os.path.abspath(filename))
+    ids = array('q')
+    course_names = {}   # name -> (offset, length) in the string table
+    period_count = course_count = strings_size = 0
+
+    with tempfile.TemporaryFile(dir=directory) as students, \
+         tempfile.TemporaryFile(dir=directory) as periods, \
+         tempfile.TemporaryFile(dir=directory) as courses, \
+         tempfile.TemporaryFile(dir=directory) as strings:
+
+        def add_string(text):
+            nonlocal strings_size
+            data = text.encode()
+            strings.write(data)
+            strings_size += len(data)
+            return strings_size - len(data), len(data)
+
+        for student_id, record in records:
+            ids.append(student_id)
+            name_offset, name_length = add_string(record["name"])
+            students.write(STUDENT.pack(student_id, name_offset, name_length,
+                                        period_count, len(record["periods"])))
+            for period in record["periods"]:
+                periods.write(PERIOD.pack(course_count, len(period["courses"]),
+                                          period["year_level"], period["semester"]))
+                for course in period["courses"]:
+                    name = course["name"]
+                    if name not in course_names:
+                        course_names[name] = add_string(name)
+                    offset, length = course_names[name]
+                    courses.write(COURSE.pack(offset, length, course["units"], encode_grade(course["grade"])))
+                course_count += len(period["courses"])
+            period_count += len(record["periods"])
+
+        order = sorted(range(len(ids)), key=ids.__getitem__)
+        sorted_ids = array('q', (ids[row] for row in order))
+        rows = array('I', order)
+        del order
+
+        temp_name = filename + ".tmp"
+        digest = new_digest()
+        with open(temp_name, 'wb') as f:
+            f.write(bytes(HEADER.size))
+
+            def write(chunk):
+                f.write(chunk)
+                digest.update(chunk)
+
+            for table in (students, periods, courses):
+                table.seek(0)
+                while chunk := table.read(CHUNK_SIZE):
+                    write(chunk)
+            write(little_endian(sorted_ids))
+            write(little_endian(rows))
+            strings.seek(0)
+            while chunk := strings.read(CHUNK_SIZE):
+                write(chunk)
+
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, digest.digest(), len(ids), period_count, course_count, strings_size))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_name, filename)
+    return digest.hexdigest()
@@ -0,0 +1,19 @@
+import math
+
+# One rule for what counts as a numeric grade, shared by every storage
+# layout (Course objects, CourseStore, SQLite, the binary snapshot), so the
+# same registry gives the same GWA whichever is used.
+
+
+def is_numeric_grade(grade):
+    # int or float, but not bool (True is an int to Python)
+    return isinstance(grade, (int, float)) and not isinstance(grade, bool)
+
+
+def encode_grade(grade):
+    # A grade as a float for typed storage: numeric grades as themselves, "INC" as NaN
+    return float(grade) if is_numeric_grade(grade) else math.nan
+
+
+def decode_grade(value):
+    return "INC" if math.isnan(value) else value
@@ -0,0 +1,83 @@
+import argparse
+import contextlib
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from academic_records import FILE_NAME, StudentSystem
+
+# Transcript and GWA reports for many registry files.
+# The work is split into jobs of (file, shard): a worker opens the file
+# lazily, renders the show_summary lines of its contiguous slice of students
+# and returns them as one string. Results are written in job order, so the
+# output is the same whatever the number of workers, including the serial
+# path (--workers 1), which runs the same jobs in this process.
+# Sharding a file only avoids parsing the other shards' records when the
+# snapshot uses the one-student-per-line layout written by save_data.
+
+
+def plan_jobs(filenames, shards):
+    # Every file split into the same number of shards, in file order
+    return [(filename, shard, shards) for filename in filenames for shard in range(shards)]
+
+
+def report_job(job):
+    filename, shard, shards = job
+    # Load messages go to stderr so they never mix into the report
+    with contextlib.redirect_stdout(sys.stderr):
+        system = StudentSystem(filename, lazy=True)
+
+    ids = list(system.students)
+    start = len(ids) * shard // shards
+    end = len(ids) * (shard + 1) // shards
+
+    lines = []
+    if shard == 0:
+        lines.append(f"{'#'*50}")
+        lines.append(f"Registry: {filename} ({len(ids)} student(s))")
+        lines.append(f"{'#'*50}")
+    for student_id in ids[start:end]:
+        lines.extend(system.students[student_id].summary_lines())
+    return "".join(line + "\n" for line in lines)
+
+
+def write_report(filenames, out, workers=1, shards=1):
+    # Returns the number of jobs run
+    jobs = plan_jobs(filenames, shards)
+    if workers <= 1:
+        for text in map(report_job, jobs):
+            out.write(text)
+        return len(jobs)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # map yields results in submission order while later jobs keep running
+        for text in executor.map(report_job, jobs):
+            out.write(text)
+    return len(jobs)
+
+
+def default_shards(file_count, workers):
+    # Split files only when there are fewer of them than workers
+    return max(1, -(-workers // file_count))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Student summaries for one or more registry files")
+    parser.add_argument("files", nargs="*", default=[FILE_NAME], help="registry JSON files")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (1 runs serially; default: CPU count)")
+    parser.add_argument("--shards", type=int, help="pieces to split each file into (default: enough to keep every worker busy)")
+    parser.add_argument("--output", "-o", help="write the report here instead of standard output")
+    args = parser.parse_args()
+
+    shards = args.shards or default_shards(len(args.files), args.workers)
+    if args.output:
+        with open(args.output, "w") as out:
+            jobs = write_report(args.files, out, args.workers, shards)
+        print(f"Wrote report for {len(args.files)} file(s) in {jobs} job(s) to {args.output}")
+    else:
+        write_report(args.files, sys.stdout, args.workers, shards)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import argparse
+import asyncio
+import os
+import signal
+
+from academic_records import FILE_NAME, AcademicPeriod, StudentSystem, import_course_row
+from common import cache, codec
+from common.batch import int_field
+
+# Long-running front-end that keeps one StudentSystem in memory and answers
+# newline-delimited JSON requests over a Unix socket or localhost TCP.
+#
+#   {"op": "get_student", "student_id": 202412301}
+#   {"op": "period_gwa", "student_id": 202412301, "year_level": 1, "semester": 1}
+#   {"op": "overall_gwa", "student_id": 202412301}
+#   {"op": "add_course", "student_id": 202412301, "year_level": 1, "semester": 1,
+#    "course": "CMSC 21", "units": 3, "grade": 1.5}          (plus "name" for a new student)
+#
+# Every reply is one JSON line with "ok" and either the result or "error".
+# Reads are answered straight away by the connection's own task. Changes are
+# queued to a single writer task, which applies everything waiting, appends
+# the whole batch to the journal with one fsync (group commit) and only then
+# replies, so an acknowledged change is on disk. Reads may see a change a
+# moment before it is acknowledged.
+
+DEFAULT_PORT = 8765
+
+
+class StudentServer:
+    # Most changes folded into one journal append
+    max_batch = 1000
+
+    def __init__(self, system):
+        self.system = system
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.changes = 0
+
+    def read(self, request):
+        op = request.get("op")
+        if op not in ("get_student", "period_gwa", "overall_gwa"):
+            raise ValueError(f"unknown op {op!r}")
+        student_id = int_field(request, "student_id", min_val=1)
+        student = self.system.get_student(student_id)
+        if student is None:
+            raise ValueError(f"No student found with ID {student_id}.")
+
+        if op == "get_student":
+            return {"ok": True, "student": student.to_dict(), "overall_gwa": student.compute_overall_gwa()}
+        if op == "overall_gwa":
+            return {"ok": True, "gwa": student.compute_overall_gwa()}
+        period = student.get_period(int_field(request, "year_level"), int_field(request, "semester"))
+        if period is None:
+            raise ValueError("No courses found for this period.")
+        return {"ok": True, "gwa": period.compute_gwa(), "units": period.total_units()}
+
+    async def handle(self, request):
+        if request.get("op") == "add_course":
+            reply = asyncio.get_running_loop().create_future()
+            await self.queue.put((request, reply))
+            return await reply
+        try:
+            return self.read(request)
+        except (KeyError, ValueError) as e:
+            return error_reply(e)
+
+    async def writer(self):
+        # The only task that changes the system
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            replies = []
+            for request, reply in batch:
+                try:
+                    import_course_row(self.system, request)
+                    replies.append((reply, {"ok": True}))
+                except Exception as e:
+                    # Any failure answers its own request; the writer must keep running
+                    replies.append((reply, error_reply(e)))
+
+            if self.system.pending:
+                try:
+                    # Reads keep being served while the batch is written
+                    # (the writer task waits, so nothing changes meanwhile)
+                    await asyncio.to_thread(self.system.flush_journal)
+                    self.batches += 1
+                    self.changes += sum(response["ok"] for _, response in replies)
+                except Exception as e:
+                    # flush_journal put the entries back into pending: the
+                    # changes stay applied and go out with the next batch
+                    error = f"Error saving data: {e}; the change is kept and saved with the next write"
+                    replies = [(reply, {"ok": False, "error": error} if response["ok"] else response)
+                               for reply, response in replies]
+
+            for reply, response in replies:
+                if not reply.done():
+                    reply.set_result(response)
+            if self.system.journal_entries >= self.system.compact_threshold:
+                # After replying: the batch is already safe in the journal.
+                # The snapshot is written by a thread while writes go on.
+                try:
+                    self.system.compact(background=True)
+                except Exception as e:
+                    print(f"Error saving data: {e}")
+            for _ in batch:
+                self.queue.task_done()
+
+    async def client(self, reader, writer):
+        # One request at a time per connection; open more connections for concurrency
+        try:
+            while line := await reader.readline():
+                try:
+                    request = codec.loads(line)
+                except ValueError:
+                    response = {"ok": False, "error": "invalid JSON"}
+                else:
+                    if isinstance(request, dict):
+                        response = await self.handle(request)
+                    else:
+                        response = {"ok": False, "error": "expected a JSON object"}
+                writer.write(codec.dumps(response) + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def error_reply(e):
+    # Same wording as the batch importer
+    if isinstance(e, KeyError):
+        return {"ok": False, "error": f"missing field {e}"}
+    if not isinstance(e, ValueError):
+        return {"ok": False, "error": f"internal error: {e!r}"}
+    return {"ok": False, "error": str(e)}
+
+
+async def serve(system, socket_path=None, host="127.0.0.1", port=DEFAULT_PORT):
+    server = StudentServer(system)
+    writer_task = asyncio.create_task(server.writer())
+    if socket_path:
+        listener = await asyncio.start_unix_server(server.client, path=socket_path)
+        print(f"Serving {len(system.students)} student(s) on {socket_path}")
+    else:
+        listener = await asyncio.start_server(server.client, host, port)
+        print(f"Serving {len(system.students)} student(s) on {host}:{port}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    async with listener:
+        await stop.wait()
+
+    # Finish queued changes before exiting
+    await server.queue.join()
+    writer_task.cancel()
+    if socket_path and os.path.exists(socket_path):
+        os.remove(socket_path)
+    print(f"Stopped after {server.changes} change(s) in {server.batches} journal write(s).")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the Student Grade System over a local socket")
+    parser.add_argument("--file", default=FILE_NAME, help="students data file")
+    parser.add_argument("--socket", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP address to listen on (default: localhost only)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--compact-courses", action="store_true",
+                        help="keep each period's courses in a compact course store to save memory")
+    args = parser.parse_args()
+
+    cache.settings["freeze"] = True
+    if args.compact_courses:
+        AcademicPeriod.use_course_store = True
+    system = StudentSystem(args.file)
+    asyncio.run(serve(system, args.socket, args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
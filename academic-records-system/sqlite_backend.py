@@ -0,0 +1,345 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from collections.abc import Mapping
+
+from academic_records import BASE_DIR, FILE_NAME, Course, Student, StudentSystem
+from grades import is_numeric_grade
+from common.render import render
+
+DB_NAME = os.path.join(BASE_DIR, "students_data.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER NOT NULL UNIQUE,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS periods (
+    student_id INTEGER NOT NULL,
+    year_level INTEGER NOT NULL,
+    semester INTEGER NOT NULL,
+    UNIQUE (student_id, year_level, semester)
+);
+CREATE TABLE IF NOT EXISTS courses (
+    student_id INTEGER NOT NULL,
+    year_level INTEGER NOT NULL,
+    semester INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    units INTEGER NOT NULL,
+    grade REAL,        -- numeric grades
+    grade_text TEXT    -- any other grade ("INC"), JSON encoded
+);
+CREATE INDEX IF NOT EXISTS idx_courses_period ON courses (student_id, year_level, semester);
+"""
+
+# Per-period and per-student aggregates, computed by SQLite
+PERIOD_TOTALS = """
+SELECT student_id, year_level, semester,
+       SUM(units),
+       SUM(CASE WHEN grade IS NOT NULL THEN grade * units END),
+       SUM(CASE WHEN grade IS NOT NULL THEN units END)
+FROM courses
+"""
+
+STUDENT_TOTALS = """
+SELECT student_id,
+       SUM(CASE WHEN grade IS NOT NULL THEN grade * units END),
+       SUM(CASE WHEN grade IS NOT NULL THEN units END)
+FROM courses
+"""
+
+
+def encode_grade(grade):
+    # Split a grade into the (grade, grade_text) columns
+    if is_numeric_grade(grade):
+        return float(grade), None
+    return None, json.dumps(grade)
+
+
+def decode_grade(grade, grade_text):
+    return grade if grade_text is None else json.loads(grade_text)
+
+
+def gwa(weighted, graded_units):
+    # Same convention as compute_gwa: 0.0 when nothing is graded
+    if not graded_units:
+        return 0.0
+    return weighted / graded_units
+
+
+# Students read from the database on demand.
+# Hydrated students are kept so menus holding a Student see later changes.
+class SQLiteStudents(Mapping):
+    def __init__(self, connection):
+        self.connection = connection
+        self.loaded = {}
+
+    def __getitem__(self, student_id):
+        if student_id in self.loaded:
+            return self.loaded[student_id]
+
+        row = self.connection.execute(
+            "SELECT name FROM students WHERE id = ?", (student_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(student_id)
+
+        student = Student(row[0], student_id)
+        periods = self.connection.execute(
+            "SELECT year_level, semester FROM periods WHERE student_id = ? ORDER BY rowid",
+            (student_id,)
+        )
+        for year_level, semester in periods:
+            student.get_or_create_period(year_level, semester)
+        courses = self.connection.execute(
+            "SELECT year_level, semester, name, units, grade, grade_text FROM courses "
+            "WHERE student_id = ? ORDER BY rowid",
+            (student_id,)
+        )
+        for year_level, semester, name, units, grade, grade_text in courses:
+            period = student.get_or_create_period(year_level, semester)
+            period._append_course(Course(name, units, decode_grade(grade, grade_text)))
+
+        self.loaded[student_id] = student
+        return student
+
+    def __contains__(self, student_id):
+        if student_id in self.loaded:
+            return True
+        return self.connection.execute(
+            "SELECT 1 FROM students WHERE id = ?", (student_id,)
+        ).fetchone() is not None
+
+    def __iter__(self):
+        for (student_id,) in self.connection.execute("SELECT id FROM students ORDER BY rowid"):
+            yield student_id
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+
+
+# StudentSystem stored in SQLite.
+# Mutations are validated through the same Student/AcademicPeriod methods and
+# written to the database in an open transaction; save_data commits it.
+class SQLiteStudentSystem:
+    def __init__(self, filename=DB_NAME):
+        self.filename = filename
+        self.connection = sqlite3.connect(filename)
+        self.connection.executescript(SCHEMA)
+        self.students = SQLiteStudents(self.connection)
+        count = len(self.students)
+        if count:
+            print(f"Loaded {count} student(s) from {self.filename}")
+
+    def add_student(self, name, student_id):
+        if student_id in self.students:
+            print(f"Student with ID {student_id} already exists!")
+            return
+
+        student = Student(name, student_id)
+        self.connection.execute("INSERT INTO students (id, name) VALUES (?, ?)", (student_id, name))
+        self.students.loaded[student_id] = student
+        print(f"Student {name} added successfully.")
+        return student
+
+    def get_student(self, student_id):
+        return self.students.get(student_id)
+
+    def get_or_create_period(self, student_id, year_level, semester):
+        student = self.get_student(student_id)
+        if student is None:
+            print(f"No student found with ID {student_id}.")
+            return
+
+        period = student.get_period(year_level, semester)
+        if period is None:
+            period = student.get_or_create_period(year_level, semester)
+            self.connection.execute(
+                "INSERT INTO periods (student_id, year_level, semester) VALUES (?, ?, ?)",
+                (student_id, year_level, semester)
+            )
+        return period
+
+    def add_course(self, student_id, year_level, semester, name, units, grade):
+        period = self.get_or_create_period(student_id, year_level, semester)
+        if period is None:
+            return
+
+        if not period.add_course(name, units, grade):
+            return
+
+        self.connection.execute(
+            "INSERT INTO courses (student_id, year_level, semester, name, units, grade, grade_text) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (student_id, year_level, semester, name, units, *encode_grade(grade))
+        )
+        return True
+
+    def course_rowid(self, student_id, year_level, semester, index):
+        row = self.connection.execute(
+            "SELECT rowid FROM courses WHERE student_id = ? AND year_level = ? AND semester = ? "
+            "ORDER BY rowid LIMIT 1 OFFSET ?",
+            (student_id, year_level, semester, index)
+        ).fetchone()
+        return row[0]
+
+    def remove_course(self, student_id, year_level, semester, index):
+        student = self.get_student(student_id)
+        period = student.get_period(year_level, semester) if student else None
+        if period is None or not 0 <= index < len(period.courses):
+            print("Course not found.")
+            return
+
+        rowid = self.course_rowid(student_id, year_level, semester, index)
+        course = period.remove_course(index)
+        self.connection.execute("DELETE FROM courses WHERE rowid = ?", (rowid,))
+        return course
+
+    def edit_course(self, student_id, year_level, semester, index, name=None, units=None, grade=None):
+        student = self.get_student(student_id)
+        period = student.get_period(year_level, semester) if student else None
+        if period is None or not 0 <= index < len(period.courses):
+            print("Course not found.")
+            return
+
+        if not period.edit_course(index, name, units, grade):
+            return
+
+        course = period.courses[index]
+        self.connection.execute(
+            "UPDATE courses SET name = ?, units = ?, grade = ?, grade_text = ? WHERE rowid = ?",
+            (course.name, course.units, *encode_grade(course.grade),
+             self.course_rowid(student_id, year_level, semester, index))
+        )
+        return True
+
+    def student_lines(self, offset=0, limit=None):
+        # The window is applied in SQL so skipped students are never read
+        rows = self.connection.execute(
+            "SELECT s.id, s.name, COUNT(p.student_id) FROM students s "
+            "LEFT JOIN periods p ON p.student_id = s.id GROUP BY s.rowid ORDER BY s.rowid "
+            "LIMIT ? OFFSET ?",
+            (-1 if limit is None else limit, offset)
+        )
+        for student_id, name, period_count in rows:
+            yield f"ID: {student_id} | Name: {name} | Periods: {period_count}"
+
+    def list_students(self, offset=0, limit=None, page_size=None):
+        if not len(self.students):
+            print("No students registered yet.")
+            return
+
+        print("\n--- All Students ---")
+        render(self.student_lines(offset, limit), page_size=page_size)
+
+    def save_data(self):
+        try:
+            self.connection.commit()
+            print("Data saved successfully.")
+        except sqlite3.Error as e:
+            print(f"Error saving data: {e}")
+
+    def period_gwa(self, student_id, year_level, semester):
+        # GWA of one period, computed in SQL
+        row = self.connection.execute(
+            PERIOD_TOTALS + "WHERE student_id = ? AND year_level = ? AND semester = ?",
+            (student_id, year_level, semester)
+        ).fetchone()
+        return gwa(row[4], row[5])
+
+    def overall_gwa(self, student_id):
+        # Overall GWA of one student, computed in SQL
+        row = self.connection.execute(STUDENT_TOTALS + "WHERE student_id = ?", (student_id,)).fetchone()
+        return gwa(row[1], row[2])
+
+    def period_report(self):
+        # Yield (student_id, year_level, semester, total_units, gwa) for every period with courses
+        rows = self.connection.execute(
+            PERIOD_TOTALS + "GROUP BY student_id, year_level, semester ORDER BY student_id, year_level, semester"
+        )
+        for student_id, year_level, semester, total_units, weighted, graded_units in rows:
+            yield student_id, year_level, semester, total_units, gwa(weighted, graded_units)
+
+    def overall_report(self):
+        # Yield (student_id, gwa) for every student with courses
+        rows = self.connection.execute(STUDENT_TOTALS + "GROUP BY student_id ORDER BY student_id")
+        for student_id, weighted, graded_units in rows:
+            yield student_id, gwa(weighted, graded_units)
+
+    def close(self):
+        self.connection.close()
+
+
+def import_json(json_filename, db_filename, batch_size=10000, replace=False):
+    # One-shot import of a JSON registry (snapshot plus journal) into a SQLite database.
+    # A database that already has students is left alone unless replace is
+    # set; its rows are then deleted in the import's own transaction, so a
+    # failed import keeps them. Returns the number imported, or None if refused.
+    connection = sqlite3.connect(db_filename)
+    connection.executescript(SCHEMA)
+    existing = connection.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+    if existing and not replace:
+        connection.close()
+        print(f"{db_filename} already has {existing} student(s); use --replace to overwrite it.")
+        return None
+    source = StudentSystem(json_filename, lazy=True)
+
+    students, periods, courses = [], [], []
+
+    def flush():
+        connection.executemany("INSERT INTO students (id, name) VALUES (?, ?)", students)
+        connection.executemany("INSERT INTO periods (student_id, year_level, semester) VALUES (?, ?, ?)", periods)
+        connection.executemany(
+            "INSERT INTO courses (student_id, year_level, semester, name, units, grade, grade_text) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", courses
+        )
+        students.clear()
+        periods.clear()
+        courses.clear()
+
+    count = 0
+    with connection:
+        for table in ("courses", "periods", "students"):
+            connection.execute(f"DELETE FROM {table}")
+        for student_id, student in source.students.items():
+            students.append((student_id, student.name))
+            for period in student.periods.values():
+                periods.append((student_id, period.year_level, period.semester))
+                for course in period.courses:
+                    courses.append((student_id, period.year_level, period.semester,
+                                    course.name, course.units, *encode_grade(course.grade)))
+            count += 1
+            if len(students) >= batch_size:
+                flush()
+        flush()
+    connection.close()
+    print(f"Imported {count} student(s) into {db_filename}")
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite storage for the Student Grade System")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    importer = subparsers.add_parser("import", help="import a students JSON file")
+    importer.add_argument("json_file", nargs="?", default=FILE_NAME)
+    importer.add_argument("db_file", nargs="?", default=DB_NAME)
+    importer.add_argument("--replace", action="store_true", help="overwrite a database that already has students")
+    report = subparsers.add_parser("report", help="print per-period units and GWA")
+    report.add_argument("db_file", nargs="?", default=DB_NAME)
+    args = parser.parse_args()
+
+    if args.command == "import":
+        if import_json(args.json_file, args.db_file, replace=args.replace) is None:
+            sys.exit(1)
+    elif args.command == "report":
+        system = SQLiteStudentSystem(args.db_file)
+        for student_id, year_level, semester, total_units, period_gwa in system.period_report():
+            gwa_str = f"{period_gwa:.2f}" if period_gwa > 0 else "N/A"
+            print(f"ID: {student_id} | Year {year_level} - Semester {semester} | Units: {total_units} | GWA: {gwa_str}")
+        system.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from academic_records import AcademicPeriod, StudentSystem
+
+# Round trips between the JSON and binary snapshots: run with
+#   python -m unittest test_binary_snapshot    (from academic-records-system/)
+
+# Integer, float and "INC" grades in one registry
+REGISTRY = {
+    "1": {"name": "Ana", "id": 1, "periods": [
+        {"year_level": 1, "semester": 1, "courses": [
+            {"name": "CS 11", "units": 3, "grade": 3},
+            {"name": "MATH 21", "units": 3, "grade": 1.0},
+            {"name": "ENG 1", "units": 3, "grade": "INC"},
+        ]},
+        {"year_level": 1, "semester": 2, "courses": [
+            {"name": "CS 12", "units": 4, "grade": 2},
+            {"name": "PE 1", "units": 2, "grade": 1.25},
+        ]},
+    ]},
+    "2": {"name": "Ben", "id": 2, "periods": [
+        {"year_level": 1, "semester": 1, "courses": [{"name": "CS 11", "units": 3, "grade": 5}]},
+    ]},
+}
+
+
+def quiet(func, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+def gwas(system):
+    # Every period GWA and overall GWA of the registry
+    result = {}
+    for student_id in system.students:
+        student = system.get_student(student_id)
+        result[student_id] = (student.compute_overall_gwa(),
+                              sorted((key, period.compute_gwa()) for key, period in student.periods.items()))
+    return result
+
+
+def courses(system):
+    # Every course as (student, name, units, grade), ints and floats alike
+    return sorted((student_id, course.name, course.units, course.grade)
+                  for student_id in system.students
+                  for period in system.get_student(student_id).periods.values()
+                  for course in period.courses)
+
+
+class BinaryRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.json_name = os.path.join(self.directory.name, "students_data.json")
+        with open(self.json_name, "w") as f:
+            json.dump(REGISTRY, f)
+
+    def tearDown(self):
+        self.directory.cleanup()
+        AcademicPeriod.use_course_store = False
+
+    def test_mixed_grades_survive_json_binary_json(self):
+        original = quiet(StudentSystem, self.json_name)
+        expected_gwas, expected_courses = gwas(original), courses(original)
+        self.assertAlmostEqual(expected_gwas[1][1][0][1], 2.0)   # 3 and 1.0 count, INC does not
+
+        binary_name = os.path.join(self.directory.name, "students_data.bin")
+        quiet(original.convert, binary_name)
+        binary = quiet(StudentSystem, binary_name)
+        self.assertEqual(gwas(binary), expected_gwas)
+        self.assertEqual(courses(binary), expected_courses)
+
+        back_name = os.path.join(self.directory.name, "back.json")
+        quiet(binary.convert, back_name)
+        back = quiet(StudentSystem, back_name)
+        self.assertEqual(gwas(back), expected_gwas)
+        self.assertEqual(courses(back), expected_courses)
+
+    def test_course_store_gives_the_same_gwas(self):
+        expected = gwas(quiet(StudentSystem, self.json_name))
+        AcademicPeriod.use_course_store = True
+        self.assertEqual(gwas(quiet(StudentSystem, self.json_name)), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from academic_records import StudentSystem
+
+# Regression tests for journal replay and compaction: run with
+#   python -m unittest test_compaction    (from academic-records-system/)
+
+
+def quiet(func, *args):
+    # The system reports every change with print(); keep test output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+def summary(system):
+    # Every student as saved, for comparing two loads of the same files
+    return {student_id: system.get_student(student_id).to_dict() for student_id in system.students}
+
+
+class CompactionTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "students_data.json")
+        system = quiet(StudentSystem, self.filename)
+        for number in range(300):
+            quiet(system.add_student, f"Student {number}", number)
+            quiet(system.add_course, number, 1, 1, f"CS {number}", 3, 1.5)
+        quiet(system.compact)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def edit_during_compaction(self, filename, lazy):
+        # The menu thread keeps hydrating students while the compaction
+        # thread swaps in a new snapshot; no read may see the new file with
+        # the old offsets
+        system = quiet(StudentSystem, filename, None, lazy, 8)
+        system.compact_threshold = 200
+        rng = random.Random(7)
+        for step in range(2000):
+            student_id = rng.randrange(300)
+            self.assertIsNotNone(system.get_student(student_id))
+            quiet(system.add_course, student_id, 1 + step % 4, 2, f"ENG {step}", 1, 2.0)
+            if step % 50 == 0:
+                quiet(system.save_data)
+        quiet(system.save_data)
+        system.wait_for_compaction()
+
+        expected = summary(system)
+        self.assertEqual(summary(quiet(StudentSystem, filename, None, True)), expected)
+        self.assertEqual(summary(quiet(StudentSystem, filename)), expected)
+        # Lazy listings come from the snapshot index without loading students
+        self.assertEqual(list(system.student_lines()), list(quiet(StudentSystem, filename).student_lines()))
+
+    def test_lazy_reads_during_background_compaction(self):
+        self.edit_during_compaction(self.filename, True)
+
+    def test_binary_reads_during_background_compaction(self):
+        binary_name = os.path.join(self.directory.name, "students_data.bin")
+        quiet(quiet(StudentSystem, self.filename).convert, binary_name)
+        self.edit_during_compaction(binary_name, False)
+
+
+class JournalTest(unittest.TestCase):
+    def test_names_with_unicode_line_breaks(self):
+        # U+2028 and U+0085 are written unescaped; they must not split a journal entry
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "students_data.json")
+            system = quiet(StudentSystem, filename)
+            for student_id, name in ((1, "Jos\u00e9\u2028Cruz"), (2, "Ana\u0085Reyes")):
+                quiet(system.add_student, name, student_id)
+                quiet(system.add_course, student_id, 1, 1, f"CS\u2028{student_id}", 3, 1.5)
+            quiet(system.save_data)
+
+            expected = summary(system)
+            self.assertEqual(len(expected), 2)
+            self.assertEqual(summary(quiet(StudentSystem, filename)), expected)
+            self.assertEqual(summary(quiet(StudentSystem, filename, None, True)), expected)
+
+    def test_compaction_empties_the_journal(self):
+        # Entries the new snapshot holds are not kept in the journal
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "students_data.json")
+            system = quiet(StudentSystem, filename)
+            for student_id in range(1, 51):
+                quiet(system.add_student, f"Student {student_id}", student_id)
+            quiet(system.save_data)
+            quiet(system.compact)
+            quiet(system.add_student, "Late", 99)
+            quiet(system.save_data)
+
+            with open(os.path.join(directory, "students_data.journal"), "rb") as f:
+                self.assertEqual(len(f.read().splitlines()), 2)   # header and the one later entry
+            self.assertEqual(len(quiet(StudentSystem, filename).students), 51)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import unittest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "academic_records.py")
+
+# Runs the menu as a user would, answers piped to stdin: run with
+#   python -m unittest test_menu    (from academic-records-system/)
+
+
+def run_menu(answers, *args):
+    return subprocess.run([sys.executable, SCRIPT, *args], input="\n".join(answers) + "\n",
+                          capture_output=True, text=True, timeout=60)
+
+
+class SQLiteMenuTest(unittest.TestCase):
+    def test_exit_saves_and_closes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            db_file = os.path.join(directory, "s.db")
+            result = run_menu(["1", "Ana", "7", "5"], "--sqlite", db_file)
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertIn("Goodbye!", result.stdout)
+
+            connection = sqlite3.connect(db_file)
+            self.assertEqual(connection.execute("SELECT id, name FROM students").fetchall(), [(7, "Ana")])
+            connection.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
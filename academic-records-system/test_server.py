@@ -0,0 +1,75 @@
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from academic_records import StudentSystem
+from server import StudentServer
+
+# The server's writer task: run with
+#   python -m unittest test_server    (from academic-records-system/)
+
+
+def quiet(func, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+def add_course(course, student_id=1):
+    return {"op": "add_course", "student_id": student_id, "name": "Ana",
+            "year_level": 1, "semester": 1, "course": course, "units": 3, "grade": 1.5}
+
+
+def course_names(system, student_id=1):
+    student = system.get_student(student_id)
+    return [course.name for period in student.periods.values() for course in period.courses]
+
+
+class WriterTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "students_data.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_failed_journal_append_keeps_the_batch(self):
+        system = quiet(StudentSystem, self.filename)
+        append_journal = system.append_journal
+        failures = [OSError("disk full")]
+
+        def flaky_append(entries):
+            if failures:
+                raise failures.pop()
+            append_journal(entries)
+
+        system.append_journal = flaky_append
+
+        async def scenario():
+            server = StudentServer(system)
+            writer = asyncio.create_task(server.writer())
+            failed = await server.handle(add_course("CS 11"))
+            pending_after_failure = len(system.pending)
+            saved = await server.handle(add_course("CS 12"))
+            writer.cancel()
+            return failed, pending_after_failure, saved
+
+        failed, pending_after_failure, saved = quiet(asyncio.run, scenario())
+        self.assertFalse(failed["ok"])
+        self.assertIn("disk full", failed["error"])
+        self.assertGreater(pending_after_failure, 0)   # back in pending, not lost
+        self.assertTrue(saved["ok"])
+        self.assertEqual(system.pending, [])
+
+        # The retried entries reached the journal ahead of the later batch
+        reloaded = quiet(StudentSystem, self.filename)
+        self.assertEqual(course_names(reloaded), ["CS 11", "CS 12"])
+        self.assertEqual(course_names(reloaded), course_names(system))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+# Peak RSS of loading a synthetic registry with ~1M courses, comparing
+# dict-backed Course objects (the old layout), slotted Course objects and
+# the per-period CourseStore. Each mode runs in its own process so peaks
+# do not leak between measurements. Because freed parser memory is rarely
+# returned to the OS, the memory still held by the loaded objects is also
+# reported from tracemalloc (run separately, as tracing slows loading).
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "academic-records-system"))
+
+MODES = ("dict", "slots", "store")
+COURSE_NAMES = [f"{dept} {number}" for dept in ("CMSC", "MATH", "PHYS", "STAT", "ENG") for number in range(1, 201)]
+GRADES = [1.0, 1.25, 1.5, 1.75, 2.0, 2.25, 2.5, 2.75, 3.0, 4.0, 5.0, "INC"]
+
+
+def generate(filename, course_count, seed=2025):
+    # Students with 8 periods of 6 three-unit courses each
+    rng = random.Random(seed)
+    per_student = 8 * 6
+    data = {}
+    for i in range((course_count + per_student - 1) // per_student):
+        student_id = 202400000 + i
+        periods = []
+        for year_level in range(1, 5):
+            for semester in (1, 2):
+                courses = [
+                    {"name": rng.choice(COURSE_NAMES), "units": 3, "grade": rng.choice(GRADES)}
+                    for _ in range(6)
+                ]
+                periods.append({"year_level": year_level, "semester": semester, "courses": courses})
+        data[str(student_id)] = {"name": f"Student {i}", "id": student_id, "periods": periods}
+    with open(filename, "w") as f:
+        json.dump(data, f)
+
+
+def current_rss_kb():
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def measure(mode, filename, traced):
+    import academic_records as ar
+
+    if mode == "dict":
+        # A subclass without __slots__ gets a per-instance __dict__ again
+        class DictCourse(ar.Course):
+            pass
+
+        ar.Course.from_dict = staticmethod(lambda data: DictCourse(data['name'], data['units'], data['grade']))
+    elif mode == "store":
+        ar.AcademicPeriod.use_course_store = True
+
+    # Parse the JSON every time: a startup cache written by an earlier mode
+    # would build slotted courses for all of them, and writing one adds to the peak
+    ar.cache.load = lambda *args: None
+    ar.cache.save = lambda *args: None
+
+    if traced:
+        tracemalloc.start()
+    system = ar.StudentSystem(filename)
+    courses = sum(len(p.courses) for s in system.students.values() for p in s.periods.values())
+    result = {
+        "mode": mode,
+        "courses": courses,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "retained_rss_kb": current_rss_kb(),
+    }
+    if traced:
+        result["retained_traced_kb"] = tracemalloc.get_traced_memory()[0] // 1024
+    print(json.dumps(result))
+
+
+def run_mode(mode, filename, traced=False):
+    command = [sys.executable, __file__, "--measure", mode, "--file", filename]
+    if traced:
+        command.append("--traced")
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Course storage memory benchmark")
+    parser.add_argument("--courses", type=int, default=1_000_000)
+    parser.add_argument("--measure", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--file", help=argparse.SUPPRESS)
+    parser.add_argument("--traced", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.measure, args.file, args.traced)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "students_data.json")
+        generate(filename, args.courses)
+        print(f"{'mode':<8}{'courses':>10}{'peak RSS MB':>14}{'final RSS MB':>14}{'objects MB':>12}")
+        for mode in MODES:
+            result = run_mode(mode, filename)
+            traced = run_mode(mode, filename, traced=True)
+            print(f"{mode:<8}{result['courses']:>10}"
+                  f"{result['peak_rss_kb'] / 1024:>14.1f}{result['retained_rss_kb'] / 1024:>14.1f}"
+                  f"{traced['retained_traced_kb'] / 1024:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
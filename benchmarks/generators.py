@@ -0,0 +1,102 @@
+import argparse
+import json
+import random
+
+# Seeded generators for realistic data files of every app. Files are
+# streamed record by record, so even 10M records never sit in memory.
+# The same seed and count always give byte-identical files.
+#
+#   python benchmarks/generators.py students 100000 students_data.json
+#   python benchmarks/generators.py tasks 1000000 tasks.json --seed 7
+
+FIRST_NAMES = ["Maria", "Jose", "Ana", "Juan", "Grace", "Mark", "Joy", "Paolo", "Liza", "Carlo",
+               "Bea", "Miguel", "Rica", "Andres", "Nina", "Rafael", "Ella", "Jun", "Tess", "Gabriel"]
+LAST_NAMES = ["Santos", "Reyes", "Cruz", "Bautista", "Garcia", "Mendoza", "Torres", "Flores",
+              "Villanueva", "Ramos", "Potot", "Aquino", "Castillo", "Navarro", "Dela Cruz", "Lim"]
+COURSE_NAMES = [f"{dept} {number}" for dept in ("CMSC", "MATH", "PHYS", "STAT", "ENG", "HIST", "CHEM")
+                for number in range(1, 151)]
+GRADES = [1.0, 1.25, 1.5, 1.75, 2.0, 2.25, 2.5, 2.75, 3.0, 5.0, "INC"]
+GRADE_WEIGHTS = [6, 9, 12, 13, 13, 11, 9, 7, 6, 3, 2]
+TASK_WORDS = ["review", "write", "fix", "email", "plan", "study", "clean", "submit", "call", "update",
+              "report", "slides", "budget", "notes", "code", "tests", "draft", "groceries", "lab", "thesis"]
+PRIORITIES = ["High", "Medium", "Low"]
+
+
+def person_name(rng, number):
+    # Names repeat across a large file; the number keeps them unique
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {number}"
+
+
+def student_record(rng, student_id):
+    # 1 to 8 periods in order, 3 to 7 three-unit courses each (never over 21 units)
+    periods = []
+    for year_level, semester in [(y, s) for y in range(1, 5) for s in (1, 2)][:rng.randint(1, 8)]:
+        courses = [
+            {"name": name, "units": 3, "grade": rng.choices(GRADES, GRADE_WEIGHTS)[0]}
+            for name in rng.sample(COURSE_NAMES, rng.randint(3, 7))
+        ]
+        periods.append({"year_level": year_level, "semester": semester, "courses": courses})
+    return {"name": person_name(rng, student_id), "id": student_id, "periods": periods}
+
+
+def write_students(filename, count, seed=2025):
+    # students_data.json in the one-student-per-line layout save_data writes
+    rng = random.Random(seed)
+    with open(filename, "w") as f:
+        f.write("{")
+        for number in range(count):
+            student_id = 202400000 + number
+            f.write("," if number else "")
+            f.write(f'\n"{student_id}": {json.dumps(student_record(rng, student_id))}')
+        f.write("\n}\n")
+
+
+def write_tasks(filename, count, seed=2025):
+    # tasks.json as a list of tasks with stable ids
+    rng = random.Random(seed)
+    with open(filename, "w") as f:
+        f.write("[")
+        for task_id in range(1, count + 1):
+            task = {
+                "id": task_id,
+                "task": " ".join(rng.sample(TASK_WORDS, rng.randint(2, 4))),
+                "done": rng.random() < 0.3,
+                "priority": rng.choices(PRIORITIES, [2, 5, 3])[0],
+            }
+            f.write(",\n    " if task_id > 1 else "\n    ")
+            f.write(json.dumps(task))
+        f.write("\n]")
+
+
+def write_contacts(filename, count, seed=2025):
+    # contacts.json mapping lowercase names to normalized phone numbers
+    rng = random.Random(seed)
+    with open(filename, "w") as f:
+        f.write("{")
+        for number in range(count):
+            name = person_name(rng, number).lower()
+            phone = f"9{rng.randrange(10**9):09d}"
+            f.write(",\n    " if number else "\n    ")
+            f.write(f"{json.dumps(name)}: {json.dumps(phone)}")
+        f.write("\n}")
+
+
+GENERATORS = {
+    "students": write_students,
+    "tasks": write_tasks,
+    "contacts": write_contacts,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic data file")
+    parser.add_argument("kind", choices=GENERATORS)
+    parser.add_argument("count", type=int, help="number of students, tasks or contacts")
+    parser.add_argument("filename")
+    parser.add_argument("--seed", type=int, default=2025)
+    args = parser.parse_args()
+    GENERATORS[args.kind](args.filename, args.count, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import os
+import sys
+import time
+
+# Throughput of the listing paths rendered to /dev/null: one print() per
+# line (the old behaviour) against the buffered common.render layer.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for project in ("academic-records-system", "todo-app", "contact-list"):
+    sys.path.insert(0, os.path.join(ROOT, project))
+
+import academic_records as ar
+import contacts as contact_app
+import todo as todo_app
+from common.render import render
+from task_list import TaskList
+
+
+def build_data(count):
+    students = {}
+    for i in range(count):
+        student = ar.Student(f"Student {i}", 202400000 + i)
+        period = student.get_or_create_period(1, 1)
+        period._append_course(ar.Course("CMSC 11", 3, 1.5))
+        period._append_course(ar.Course("MATH 18", 3, "INC"))
+        students[student.id] = student
+    system = ar.StudentSystem.__new__(ar.StudentSystem)
+    system.students = students
+
+    tasks = TaskList({'id': i, 'task': f"task {i}", 'done': i % 3 == 0,
+                      'priority': ('High', 'Medium', 'Low')[i % 3]} for i in range(1, count + 1))
+    contacts = {f"contact {i}": f"9{i:09d}" for i in range(count)}
+    return {
+        "list_students": lambda: system.student_lines(),
+        "show_summary": lambda: (line for s in students.values() for line in s.summary_lines()),
+        "view_tasks": lambda: todo_app.task_lines(tasks),
+        "view_contacts": lambda: contact_app.contact_lines(contacts),
+    }
+
+
+def print_each(lines):
+    for line in lines:
+        print(line)
+
+
+def time_path(write, make_lines):
+    saved = sys.stdout
+    with open(os.devnull, "w") as devnull:
+        sys.stdout = devnull
+        try:
+            start = time.perf_counter()
+            write(make_lines())
+            elapsed = time.perf_counter() - start
+        finally:
+            sys.stdout = saved
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Listing render throughput")
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+
+    paths = build_data(args.records)
+    print(f"{'path':<16}{'lines':>10}{'print/line s':>14}{'buffered s':>12}{'lines/s buffered':>18}")
+    for name, make_lines in paths.items():
+        line_count = sum(1 for _ in make_lines())
+        naive = time_path(print_each, make_lines)
+        buffered = time_path(render, make_lines)
+        print(f"{name:<16}{line_count:>10}{naive:>14.3f}{buffered:>12.3f}{line_count / buffered:>18,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+# Load generator for academic-records-system/server.py. Starts the server
+# on a Unix socket over a synthetic registry, runs many concurrent client
+# connections sending a mix of reads and add_course writes, and reports
+# requests/sec with p50/p99 latency per request type. For contrast it also
+# times one lookup done the old way, by starting academic_records.py.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT = os.path.join(ROOT, "academic-records-system")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from course_memory import generate
+
+READ_OPS = ("get_student", "period_gwa", "overall_gwa")
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q / 100))]
+
+
+async def client(socket_path, requests, student_ids, write_ratio, latencies, seed):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    for number in range(requests):
+        if rng.random() < write_ratio:
+            op = "add_course"
+            request = {"op": op, "student_id": 900000000 + seed * requests + number, "name": "Load Test",
+                       "year_level": 1, "semester": 1, "course": "CMSC 11", "units": 3, "grade": 1.5}
+        else:
+            op = rng.choice(READ_OPS)
+            request = {"op": op, "student_id": rng.choice(student_ids), "year_level": 1, "semester": 1}
+        start = time.perf_counter()
+        writer.write(json.dumps(request).encode() + b"\n")
+        response = json.loads(await reader.readline())
+        latencies[op].append(time.perf_counter() - start)
+        if not response["ok"]:
+            raise RuntimeError(f"{request} failed: {response['error']}")
+    writer.close()
+
+
+async def run_load(socket_path, connections, requests, student_ids, write_ratio):
+    latencies = {op: [] for op in READ_OPS + ("add_course",)}
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(socket_path, requests // connections, student_ids, write_ratio, latencies, seed)
+        for seed in range(connections)
+    ))
+    return time.perf_counter() - start, latencies
+
+
+def wait_for(path, process, timeout=60):
+    deadline = time.time() + timeout
+    while not os.path.exists(path):
+        if process.poll() is not None or time.time() > deadline:
+            raise RuntimeError("server did not start")
+        time.sleep(0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Student server latency and throughput")
+    parser.add_argument("--courses", type=int, default=100_000, help="courses in the synthetic registry")
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=50_000, help="total requests over all connections")
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="share of requests that add a course")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "students_data.json")
+        socket_path = os.path.join(tmp, "students.sock")
+        generate(filename, args.courses)
+        with open(filename) as f:
+            student_ids = [int(student_id) for student_id in json.load(f)]
+
+        # The old way: a new process parsing the registry for each lookup
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(PROJECT, "academic_records.py"), "--file", filename,
+                        "--summary", str(student_ids[0])], check=True, capture_output=True)
+        spawn_seconds = time.perf_counter() - start
+
+        server = subprocess.Popen([sys.executable, os.path.join(PROJECT, "server.py"),
+                                   "--file", filename, "--socket", socket_path],
+                                  stdout=subprocess.PIPE, text=True)
+        try:
+            wait_for(socket_path, server)
+            elapsed, latencies = asyncio.run(
+                run_load(socket_path, args.connections, args.requests, student_ids, args.write_ratio)
+            )
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server_output = server.communicate()[0].strip().splitlines()
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"{len(student_ids)} students, {args.connections} connections, {total} requests "
+          f"({args.write_ratio:.0%} writes) in {elapsed:.2f}s: {total / elapsed:,.0f} requests/sec")
+    print(f"{'request':<14}{'count':>8}{'p50 ms':>10}{'p99 ms':>10}")
+    for op, values in latencies.items():
+        values.sort()
+        print(f"{op:<14}{len(values):>8}{percentile(values, 50) * 1000:>10.2f}{percentile(values, 99) * 1000:>10.2f}")
+    if server_output:
+        print(f"server: {server_output[-1]}")
+    print(f"one lookup by starting academic_records.py: {spawn_seconds * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
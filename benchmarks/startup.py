@@ -0,0 +1,171 @@
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Startup time of the three apps as a scripted user sees it: a new
+# interpreter running one non-interactive command on generated data.
+#
+#   import  the app module alone, from `python -X importtime`
+#   cold    the command with no startup cache (the first run after the data changed)
+#   warm    the same command again, with the cache written by the cold run
+#
+# Results use the suite.py JSON format, so a gain can be held:
+#
+#   python benchmarks/startup.py --size 20000 --output before.json
+#   python benchmarks/startup.py --size 20000 --output after.json --compare before.json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generators import write_contacts, write_students, write_tasks
+from suite import compare, git_commit
+
+# app -> (project directory, module, generator, data file name)
+APPS = {
+    "students": ("academic-records-system", "academic_records", write_students, "students_data.json"),
+    "tasks": ("todo-app", "todo", write_tasks, "tasks.json"),
+    "contacts": ("contact-list", "contacts", write_contacts, "contacts.json"),
+}
+
+
+def command_code(app, filename):
+    # One lookup or a one-line listing, pointed at the generated file
+    if app == "students":
+        argv = ["academic_records.py", "--file", filename, "--summary", "202400000"]
+        setup = ""
+    elif app == "tasks":
+        argv = ["todo.py", "--list", "--limit", "1"]
+        setup = f"app.storage = app.JsonLinesStorage({filename!r}, {filename + 'l'!r}); "
+    else:
+        argv = ["contacts.py", "--list", "--limit", "1"]
+        setup = (f"app.CONTACTS_FILE = {filename!r}; app.SHARD_DIR = {filename + '.shards'!r}; "
+                 f"app.INDEX_FILE = {filename + '.index'!r}; ")
+    return f"import sys; sys.argv = {argv!r}; import {APPS[app][1]} as app; {setup}app.main()"
+
+
+def environment():
+    # Measure with compiled .pyc files, as users run the apps
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def run(args, cwd, env):
+    start = time.perf_counter()
+    result = subprocess.run(args, cwd=cwd, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{result.stderr}")
+    return elapsed, result.stderr
+
+
+def import_times(stderr, module):
+    # (cumulative seconds of module, [(seconds, name)] of its direct imports)
+    # A module's line comes right after the lines of everything it imported
+    total = None
+    children = pending = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        seconds = int(cumulative) / 1e6
+        if not name.startswith("   "):
+            if name.strip() == module:
+                total, children = seconds, pending
+            pending = []
+        elif not name.startswith("     "):
+            pending.append((seconds, name.strip()))
+    return total, children
+
+
+def cache_files(app, filename):
+    # Startup caches of the app's data files
+    if app == "contacts":
+        return glob.glob(os.path.join(filename + ".shards", "*.cache"))
+    return [name for name in (filename + ".cache",) if os.path.exists(name)]
+
+
+def measure(app, directory, repeat, env):
+    project, module, _, data_name = APPS[app]
+    cwd = os.path.join(ROOT, project)
+    filename = os.path.join(directory, data_name)
+    code = command_code(app, filename)
+
+    run([sys.executable, "-c", f"import {module}"], cwd, env)   # writes the .pyc files
+    if app == "contacts":
+        run([sys.executable, "-c", code], cwd, env)   # moves contacts.json into shards
+    imports, cold, warm = [], [], []
+    slowest = []
+    for _ in range(repeat):
+        elapsed, stderr = run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd, env)
+        total, slowest = import_times(stderr, module)
+        imports.append(total if total is not None else elapsed)
+        for cache_file in cache_files(app, filename):
+            os.remove(cache_file)
+        cold.append(run([sys.executable, "-c", code], cwd, env)[0])
+        warm.append(run([sys.executable, "-c", code], cwd, env)[0])
+
+    results = [
+        {"app": app, "case": case, "size": None, "median_s": statistics.median(times),
+         "min_s": min(times), "stdev_s": statistics.stdev(times) if len(times) > 1 else 0.0}
+        for case, times in (("import", imports), ("cold", cold), ("warm", warm))
+    ]
+    return results, sorted(slowest, reverse=True)[:5]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup benchmark for all three apps")
+    parser.add_argument("--size", type=int, default=10000, help="students, tasks or contacts to generate")
+    parser.add_argument("--apps", default=",".join(APPS), help="comma-separated apps to run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=2025)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="earlier results JSON to compare medians against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="ratio change reported as a regression")
+    args = parser.parse_args()
+
+    env = environment()
+    results = []
+    print(f"{'app':<10}{'case':<10}{'size':>10}{'median ms':>12}{'min ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for app in args.apps.split(","):
+            _, _, generate, data_name = APPS[app]
+            generate(os.path.join(tmp, data_name), args.size, args.seed)
+            app_results, slowest = measure(app, tmp, args.repeat, env)
+            for result in app_results:
+                result["size"] = args.size
+                results.append(result)
+                print(f"{app:<10}{result['case']:<10}{args.size:>10}{result['median_s'] * 1000:>12.1f}"
+                      f"{result['min_s'] * 1000:>10.1f}")
+            print("          slowest imports: " + ", ".join(f"{name} {seconds * 1000:.1f} ms"
+                                                       for seconds, name in slowest))
+
+    if args.output:
+        report = {
+            "meta": {
+                "commit": git_commit(),
+                "python": sys.version.split()[0],
+                "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "repeat": args.repeat,
+                "seed": args.seed,
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
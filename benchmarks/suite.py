@@ -0,0 +1,461 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Load, save, query and render timings for all three apps on generated data,
+# with the tracemalloc peak of each case. Every case runs `--warmup` untimed
+# rounds, then `--repeat` timed ones; results are written as JSON so two
+# commits can be compared:
+#
+#   python benchmarks/suite.py --sizes 1000,100000 --output before.json
+#   python benchmarks/suite.py --sizes 1000,100000 --output after.json --compare before.json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+for project in ("academic-records-system", "todo-app", "contact-list"):
+    sys.path.insert(0, os.path.join(ROOT, project))
+
+import academic_records as ar
+import contacts as contact_app
+import todo as todo_app
+from common.batch import import_file
+from common.render import render
+from contact_index import ContactIndex
+from generators import write_contacts, write_students, write_tasks
+from task_list import TaskList
+from task_storage import JsonLinesStorage
+
+QUERIES = 1000
+
+
+def quiet(func, *args):
+    # The apps report progress with print(); keep it out of the measurements
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        return func(*args)
+
+
+def render_to_devnull(lines):
+    with open(os.devnull, "w") as devnull:
+        render(lines, stream=devnull)
+
+
+class Workspace:
+    # Generated files and loaded data for one size, shared by that size's cases
+    def __init__(self, directory, size, seed):
+        self.directory = directory
+        self.size = size
+        self.seed = seed
+        self.loaded = {}
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def source(self, kind):
+        # Generate each data file once per size
+        filename = self.path(f"{kind}.json")
+        if not os.path.exists(filename):
+            {"students": write_students, "tasks": write_tasks, "contacts": write_contacts}[kind](
+                filename, self.size, self.seed)
+        return filename
+
+    def scratch(self, kind):
+        # A fresh copy of a data file that a case may change, without its journal
+        filename = self.path(f"scratch-{kind}.json")
+        shutil.copyfile(self.source(kind), filename)
+        for leftover in (filename[:-5] + ".journal", filename + "l"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+        return filename
+
+    def get(self, key, build):
+        if key not in self.loaded:
+            self.loaded[key] = build()
+        return self.loaded[key]
+
+    def system(self):
+        return self.get("system", lambda: quiet(ar.StudentSystem, self.source("students")))
+
+    def binary(self):
+        # The students file converted to a binary snapshot
+        def build():
+            filename = self.path("students.bin")
+            quiet(self.system().convert, filename)
+            return filename
+        return self.get("binary", build)
+
+    def tasks(self):
+        def build():
+            storage = JsonLinesStorage(self.source("tasks"), self.path("tasks-readonly.jsonl"))
+            return TaskList(storage.load())
+        return self.get("tasks", build)
+
+    def contact_shards(self):
+        # The contacts file moved into a shard directory once per size
+        def build():
+            contact_app.CONTACTS_FILE = self.source("contacts")
+            contact_app.SHARD_DIR = self.path("contacts-shards")
+            quiet(contact_app.load_contacts)
+            return contact_app.SHARD_DIR
+        return self.get("contact_shards", build)
+
+    def contacts(self):
+        def build():
+            contact_app.SHARD_DIR = self.contact_shards()
+            return contact_app.load_contacts().load_all()
+        return self.get("contacts", build)
+
+    def index(self):
+        return self.get("index", lambda: ContactIndex.build(self.contacts()))
+
+    def queries(self, names):
+        # The same query words for every run of a size
+        rng = random.Random(self.seed)
+        return [rng.choice(names) for _ in range(QUERIES)]
+
+
+# Students
+
+def students_load(ws):
+    filename = ws.source("students")
+    return lambda: quiet(ar.StudentSystem, filename)
+
+
+def students_load_lazy(ws):
+    filename = ws.source("students")
+    return lambda: quiet(ar.StudentSystem, filename, None, True)
+
+
+def students_load_binary(ws):
+    filename = ws.binary()
+    return lambda: quiet(ar.StudentSystem, filename)
+
+
+def students_lookup_binary(ws):
+    # QUERIES get_student calls on a freshly opened binary snapshot
+    filename = ws.binary()
+    student_ids = ws.queries(list(ws.system().students))
+
+    def run():
+        system = quiet(ar.StudentSystem, filename)
+        return [system.get_student(student_id) for student_id in student_ids]
+    return run
+
+
+def students_save(ws):
+    system = ws.system()
+    system.filename = ws.scratch("students")
+    system.journal_filename = system.filename + ".journal"
+    return system.compact
+
+
+def students_import(ws):
+    # --import of one CSV row per course of the registry (about 22 per student)
+    # into an empty registry; rows are validated and queued, not saved
+    rows = ws.path("courses.csv")
+    if not os.path.exists(rows):
+        with open(rows, "w") as f:
+            f.write("student_id,name,year_level,semester,course,units,grade\n")
+            for student in ws.system().students.values():
+                for period in student.periods.values():
+                    for course in period.courses:
+                        f.write(f"{student.id},{student.name},{period.year_level},{period.semester},"
+                                f"{course.name},{course.units},{course.grade}\n")
+
+    def run():
+        system = quiet(ar.StudentSystem, ws.path("import-target.json"))
+        with open(os.devnull, "w") as devnull:
+            importer = ar.CourseImport(system)
+            quiet(import_file, rows, importer.add_row, None, 50, devnull)
+            importer.finish()
+    return run
+
+
+def students_index_build(ws):
+    system = ws.system()
+    return lambda: ar.StudentIndex.build(system.students)
+
+
+def students_query(ws):
+    # QUERIES indexed queries: by course, by course and status, by name word
+    system = ws.system()
+    system.query(name="")   # builds the index outside the timing
+    courses = ws.queries(sorted({course.name for student in system.students.values()
+                                 for period in student.periods.values() for course in period.courses}))
+    words = ws.queries(sorted({student.name.split()[0] for student in system.students.values()}))
+
+    def run():
+        for i, (course, word) in enumerate(zip(courses, words)):
+            if i % 3 == 0:
+                system.query(course=course)
+            elif i % 3 == 1:
+                system.query(course=course, status="Failed")
+            else:
+                system.query(name=word)
+    return run
+
+
+def students_overall_gwa(ws):
+    students = list(ws.system().students.values())
+    return lambda: [student.compute_overall_gwa() for student in students]
+
+
+def students_period_gwa(ws):
+    periods = [period for student in ws.system().students.values() for period in student.periods.values()]
+    return lambda: [period.compute_gwa() for period in periods]
+
+
+def students_list_render(ws):
+    system = ws.system()
+    return lambda: render_to_devnull(system.student_lines())
+
+
+def students_summary_render(ws):
+    students = list(ws.system().students.values())
+    return lambda: render_to_devnull(line for student in students for line in student.summary_lines())
+
+
+# Tasks
+
+def tasks_load(ws):
+    filename = ws.source("tasks")
+    journal = ws.path("tasks-readonly.jsonl")
+    return lambda: TaskList(JsonLinesStorage(filename, journal).load())
+
+
+def tasks_view_render(ws):
+    tasks = ws.tasks()
+    return lambda: render_to_devnull(todo_app.task_lines(tasks))
+
+
+def tasks_add(ws):
+    # QUERIES single-task saves, each an fsynced journal append
+    filename = ws.scratch("tasks")
+    storage = JsonLinesStorage(filename, filename + "l")
+    storage.load()
+
+    def run():
+        for number in range(QUERIES):
+            storage.add_task({"task": f"benchmark {number}", "done": False, "priority": "Medium"})
+    return run
+
+
+# Contacts
+
+def contacts_load(ws):
+    directory = ws.contact_shards()
+
+    def run():
+        contact_app.SHARD_DIR = directory
+        return contact_app.load_contacts().load_all()
+    return run
+
+
+def contacts_find(ws):
+    # QUERIES lookups, each in a fresh start that reads only the shard it needs
+    directory = ws.contact_shards()
+    names = ws.queries(list(ws.contacts()))
+
+    def run():
+        contact_app.SHARD_DIR = directory
+        return [contact_app.load_contacts().get(name) for name in names]
+    return run
+
+
+def contacts_save_one(ws):
+    # One changed contact saved, which rewrites only its shard
+    directory = ws.path("contacts-scratch")
+    shutil.rmtree(directory, ignore_errors=True)
+    shutil.copytree(ws.contact_shards(), directory)
+    contact_app.SHARD_DIR = directory
+    contacts = contact_app.load_contacts()
+    name = ws.queries(list(ws.contacts()))[0]
+
+    def run():
+        contacts[name] = "5550100"
+        contacts.save()
+    return run
+
+
+def contacts_index_build(ws):
+    contacts = ws.contacts()
+    return lambda: ContactIndex.build(contacts)
+
+
+def contacts_phone_lookup(ws):
+    index = ws.index()
+    phones = ws.queries(list(ws.contacts().values()))
+    return lambda: [index.lookup_phone(phone) for phone in phones]
+
+
+def contacts_prefix_search(ws):
+    index = ws.index()
+    prefixes = [name[:4] for name in ws.queries(index.names)]
+    return lambda: [index.prefix_search(prefix) for prefix in prefixes]
+
+
+def contacts_fuzzy_search(ws):
+    index = ws.index()
+    # One dropped letter in every query
+    typos = [name[:3] + name[4:] for name in ws.queries(index.names)]
+    return lambda: [index.search(typo) for typo in typos]
+
+
+def contacts_view_render(ws):
+    contacts = ws.contacts()
+    return lambda: render_to_devnull(contact_app.contact_lines(contacts))
+
+
+# Each case takes the workspace and returns the function to time
+CASES = {
+    "students": {
+        "load": students_load,
+        "load_lazy": students_load_lazy,
+        "load_binary": students_load_binary,
+        "lookup_binary_1000": students_lookup_binary,
+        "save": students_save,
+        "import": students_import,
+        "index_build": students_index_build,
+        "query_1000": students_query,
+        "overall_gwa": students_overall_gwa,
+        "period_gwa": students_period_gwa,
+        "list_render": students_list_render,
+        "summary_render": students_summary_render,
+    },
+    "tasks": {
+        "load": tasks_load,
+        "view_render": tasks_view_render,
+        "add_1000": tasks_add,
+    },
+    "contacts": {
+        "load": contacts_load,
+        "find_1000": contacts_find,
+        "save_one": contacts_save_one,
+        "index_build": contacts_index_build,
+        "phone_lookup_1000": contacts_phone_lookup,
+        "prefix_search_1000": contacts_prefix_search,
+        "fuzzy_search_1000": contacts_fuzzy_search,
+        "view_render": contacts_view_render,
+    },
+}
+
+
+def measure(make_run, ws, repeat, warmup):
+    times = []
+    for round_number in range(warmup + repeat):
+        run = make_run(ws)
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        if round_number >= warmup:
+            times.append(elapsed)
+
+    # Memory in a separate round, as tracing slows everything down
+    run = make_run(ws)
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "mean_s": statistics.fmean(times),
+        "stdev_s": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "peak_kb": peak // 1024,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_file, threshold):
+    # Print median ratios against an earlier run; returns the number of regressions
+    with open(baseline_file) as f:
+        baseline = {(r["app"], r["case"], r["size"]): r for r in json.load(f)["results"]}
+    regressions = 0
+    print(f"\n--- Compared with {baseline_file} ---")
+    for result in results:
+        old = baseline.get((result["app"], result["case"], result["size"]))
+        if old is None or not old["median_s"]:
+            continue
+        ratio = result["median_s"] / old["median_s"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  SLOWER"
+            regressions += 1
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{result['app']:<10}{result['case']:<20}{result['size']:>10}{ratio:>9.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite for all three apps")
+    parser.add_argument("--sizes", default="1000,10000", help="comma-separated record counts (1k to 10M)")
+    parser.add_argument("--apps", default=",".join(CASES), help="comma-separated apps to run")
+    parser.add_argument("--cases", help="comma-separated case names to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=2025)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="earlier results JSON to compare medians against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="ratio change reported as a regression")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    apps = args.apps.split(",")
+    wanted = set(args.cases.split(",")) if args.cases else None
+
+    results = []
+    print(f"{'app':<10}{'case':<20}{'size':>10}{'median ms':>12}{'stdev ms':>10}{'peak MB':>10}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            ws = Workspace(tmp, size, args.seed)
+            for app in apps:
+                for case, make_run in CASES[app].items():
+                    if wanted and case not in wanted:
+                        continue
+                    result = {"app": app, "case": case, "size": size,
+                              **measure(make_run, ws, args.repeat, args.warmup)}
+                    results.append(result)
+                    print(f"{app:<10}{case:<20}{size:>10}{result['median_s'] * 1000:>12.2f}"
+                          f"{result['stdev_s'] * 1000:>10.2f}{result['peak_kb'] / 1024:>10.1f}")
+
+    if args.output:
+        report = {
+            "meta": {
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "repeat": args.repeat,
+                "warmup": args.warmup,
+                "seed": args.seed,
+            },
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+# Helpers shared by the mini projects. Each app adds the repository root to
+# sys.path before importing from here.
@@ -0,0 +1,112 @@
+import atexit
+import signal
+import sys
+import threading
+import time
+
+# Write-behind saving for the interactive menus.
+#
+# The app calls changed() after each change instead of saving. A background
+# thread calls save() once no change has come in for `delay` seconds, or
+# straight away when `max_changes` changes are waiting, so a burst of edits
+# costs one save and the menu never waits for the disk. flush() saves in the
+# calling thread. Saves never overlap, so they reach the disk in order.
+# Whatever is still waiting is saved when the program exits, also on
+# Ctrl+C, SIGTERM and SIGHUP.
+#
+# save() runs in the background thread: it must hold the app's own lock
+# around anything the menu may be changing at the same time, and should do
+# its disk I/O outside that lock.
+
+DEFAULT_DELAY = 1.0
+DEFAULT_MAX_CHANGES = 20
+
+
+class AutoSaver:
+    def __init__(self, save, delay=DEFAULT_DELAY, max_changes=DEFAULT_MAX_CHANGES):
+        self.save = save
+        self.delay = delay
+        self.max_changes = max_changes
+        self.pending = 0            # changes since the last save
+        self.last_change = 0.0
+        self.closed = False
+        self.condition = threading.Condition()
+        self.save_lock = threading.Lock()   # one save at a time
+        self.thread = threading.Thread(target=self.run, name="autosave", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+        exit_on_signals()
+
+    def changed(self, count=1):
+        with self.condition:
+            self.pending += count
+            self.last_change = time.monotonic()
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.closed and not self.due():
+                    if self.pending:
+                        self.condition.wait(self.last_change + self.delay - time.monotonic())
+                    else:
+                        self.condition.wait()
+                if self.closed:
+                    return
+            if not self.flush():
+                # Try again after a pause rather than in a tight loop
+                with self.condition:
+                    self.condition.wait(max(self.delay, 1.0))
+
+    def due(self):
+        return self.pending >= self.max_changes or (
+            self.pending and time.monotonic() >= self.last_change + self.delay)
+
+    def flush(self, save=None):
+        # Save now in this thread if anything changed; a given save function always runs.
+        # Returns False if saving failed (the changes stay pending).
+        with self.save_lock:
+            with self.condition:
+                count, self.pending = self.pending, 0
+            if not count and save is None:
+                return True
+            try:
+                (save or self.save)()
+            except Exception as e:
+                print(f"Error saving data: {e}", file=sys.stderr)
+                with self.condition:
+                    self.pending += count
+                return False
+            return True
+
+    def close(self):
+        # Stop the background thread and save whatever is still waiting
+        with self.condition:
+            if self.closed:
+                return
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
+        self.flush()
+
+
+def exit_on_signal(signum, frame):
+    # A normal exit, so atexit handlers (and the final save) still run
+    sys.exit(128 + signum)
+
+
+def exit_on_signals():
+    # Only the main thread may set handlers; never replace one the app installed
+    if threading.current_thread() is not threading.main_thread():
+        return
+    for name in ("SIGTERM", "SIGHUP"):
+        signum = getattr(signal, name, None)   # Windows has no SIGHUP
+        if signum is not None and signal.getsignal(signum) == signal.SIG_DFL:
+            signal.signal(signum, exit_on_signal)
+
+
+def add_arguments(parser):
+    parser.add_argument("--autosave-delay", type=float, default=DEFAULT_DELAY, metavar="SECONDS",
+                        help=f"save this long after the last change (default: {DEFAULT_DELAY})")
+    parser.add_argument("--autosave-changes", type=int, default=DEFAULT_MAX_CHANGES, metavar="N",
+                        help=f"save at once when N changes are waiting (default: {DEFAULT_MAX_CHANGES})")
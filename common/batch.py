@@ -0,0 +1,105 @@
+import json
+import sys
+
+FORMATS = ("csv", "jsonl")
+
+
+def guess_format(filename):
+    return "jsonl" if filename.endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+
+def iter_records(file, fmt):
+    # Yield (line_number, row, error) from a CSV file with a header row or a JSON-lines file
+    if fmt == "csv":
+        import csv   # only needed for imports, so not at startup
+        # csv.reader plus zip() instead of csv.DictReader, which costs more than
+        # the rest of a row's handling; missing trailing columns are left out
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is None:
+            return
+        for row in reader:
+            yield reader.line_num, dict(zip(header, row)), None
+        return
+
+    for line_number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, None, f"invalid JSON ({e.msg})"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "expected a JSON object"
+            continue
+        yield line_number, row, None
+
+
+def import_file(filename, handle_row, fmt=None, max_errors_shown=50, stream=None):
+    """Stream rows from filename into handle_row(row).
+
+    handle_row raises ValueError (or KeyError for a missing field, or
+    TypeError for a value of the wrong type) to reject a row; the row is reported and the import carries on. Nothing is saved
+    here: callers commit once after the whole file has been read.
+    Returns (imported, errors).
+    """
+    stream = stream if stream is not None else sys.stderr
+    fmt = fmt or guess_format(filename)
+    imported = errors = 0
+
+    with open(filename, newline="") as file:
+        for line_number, row, error in iter_records(file, fmt):
+            if error is None:
+                try:
+                    handle_row(row)
+                    imported += 1
+                    continue
+                except KeyError as e:
+                    error = f"missing field {e}"
+                except (TypeError, ValueError) as e:
+                    error = str(e)
+            errors += 1
+            if errors <= max_errors_shown:
+                stream.write(f"{filename}:{line_number}: {error}\n")
+
+    if errors > max_errors_shown:
+        stream.write(f"... {errors - max_errors_shown} more error(s) not shown\n")
+    print(f"Imported {imported} row(s) with {errors} error(s) from {filename}")
+    return imported, errors
+
+
+def field(row, name, default=None):
+    # A stripped text field, or a number; blank counts as missing
+    value = row.get(name)
+    if isinstance(value, str):
+        # Every CSV field, so checked first
+        value = value.strip()
+        if value:
+            return value
+        value = None
+    if value is None:
+        if default is not None:
+            return default
+        raise KeyError(name)
+    if isinstance(value, (list, dict)):
+        raise ValueError(f"{name} must be a single value, got {value!r}")
+    return value
+
+
+def int_field(row, name, min_val=None, max_val=None):
+    value = row.get(name)
+    try:
+        # int() skips surrounding whitespace itself, so field() is only
+        # needed to tell a missing value from a bad one
+        number = int(value)
+    except (TypeError, ValueError):
+        value = field(row, name)
+        raise ValueError(f"{name} must be a whole number, got {value!r}")
+    if isinstance(value, float) and value != number:
+        raise ValueError(f"{name} must be a whole number, got {value!r}")
+    if min_val is not None and number < min_val:
+        raise ValueError(f"{name} must be at least {min_val}")
+    if max_val is not None and number > max_val:
+        raise ValueError(f"{name} must be at most {max_val}")
+    return number
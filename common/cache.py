@@ -0,0 +1,109 @@
+import contextlib
+import gc
+import marshal
+import os
+
+from common.fileio import file_version, new_digest, write_temp
+
+# Startup cache of a parsed data file, kept beside it as FILE.cache, so a
+# start skips parsing the JSON again.
+#
+# The data is stored with marshal, the fast format Python uses for .pyc
+# files. It holds only plain values (dicts, lists, tuples, strings and
+# numbers), never class references, so a cache written by a script is read
+# back the same when the app is imported as a module, and loading it never
+# runs code. Apps turn their objects into such values and back themselves.
+#
+# The cache remembers the file's version (size, mtime, inode) and the digest
+# of its content. It is used when the version still matches, or when the
+# version changed but the content did not (the file was touched or copied);
+# anything else rebuilds it. `layout` names the app's cached format: change
+# it whenever that changes, so old caches are ignored.
+
+CACHE_SUFFIX = ".cache"
+CACHE_VERSION = 1
+CHUNK_SIZE = 1 << 20
+
+# An app's main() turns on "freeze": the process keeps what it loads until it
+# exits. Code that loads and drops data (report.py workers, the benchmarks)
+# leaves it off, as frozen objects are never freed.
+settings = {"freeze": False}
+
+
+@contextlib.contextmanager
+def gc_paused():
+    # For building many objects at once. The cyclic garbage collector would
+    # otherwise walk over the new objects again and again while they are
+    # made. With settings["freeze"], they are then moved out of its way for
+    # good (gc.freeze), so the pass that was put off does not walk them either.
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            if settings["freeze"]:
+                gc.freeze()
+            gc.enable()
+
+
+def cache_name(filename):
+    return filename + CACHE_SUFFIX
+
+
+def content_digest(file):
+    # fileio.snapshot_digest() of an open binary file's whole content
+    digest = new_digest()
+    file.seek(0)
+    while chunk := file.read(CHUNK_SIZE):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load(filename, layout, file):
+    # (data, digest) cached for the content of `file`, filename opened for
+    # binary reading, or None. The file's position is left anywhere.
+    try:
+        with open(cache_name(filename), "rb") as cache:
+            header = marshal.load(cache)
+            if not isinstance(header, tuple) or len(header) != 4:
+                return None
+            version, cached_layout, stamp, digest = header
+            if version != (CACHE_VERSION, marshal.version) or cached_layout != layout:
+                return None
+            current = file_version(file)
+            if stamp != current and digest != content_digest(file):
+                return None
+            # One read, then loads(): load() on a file reads it a few bytes at a time
+            data = cache.read()
+        if stamp != current:
+            # Same content under a new version: stamp the cache again to skip the digest next time
+            write(filename, layout, current, digest, data)
+        with gc_paused():
+            return marshal.loads(data), digest
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+
+def save(filename, layout, data, stamp, digest):
+    # Cache data parsed from filename, whose version was `stamp` when it was read.
+    # A cache is only a shortcut, so failing to write one is not an error.
+    try:
+        data = marshal.dumps(data)
+    except ValueError:
+        return
+    write(filename, layout, stamp, digest, data)
+
+
+def write(filename, layout, stamp, digest, data):
+    # The header comes first, so a stale cache is rejected without reading the data.
+    # Each write gets its own temp file, as pool workers may write the same cache at once.
+    header = marshal.dumps(((CACHE_VERSION, marshal.version), layout, stamp, digest))
+    try:
+        temp_name = write_temp(cache_name(filename), header + data)
+    except OSError:
+        return
+    try:
+        os.replace(temp_name, cache_name(filename))
+    except OSError:
+        os.remove(temp_name)
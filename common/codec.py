@@ -0,0 +1,95 @@
+import importlib.util
+import json
+from typing import TypedDict, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# msgspec takes longer to import than everything else here, and a start that
+# finds a startup cache decodes nothing, so it is imported on first use
+HAVE_MSGSPEC = importlib.util.find_spec("msgspec") is not None
+msgspec = None
+
+# JSON encoding and decoding shared by the apps.
+# orjson or msgspec is used when installed and the json module otherwise;
+# all of them read each other's files. Output is compact unless pretty=True,
+# which gives the indented layout the apps always wrote before.
+# Decoding with a schema lets msgspec build the typed data while parsing.
+# The schemas accept everything the plain json path loads, and data that
+# still does not fit one is parsed again without it, so a file never fails
+# to load just because msgspec is installed; the apps' own checks apply
+# either way. Only bad JSON raises ValueError.
+
+if orjson is not None:
+    BACKEND = "orjson"
+elif HAVE_MSGSPEC:
+    BACKEND = "msgspec"
+else:
+    BACKEND = "json"
+
+
+# Schemas of the saved records
+
+class CourseData(TypedDict):
+    name: str
+    units: Union[int, float]              # older files may hold 3.0
+    grade: Union[int, float, str, None]   # a number, or "INC"
+
+
+class PeriodData(TypedDict):
+    year_level: int
+    semester: int
+    courses: list[CourseData]
+
+
+class StudentData(TypedDict):
+    name: str
+    id: int
+    periods: list[PeriodData]
+
+
+STUDENT = StudentData
+STUDENTS = dict[str, StudentData]   # students_data.json
+CONTACTS = dict[str, str]           # contacts.json: name -> phone
+
+
+_decoders = {}
+
+
+def _msgspec():
+    global msgspec
+    if msgspec is None:
+        import msgspec
+    return msgspec
+
+
+def _decoder(schema):
+    # Building a decoder compiles the schema; do it once per schema
+    if schema not in _decoders:
+        _decoders[schema] = _msgspec().json.Decoder(schema)
+    return _decoders[schema]
+
+
+def loads(content, schema=None):
+    # Parse JSON bytes or text; raises ValueError on bad JSON
+    if schema is not None and HAVE_MSGSPEC:
+        try:
+            return _decoder(schema).decode(content)
+        except _msgspec().ValidationError:
+            pass   # valid JSON that does not fit the schema: parse it as plain JSON
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def dumps(obj, pretty=False):
+    # Encode to JSON bytes
+    if pretty:
+        return json.dumps(obj, indent=4).encode()
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    if HAVE_MSGSPEC:
+        return _msgspec().json.encode(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
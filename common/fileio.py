@@ -0,0 +1,90 @@
+import hashlib
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locks on this platform (e.g. Windows); writes are still atomic
+    fcntl = None
+
+
+class FileLock:
+    """Exclusive advisory lock on a side file, held for a `with` block.
+
+    Every process writing the same data files takes the same lock. Keep the
+    block short (a check and an append or a rename); encode and write large
+    files before taking it. Threads sharing one FileLock take turns too.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.file = None
+        self.thread_lock = threading.Lock()
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        try:
+            self.file = open(self.filename, "a")
+            if fcntl is not None:
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        except BaseException:
+            self.__exit__()
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        # Closing the file releases the lock
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.thread_lock.release()
+
+
+def write_temp(filename, content):
+    # Write bytes to a new, fsynced temp file beside filename and return its name.
+    # Each call gets its own name, so processes never write into each other's temp files.
+    import tempfile   # only needed for saving, so not at startup
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, temp_name = tempfile.mkstemp(dir=directory, prefix=os.path.basename(filename) + ".", suffix=".tmp")
+    try:
+        mode = os.stat(filename).st_mode & 0o777
+    except OSError:
+        mode = 0o644
+    try:
+        os.chmod(temp_name, mode)
+        with os.fdopen(fd, "wb") as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+    except BaseException:
+        # Never leave a half-written temp file behind (e.g. when the disk is full)
+        os.remove(temp_name)
+        raise
+    return temp_name
+
+
+def write_file_atomic(filename, content):
+    # Readers see either the old file or the new one, never a partial write
+    os.replace(write_temp(filename, content), filename)
+
+
+def new_digest(content=b""):
+    # The hash behind snapshot_digest(), for content read or written in pieces
+    return hashlib.blake2b(content, digest_size=16)
+
+
+def snapshot_digest(content):
+    # Identify a snapshot by its content, so a journal is only replayed onto
+    # the snapshot it follows and a cache only reused for the data it was made from
+    return new_digest(content).hexdigest()
+
+
+def file_version(file):
+    # (size, mtime_ns, inode) of a path or an open file, or None if it is missing.
+    # Atomic replacement always gives a new inode, so any rewrite changes it.
+    try:
+        stat = os.fstat(file.fileno()) if hasattr(file, "fileno") else os.stat(file)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns, stat.st_ino
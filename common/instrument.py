@@ -0,0 +1,148 @@
+import atexit
+import functools
+import os
+import sys
+import time
+
+# Opt-in timers, counters and latency histograms for the apps' hot paths.
+#
+# Turn it on with PROFILE=1 in the environment or --profile on the command
+# line; a report goes to stderr when the program exits. PROFILE_DUMP=FILE or
+# --profile-dump FILE also runs cProfile over the whole program and saves the
+# stats to FILE (view them with `python -m pstats FILE`).
+#
+# The switch is read once, when this module is first imported, so that with
+# profiling off `timed` hands back the undecorated function and costs nothing.
+# Call sites doing extra work to count things check ENABLED first.
+
+
+def _argument(name):
+    # Value following a flag (or given as --flag=value), or None
+    for position, arg in enumerate(sys.argv):
+        if arg == name and position + 1 < len(sys.argv):
+            return sys.argv[position + 1]
+        if arg.startswith(name + "="):
+            return arg.split("=", 1)[1]
+    return None
+
+
+DUMP_FILE = os.environ.get("PROFILE_DUMP") or _argument("--profile-dump")
+ENABLED = bool(os.environ.get("PROFILE")) or "--profile" in sys.argv or DUMP_FILE is not None
+
+timings = {}    # name -> Timing
+counters = {}   # name -> total
+
+
+class Timing:
+    # Call count, total and max time, and a histogram with power-of-two buckets
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets = {}   # bucket b holds calls taking less than 2**b ns
+
+    def add(self, elapsed_ns):
+        self.calls += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        bucket = elapsed_ns.bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, q):
+        # Upper bound of the bucket holding the q-th percentile call
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen * 100 >= self.calls * q:
+                return min(2 ** bucket, self.max_ns)
+        return self.max_ns
+
+
+def timed(name):
+    # Decorator recording every call's latency under name (only when enabled)
+    def decorate(func):
+        if not ENABLED:
+            return func
+
+        timing = timings.setdefault(name, Timing())
+        clock = time.perf_counter_ns
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timing.add(clock() - start)
+        return wrapper
+    return decorate
+
+
+def count(name, amount=1):
+    if ENABLED:
+        counters[name] = counters.get(name, 0) + amount
+
+
+def file_size(filename):
+    try:
+        return os.path.getsize(filename)
+    except OSError:
+        return 0
+
+
+def add_arguments(parser):
+    # Document the switches; they are read from sys.argv when this module loads
+    parser.add_argument("--profile", action="store_true", help="print timings and counters on exit")
+    parser.add_argument("--profile-dump", metavar="FILE", help="also save cProfile stats to FILE")
+
+
+def format_ns(ns):
+    if ns < 1000:
+        return f"{ns}ns"
+    if ns < 1_000_000:
+        return f"{ns / 1000:.1f}us"
+    if ns < 1_000_000_000:
+        return f"{ns / 1_000_000:.1f}ms"
+    return f"{ns / 1_000_000_000:.2f}s"
+
+
+def report(stream=None):
+    stream = stream or sys.stderr
+    write = stream.write
+    write(f"\n{'='*50}\nProfile\n{'='*50}\n")
+    used = {name: timing for name, timing in timings.items() if timing.calls}
+    if used:
+        write(f"{'operation':<28}{'calls':>9}{'total':>10}{'mean':>10}{'p50':>10}{'p99':>10}{'max':>10}\n")
+        for name, timing in sorted(used.items(), key=lambda item: -item[1].total_ns):
+            write(f"{name:<28}{timing.calls:>9}{format_ns(timing.total_ns):>10}"
+                  f"{format_ns(timing.total_ns // timing.calls):>10}{format_ns(timing.percentile(50)):>10}"
+                  f"{format_ns(timing.percentile(99)):>10}{format_ns(timing.max_ns):>10}\n")
+        write("\nLatency histograms (calls taking less than each bound):\n")
+        for name, timing in used.items():
+            buckets = "  ".join(f"<{format_ns(2 ** bucket)}: {calls}" for bucket, calls in sorted(timing.buckets.items()))
+            write(f"{name}: {buckets}\n")
+    if counters:
+        write("\nCounters:\n")
+        for name, total in sorted(counters.items()):
+            write(f"{name:<36}{total:>14,}\n")
+    if not used and not counters:
+        write("Nothing recorded.\n")
+
+
+if ENABLED:
+    atexit.register(report)
+
+if DUMP_FILE:
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+
+    def dump_profile():
+        profiler.disable()
+        profiler.dump_stats(DUMP_FILE)
+        sys.stderr.write(f"cProfile stats saved to {DUMP_FILE} (view with: python -m pstats {DUMP_FILE})\n")
+
+    # Registered last, so it runs before the report and the report stays out of the profile
+    atexit.register(dump_profile)
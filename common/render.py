@@ -0,0 +1,83 @@
+import argparse
+import sys
+from itertools import islice
+
+CHUNK_SIZE = 64 * 1024
+MORE_PROMPT = "-- More (Enter to continue, q to stop) --"
+
+
+class BufferedOutput:
+    """Collects lines and writes them to the stream in large chunks.
+
+    One write per chunk instead of one print per line keeps the cost of
+    dumping long listings to a pipe or file down to a handful of syscalls.
+    """
+
+    def __init__(self, stream=None, chunk_size=CHUNK_SIZE):
+        self.stream = stream if stream is not None else sys.stdout
+        self.chunk_size = chunk_size
+        self.parts = []
+        self.size = 0
+
+    def line(self, text=""):
+        self.parts.append(text)
+        self.parts.append("\n")
+        self.size += len(text) + 1
+        if self.size >= self.chunk_size:
+            self.flush()
+
+    def lines(self, texts):
+        for text in texts:
+            self.line(text)
+
+    def flush(self):
+        if self.parts:
+            self.stream.write("".join(self.parts))
+            self.parts = []
+            self.size = 0
+        self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+
+def non_negative_int(text):
+    # argparse type for --offset and --limit, which window() can not take below 0
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or more, not {value}")
+    return value
+
+
+def window(items, offset=0, limit=None):
+    # Lazily skip `offset` items and stop after `limit` (None means no limit)
+    offset = offset or 0
+    return islice(items, offset, None if limit is None else offset + limit)
+
+
+def is_interactive(stream):
+    return stream.isatty() and sys.stdin.isatty()
+
+
+def render(lines, offset=0, limit=None, page_size=None, stream=None):
+    """Write a window of lines through a BufferedOutput.
+
+    When page_size is given and both stdin and the stream are a terminal,
+    output pauses after every page; answering q stops the listing.
+    Returns the number of lines written.
+    """
+    output = BufferedOutput(stream)
+    paging = page_size and is_interactive(output.stream)
+    count = 0
+    with output:
+        for text in window(lines, offset, limit):
+            output.line(text)
+            count += 1
+            if paging and count % page_size == 0:
+                output.flush()
+                if input(MORE_PROMPT).strip().lower() == "q":
+                    break
+    return count
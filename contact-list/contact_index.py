@@ -0,0 +1,236 @@
+import heapq
+import os
+import pickle
+from bisect import bisect_left, insort
+
+INDEX_VERSION = 4
+
+
+def trigrams(text):
+    # Overlapping 3-character slices of text
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def padded_trigrams(text):
+    # Trigrams with word-boundary padding, so even a one-letter name has some
+    return trigrams(f"  {text} ")
+
+
+def first_row(text, max_distance):
+    # Levenshtein row of the empty string against every prefix of text
+    return [min(j, max_distance + 1) for j in range(len(text) + 1)]
+
+
+def next_row(row, text, char, depth, max_distance):
+    # Row of a depth + 1 character string ending in char, from the row of
+    # its first depth characters, or None once every cell is past
+    # max_distance. Cells further than max_distance from the diagonal can
+    # not come back in range, so only the band around it is computed and
+    # everything is capped at max_distance + 1.
+    too_far = max_distance + 1
+    depth += 1
+    current = [too_far] * len(row)
+    current[0] = min(depth, too_far)
+    best = current[0]
+    for j in range(max(1, depth - max_distance), min(len(text), depth + max_distance) + 1):
+        cost = row[j - 1] if text[j - 1] == char else row[j - 1] + 1
+        if row[j] < cost:
+            cost = row[j] + 1
+        if current[j - 1] < cost:
+            cost = current[j - 1] + 1
+        if cost > too_far:
+            cost = too_far
+        current[j] = cost
+        if cost < best:
+            best = cost
+    return current if best <= max_distance else None
+
+
+class ContactIndex:
+    """In-memory search index over contact names and phone numbers.
+
+    Prefix search uses a sorted list of names (a flattened trie: every name
+    sharing a prefix sits in one contiguous run found with bisect). Substring
+    search uses an inverted index from padded trigrams to the sorted names
+    containing them, read in order until enough names match, and
+    typo-tolerant search walks the sorted names as that trie, dropping every
+    prefix already too far from the query, so no search walks the whole phone
+    book. A reverse hash index maps each normalized phone number to the names
+    that use it.
+    """
+
+    def __init__(self):
+        self.names = []        # sorted
+        self.grams = {}        # padded trigram -> sorted list of names
+        self.phones = {}       # normalized phone -> set of names
+        self.stamp = None      # stamp of the contacts this index matches
+
+    @staticmethod
+    def build(contacts):
+        index = ContactIndex()
+        index.rebuild(contacts)
+        return index
+
+    def rebuild(self, contacts):
+        # Index contacts from scratch, in place, so holders of the index see the new one
+        self.names = sorted(contacts)
+        self.grams = {}
+        self.phones = {}
+        for name in self.names:
+            # Names come in order, so every posting list stays sorted
+            for gram in padded_trigrams(name):
+                self.grams.setdefault(gram, []).append(name)
+        for name, phone in contacts.items():
+            self.phones.setdefault(phone, set()).add(name)
+
+    def add(self, name, phone):
+        self.phones.setdefault(phone, set()).add(name)
+        position = bisect_left(self.names, name)
+        if position < len(self.names) and self.names[position] == name:
+            return
+        self.names.insert(position, name)
+        for gram in padded_trigrams(name):
+            insort(self.grams.setdefault(gram, []), name)
+
+    def change_phone(self, name, old_phone, new_phone):
+        self.discard_phone(name, old_phone)
+        self.phones.setdefault(new_phone, set()).add(name)
+
+    def discard_phone(self, name, phone):
+        names = self.phones.get(phone)
+        if names is not None:
+            names.discard(name)
+            if not names:
+                del self.phones[phone]
+
+    def remove(self, name, phone):
+        self.discard_phone(name, phone)
+        position = bisect_left(self.names, name)
+        if position == len(self.names) or self.names[position] != name:
+            return
+        del self.names[position]
+        for gram in padded_trigrams(name):
+            postings = self.grams.get(gram)
+            if postings is not None:
+                del postings[bisect_left(postings, name)]
+                if not postings:
+                    del self.grams[gram]
+
+    def lookup_phone(self, phone):
+        # Names using a normalized phone number, in sorted order
+        return sorted(self.phones.get(phone, ()))
+
+    def prefix_search(self, prefix, limit=10):
+        start = bisect_left(self.names, prefix)
+        results = []
+        for name in self.names[start:start + limit]:
+            if not name.startswith(prefix):
+                break
+            results.append(name)
+        return results
+
+    def substring_search(self, text, limit=10):
+        if not text or limit < 1:
+            return []
+        if len(text) < 3:
+            # Too short for a trigram: merge the postings of trigrams containing it
+            candidates = heapq.merge(*(names for gram, names in self.grams.items() if text in gram))
+        else:
+            # A matching name has every trigram of the query, so the shortest
+            # of their posting lists holds all matches
+            candidates = min((self.grams.get(gram, []) for gram in trigrams(text)), key=len)
+        # Candidates come sorted, so the first `limit` matches are the answer
+        results = []
+        for name in candidates:
+            if text in name and (not results or results[-1] != name):
+                results.append(name)
+                if len(results) == limit:
+                    break
+        return results
+
+    def fuzzy_search(self, text, limit=10, max_distance=None):
+        # Names within a small edit distance of text, closest first. The
+        # distance is widened one edit at a time up to max_distance and the
+        # first one that matches anything wins, so the usual one-letter typo
+        # never pays for the much wider two-edit walk.
+        if max_distance is None:
+            max_distance = 1 if len(text) <= 4 else 2
+        matches = []
+        for distance in range(min(1, max_distance), max_distance + 1):
+            matches = self.names_within(text, distance)
+            if matches:
+                break
+        matches.sort()
+        return [name for _, name in matches[:limit]]
+
+    def names_within(self, text, max_distance):
+        # (distance, name) of every name within max_distance edits of text
+        names = self.names
+        matches = []
+        # Trie nodes still in range: names[start:end] share their first depth
+        # characters, and row is the edit distance of that prefix to each
+        # prefix of text
+        stack = [(0, len(names), 0, first_row(text, max_distance))]
+        while stack:
+            start, end, depth, row = stack.pop()
+            if end - start == 1:
+                # A single name left under this prefix: finish it off directly
+                name = names[start]
+                for position in range(depth, len(name)):
+                    row = next_row(row, text, name[position], position, max_distance)
+                    if row is None:
+                        break
+                else:
+                    if row[-1] <= max_distance:
+                        matches.append((row[-1], name))
+                continue
+            if len(names[start]) == depth:
+                # The prefix is itself a name (it sorts first in its run)
+                if row[-1] <= max_distance:
+                    matches.append((row[-1], names[start]))
+                start += 1
+            while start < end:
+                name = names[start]
+                char = name[depth]
+                # The run of names continuing the prefix with char
+                child_end = bisect_left(names, name[:depth] + chr(ord(char) + 1), start, end)
+                child_row = next_row(row, text, char, depth, max_distance)
+                if child_row is not None:
+                    stack.append((start, child_end, depth + 1, child_row))
+                start = child_end
+        return matches
+
+    def search(self, text, limit=10):
+        # Prefix matches first, then other substring matches, then near misses
+        results = []
+        for finder in (self.prefix_search, self.substring_search, self.fuzzy_search):
+            for name in finder(text, limit):
+                if name not in results:
+                    results.append(name)
+            if len(results) >= limit:
+                break
+        return results[:limit]
+
+    def save(self, filename, stamp):
+        # stamp: any value that changes whenever the contacts change
+        self.stamp = stamp
+        temp_name = filename + ".tmp"
+        with open(temp_name, "wb") as file:
+            pickle.dump((INDEX_VERSION, self.stamp, self.names, self.grams, self.phones), file,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_name, filename)
+
+    @staticmethod
+    def load(filename, stamp):
+        # Return the saved index if it was saved with the same stamp, else None
+        try:
+            with open(filename, "rb") as file:
+                version, saved_stamp, *data = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return None
+        if version != INDEX_VERSION or saved_stamp != stamp:
+            return None
+        index = ContactIndex()
+        index.names, index.grams, index.phones = data
+        index.stamp = stamp
+        return index
@@ -0,0 +1,305 @@
+import os
+import zlib
+from collections.abc import MutableMapping
+
+from common import cache, codec, instrument
+from common.fileio import FileLock, file_version, snapshot_digest, write_file_atomic, write_temp
+
+# Contacts kept as N shard files in one directory, each holding the names
+# that hash to it in the contacts.json layout, plus a manifest:
+#
+#   contacts/manifest.json      {"version": 1, "shards": 16, "generation": 1}
+#   contacts/shard-1-000.json   ... contacts/shard-1-015.json
+#
+# A name's shard is crc32(name) % shards, so every process and machine
+# agrees on it. A shard is only read when a name in it is needed, and saving
+# rewrites just the shards that changed. Resharding writes a new generation
+# of shard files and then replaces the manifest, so a reader sees either the
+# whole old layout or the whole new one. A shard file that does not exist
+# yet is an empty shard.
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+LOCK_NAME = "lock"
+DEFAULT_SHARDS = 16
+# Startup cache format of a shard file
+CACHE_LAYOUT = "contact shard 1"
+
+
+def shard_of(name, shards):
+    # Stable across runs, unlike hash(), which is salted per process
+    return zlib.crc32(name.encode()) % shards
+
+
+def manifest_path(directory):
+    return os.path.join(directory, MANIFEST_NAME)
+
+
+def lock_path(directory):
+    return os.path.join(directory, LOCK_NAME)
+
+
+def shard_path(directory, generation, number):
+    return os.path.join(directory, f"shard-{generation}-{number:03d}.json")
+
+
+def read_manifest(directory):
+    # The manifest dict, or None when the directory holds no sharded contacts
+    try:
+        with open(manifest_path(directory), "rb") as file:
+            manifest = codec.loads(file.read())
+    except FileNotFoundError:
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"{manifest_path(directory)}: unsupported manifest version {manifest.get('version')}")
+    return manifest
+
+
+def read_shard(filename):
+    # (contacts, version) of one shard file, from the startup cache when unchanged
+    try:
+        with open(filename, "rb") as file:
+            version = file_version(file)
+            cached = cache.load(filename, CACHE_LAYOUT, file)
+            if cached is not None:
+                return cached[0], version
+            file.seek(0)
+            content = file.read()
+    except FileNotFoundError:
+        return {}, None
+    instrument.count("contacts bytes read", len(content))
+    contacts = codec.loads(content, codec.CONTACTS) if content.strip() else {}
+    cache.save(filename, CACHE_LAYOUT, contacts, version, snapshot_digest(content))
+    return contacts, version
+
+
+def write_shards(directory, contacts, shards, pretty=False):
+    """Write contacts as a new generation of `shards` shard files and switch
+    the manifest to it, removing the previous generation's files.
+
+    Call it holding the directory's lock (lock_path) so no save lands in the
+    old files meanwhile. Returns the new manifest.
+    """
+    os.makedirs(directory, exist_ok=True)
+    old = read_manifest(directory)
+    generation = old["generation"] + 1 if old else 1
+    parts = [{} for _ in range(shards)]
+    for name, phone in contacts.items():
+        parts[shard_of(name, shards)][name] = phone
+    for number, part in enumerate(parts):
+        if part:
+            write_file_atomic(shard_path(directory, generation, number), codec.dumps(part, pretty=pretty))
+
+    manifest = {"version": MANIFEST_VERSION, "shards": shards, "generation": generation}
+    write_file_atomic(manifest_path(directory), codec.dumps(manifest, pretty=True))
+    if old:
+        for number in range(old["shards"]):
+            filename = shard_path(directory, old["generation"], number)
+            for leftover in (filename, cache.cache_name(filename)):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+    return manifest
+
+
+class ContactShards(MutableMapping):
+    """The contacts of a shard directory as one name -> phone mapping.
+
+    Shards are read the first time one of their names is looked up, set or
+    deleted; iterating (or len()) reads them all. Changes mark their shard
+    dirty and save() writes only those, each with the same optimistic
+    check-and-merge as a single contacts file: if another process saved the
+    shard since it was read, its changes to names left alone here are merged
+    in and the save is retried. All access goes through `lock`.
+    """
+
+    def __init__(self, directory, lock, pretty=False):
+        self.directory = directory
+        self.lock = lock
+        self.pretty = pretty
+        self.open_layout()
+
+    def open_layout(self):
+        # (Re)read the manifest and forget every loaded shard
+        self.manifest = read_manifest(self.directory)
+        self.manifest_version = file_version(manifest_path(self.directory))
+        self.shards = self.manifest["shards"]
+        self.loaded = {}     # shard number -> {name: phone}
+        self.disk = {}       # shard number -> {name: phone} as last read or written
+        self.dirty = set()
+        # Version of every shard file as of now or as last read or written;
+        # a change to a shard that is not loaded shows up as a new version
+        self.versions = [file_version(self.path(number)) for number in range(self.shards)]
+        # A shard was read on first use after another process changed it, so
+        # an index built before has not seen that change (see refresh)
+        self.unseen_change = False
+
+    def path(self, number):
+        return shard_path(self.directory, self.manifest["generation"], number)
+
+    def shard(self, number):
+        # The contacts of one shard, read on first use
+        with self.lock:
+            if number not in self.loaded:
+                contacts, version = read_shard(self.path(number))
+                if version != self.versions[number]:
+                    self.unseen_change = True
+                self.versions[number] = version
+                self.loaded[number] = contacts
+                self.disk[number] = dict(contacts)
+                instrument.count("contact shards loaded")
+            return self.loaded[number]
+
+    def shard_for(self, name):
+        return self.shard(shard_of(name, self.shards))
+
+    def load_all(self):
+        for number in range(self.shards):
+            self.shard(number)
+        return self
+
+    def __getitem__(self, name):
+        return self.shard_for(name)[name]
+
+    def __contains__(self, name):
+        return name in self.shard_for(name)
+
+    def __setitem__(self, name, phone):
+        number = shard_of(name, self.shards)
+        with self.lock:
+            self.shard(number)[name] = phone
+            self.dirty.add(number)
+
+    def __delitem__(self, name):
+        number = shard_of(name, self.shards)
+        with self.lock:
+            del self.shard(number)[name]
+            self.dirty.add(number)
+
+    def __iter__(self):
+        for number in range(self.shards):
+            yield from self.shard(number)
+
+    def __len__(self):
+        return sum(len(self.shard(number)) for number in range(self.shards))
+
+    def __bool__(self):
+        # Stops at the first shard with a contact instead of reading them all
+        return any(self.shard(number) for number in range(self.shards))
+
+    def stamp(self):
+        # Versions of the manifest and every shard file as of the last open,
+        # refresh or save, to tell whether a saved search index still matches
+        # the contacts. Files written since by other processes are not looked
+        # at: the index has not seen them either. None while the contacts hold
+        # something no index has seen (unsaved changes, or an unseen change).
+        with self.lock:
+            if self.dirty or self.unseen_change:
+                return None
+            return self.manifest_version, tuple(self.versions)
+
+    def refresh(self, index=None):
+        """Pick up shards saved by other processes.
+
+        Loaded shards are merged (see merge). A shard that changed but was
+        never loaded has nothing to merge, but `index` was built from its old
+        content, so the index is rebuilt, which reads every shard; so it is
+        when a shard was first read after such a change. Returns True when
+        that happened.
+        """
+        with self.lock:
+            if file_version(manifest_path(self.directory)) != self.manifest_version:
+                self.follow_reshard()
+                if index is not None:
+                    index.rebuild(self)
+                return True
+            unloaded_changed = self.unseen_change
+            for number in range(self.shards):
+                if file_version(self.path(number)) == self.versions[number]:
+                    continue
+                if number in self.loaded:
+                    self.merge(number, index)
+                else:
+                    unloaded_changed = True
+            if unloaded_changed and index is not None:
+                index.rebuild(self)
+                self.unseen_change = False
+            return unloaded_changed
+
+    def merge(self, number, index=None):
+        # Three-way merge of one shard: take the other process's changes to names we left alone
+        theirs, version = read_shard(self.path(number))
+        contacts = self.loaded[number]
+        base = self.disk[number]
+        for name in base.keys() | theirs.keys():
+            if theirs.get(name) == base.get(name):
+                continue
+            if contacts.get(name) != base.get(name):
+                print(f"Contact {name} was also changed by another user; keeping your version.")
+                continue
+            if name in theirs:
+                if index is not None:
+                    if name in contacts:
+                        index.change_phone(name, contacts[name], theirs[name])
+                    else:
+                        index.add(name, theirs[name])
+                contacts[name] = theirs[name]
+            else:
+                if index is not None:
+                    index.remove(name, contacts[name])
+                del contacts[name]
+        self.disk[number] = theirs
+        self.versions[number] = version
+
+    def follow_reshard(self):
+        # Another process resharded: move our unsaved changes onto the new layout
+        changes = {}   # name -> (phone as read, our phone or None if deleted)
+        for number in self.dirty:
+            contacts, base = self.loaded[number], self.disk[number]
+            for name in base.keys() | contacts.keys():
+                if contacts.get(name) != base.get(name):
+                    changes[name] = (base.get(name), contacts.get(name))
+        self.open_layout()
+        for name, (base_phone, phone) in changes.items():
+            if self.get(name) != base_phone:
+                print(f"Contact {name} was also changed by another user; keeping your version.")
+            if phone is not None:
+                self[name] = phone
+            elif name in self:
+                del self[name]
+
+    def save(self, index=None):
+        """Write every dirty shard.
+
+        Optimistic save, per shard: write a temp file without the lock, then
+        swap it in only if nobody saved the shard (or resharded) since we
+        last read it; otherwise merge and retry. The lock is held just for
+        the version check and the rename.
+        """
+        while True:
+            with self.lock:
+                if not self.dirty:
+                    return
+                number = min(self.dirty)
+                content = codec.dumps(self.loaded[number], pretty=self.pretty)
+                saved = dict(self.loaded[number])
+                filename = self.path(number)
+            temp_name = write_temp(filename, content)
+            instrument.count("contacts bytes written", len(content))
+            with self.lock, FileLock(lock_path(self.directory)):
+                resharded = file_version(manifest_path(self.directory)) != self.manifest_version
+                if not resharded and file_version(filename) == self.versions[number]:
+                    os.replace(temp_name, filename)
+                    self.versions[number] = file_version(filename)
+                    self.disk[number] = saved
+                    # Changes made while the file was written keep the shard dirty
+                    if self.loaded[number] == saved:
+                        self.dirty.discard(number)
+                    continue
+            os.remove(temp_name)
+            with self.lock:
+                if resharded:
+                    self.follow_reshard()
+                    if index is not None:
+                        index.rebuild(self)
+                else:
+                    self.merge(number, index)
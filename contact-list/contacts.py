@@ -1,4 +1,35 @@
-import json
+import argparse
+import os
+import sys
+import threading
+
+from contact_index import ContactIndex
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Contacts live in SHARD_DIR (see contact_shards.py); an older single
+# contacts.json is moved there on first start and kept as a backup
+CONTACTS_FILE = os.path.join(BASE_DIR, "contacts.json")
+SHARD_DIR = os.path.join(BASE_DIR, "contacts")
+INDEX_FILE = os.path.join(BASE_DIR, "contacts.index")
+
+# The repository root holds the helpers shared by all projects
+sys.path.append(os.path.dirname(BASE_DIR))
+from common import autosave, cache, codec, instrument
+from common.batch import FORMATS, field, import_file
+from common.fileio import FileLock
+from common.render import non_negative_int, render
+
+from contact_shards import DEFAULT_SHARDS, ContactShards, lock_path, read_manifest, write_shards
+
+PAGE_SIZE = 25
+# Country calling codes stripped from "+" numbers so local and international forms match
+COUNTRY_CODES = ("63", "1")
+
+# --pretty writes the shard files indented instead of compact. In the menu,
+# saves are left to an AutoSaver thread; the contacts and the index are then
+# only read or changed while holding data_lock.
+settings = {"pretty": False, "autosave": None}
+data_lock = threading.RLock()
 
 def show_menu():
     print("Contact List System")
@@ -7,88 +38,268 @@ def show_menu():
     print("3. Search Contact")
     print("4. Edit Contact")
     print("5. Delete Contact")
-    print("6. Exit")
+    print("6. Look Up Phone Number")
+    print("7. Exit")
+
+def normalize_phone(phone):
+    # Canonical form: digits only, without a leading country code or trunk zero
+    # ("+1 555-0100" and "555 0100" both become "5550100")
+    digits = "".join(char for char in phone if char.isdigit())
+    if phone.strip().startswith("+"):
+        for code in COUNTRY_CODES:
+            if digits.startswith(code):
+                digits = digits[len(code):]
+                break
+    elif digits.startswith("0"):
+        digits = digits[1:]
+    return digits
 
-def edit_contact(contacts):
+def input_phone(prompt):
+    while True:
+        phone = normalize_phone(input(prompt))
+        if phone:
+            return phone
+        print("Please enter a phone number with at least one digit.")
+
+def edit_contact(contacts, index):
     name = input("Enter contact name to edit: ").lower()
     if name in contacts:
-        new_phone = input(f"Enter new phone number for {name}: ")
-        contacts[name] = new_phone
-        save_contacts(contacts)
+        new_phone = input_phone(f"Enter new phone number for {name}: ")
+        with data_lock:
+            if name not in contacts:
+                print(f"Contact {name} was deleted by another user.\n")
+                return
+            index.change_phone(name, contacts[name], new_phone)
+            contacts[name] = new_phone
+        contacts_changed(contacts, index)
         print(f"Contact {name} updated.\n")
     else:
         print(f"Contact {name} not found.\n")
 
+def read_contacts_file(filename):
+    # Contacts of a single-file contacts.json
+    with open(filename, "rb") as file:
+        content = file.read()
+    instrument.count("contacts bytes read", len(content))
+    contacts = codec.loads(content, codec.CONTACTS) if content.strip() else {}
+    # Older files may hold numbers as typed
+    return {name: normalize_phone(phone) for name, phone in contacts.items()}
+
+def migrate_contacts():
+    # First start on this SHARD_DIR: shard contacts.json, or start with no contacts
+    contacts = read_contacts_file(CONTACTS_FILE) if os.path.exists(CONTACTS_FILE) else {}
+    write_shards(SHARD_DIR, contacts, DEFAULT_SHARDS, settings["pretty"])
+    if contacts:
+        print(f"Moved {len(contacts)} contact(s) from {CONTACTS_FILE} into {DEFAULT_SHARDS} shards "
+              f"in {SHARD_DIR}; the old file is kept as a backup.")
+
+@instrument.timed("load_contacts")
 def load_contacts():
-    try:
-        with open("contacts.json", "r") as file:
-            content = file.read().strip()
-            if not content:
-                return {}
-            return json.loads(content)
-    except FileNotFoundError:
-        return {}
-
-def save_contacts(contacts):
-    with open('contacts.json', 'w') as file:
-        json.dump(contacts, file, indent=4)
-
-def add_contact(contacts):
+    # Shards are read as their contacts are needed, so this only reads the manifest
+    os.makedirs(SHARD_DIR, exist_ok=True)
+    if read_manifest(SHARD_DIR) is None:
+        with FileLock(lock_path(SHARD_DIR)):
+            # Another copy may have migrated while we waited for the lock
+            if read_manifest(SHARD_DIR) is None:
+                migrate_contacts()
+    return ContactShards(SHARD_DIR, data_lock, settings["pretty"])
+
+def reshard_contacts(shards):
+    # Rewrite every contact into a new set of `shards` shard files
+    with FileLock(lock_path(SHARD_DIR)):
+        contacts = ContactShards(SHARD_DIR, data_lock).load_all()
+        count = len(contacts)
+        write_shards(SHARD_DIR, dict(contacts), shards, settings["pretty"])
+    print(f"Resharded {count} contact(s) into {shards} shard(s).")
+
+def refresh_contacts(contacts, index=None):
+    # Pick up contacts saved by other processes
+    contacts.refresh(index)
+
+def contacts_changed(contacts, index):
+    # Save now, or leave it to the autosave thread
+    if settings["autosave"] is None:
+        save_contacts(contacts, index)
+    else:
+        settings["autosave"].changed()
+
+@instrument.timed("save_contacts")
+def save_contacts(contacts, index=None):
+    # Rewrites only the shards holding changed contacts
+    contacts.save(index)
+
+def load_index(contacts):
+    # Reuse the saved search index unless a shard changed since it was written
+    index = ContactIndex.load(INDEX_FILE, contacts.stamp())
+    if index is None:
+        index = ContactIndex.build(contacts)
+    return index
+
+def save_index(index, contacts):
+    # Saved with the shard versions of the last refresh or save, which the
+    # index matches. If it matches no files on disk (see ContactShards.stamp)
+    # it is not saved and is rebuilt on the next start.
+    stamp = contacts.stamp()
+    if stamp is not None:
+        index.save(INDEX_FILE, stamp)
+
+def add_contact(contacts, index):
     name = input("Enter contact name: ").lower()
     if name in contacts:
         print(f"Contact {name} already exists.\n")
         return
-    phone = input("Enter contact phone number: ")
-    contacts[name] = phone
-    save_contacts(contacts)
+    phone = input_phone("Enter contact phone number: ")
+    with data_lock:
+        if name in contacts:
+            print(f"Contact {name} was just added by another user.\n")
+            return
+        contacts[name] = phone
+        index.add(name, phone)
+    contacts_changed(contacts, index)
     print(f"Contact {name} added.\n")
 
-def view_contacts(contacts):
+def import_contact_row(contacts, row):
+    # Columns: name, phone. Existing names are rejected as in add_contact.
+    name = str(field(row, "name")).lower()
+    if name in contacts:
+        raise ValueError(f"Contact {name} already exists.")
+    phone = normalize_phone(str(field(row, "phone")))
+    if not phone:
+        raise ValueError("Please enter a phone number with at least one digit.")
+    contacts[name] = phone
+
+def import_contacts(contacts, filename, fmt=None):
+    # Bulk add contacts and write contacts.json once at the end.
+    # The saved search index no longer matches and is rebuilt on the next start.
+    imported, errors = import_file(filename, lambda row: import_contact_row(contacts, row), fmt)
+    if imported:
+        save_contacts(contacts)
+    return imported, errors
+
+def contact_lines(contacts):
+    for name, phone in contacts.items():
+        yield f"{name}: {phone}"
+
+def view_contacts(contacts, offset=0, limit=None, page_size=PAGE_SIZE):
     if not contacts:
         print("No contacts available.\n")
         return
     
     print("Contacts:")
-    for name, phone in contacts.items():
-        print(f"{name}: {phone}")
+    with data_lock:
+        render(contact_lines(contacts), offset, limit, page_size)
     print("\n")
 
-def search_contact(contacts):
-    if contacts == {}:
+def search_contact(contacts, index):
+    if not contacts:
         print("No contacts available to search.\n")
         return
     name = input("Enter contact name to search: ").lower()
-    if name in contacts:
-        print(f"Name: {name}, Phone: {contacts[name]}\n")
-    else:
-        print(f"Contact {name} not found.\n")
+    with data_lock:
+        if name in contacts:
+            print(f"Name: {name}, Phone: {contacts[name]}\n")
+            return
+
+        # Fall back to prefix, substring and typo-tolerant matches
+        matches = index.search(name)
+        if not matches:
+            print(f"Contact {name} not found.\n")
+            return
+        print(f"Contact {name} not found. Similar contacts:")
+        for match in matches:
+            print(f"{match}: {contacts[match]}")
+    print()
 
-def delete_contact(contacts):
+def delete_contact(contacts, index):
     name = input("Enter contact name to delete: ").lower()
-    if name in contacts:
-        del contacts[name]
-        save_contacts(contacts)
-        print(f"Contact {name} deleted.\n")
-    else:
-        print(f"Contact {name} not found.\n")
+    with data_lock:
+        if name not in contacts:
+            print(f"Contact {name} not found.\n")
+            return
+        index.remove(name, contacts.pop(name))
+    contacts_changed(contacts, index)
+    print(f"Contact {name} deleted.\n")
+
+def lookup_phone(index, phone):
+    # Names registered under a phone number, in any common format
+    return index.lookup_phone(normalize_phone(phone))
+
+def lookup_contact(contacts, index):
+    phone = input("Enter phone number to look up: ")
+    with data_lock:
+        names = lookup_phone(index, phone)
+        if not names:
+            print(f"No contact has phone number {phone}.\n")
+            return
+        for name in names:
+            print(f"Name: {name}, Phone: {contacts[name]}")
+    print()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Contact List System")
+    parser.add_argument("--list", action="store_true", help="print the contacts and exit")
+    parser.add_argument("--offset", type=non_negative_int, default=0, help="skip this many contacts when listing")
+    parser.add_argument("--limit", type=non_negative_int, help="print at most this many contacts when listing")
+    parser.add_argument("--find", metavar="NAME", help="print one contact, reading only its shard, and exit")
+    parser.add_argument("--import", dest="import_file", metavar="FILE",
+                        help="add contacts from a CSV or JSON-lines file, save once and exit")
+    parser.add_argument("--format", choices=FORMATS, help="import file format (default: from extension)")
+    parser.add_argument("--pretty", action="store_true", help="write the contact files indented instead of compact")
+    parser.add_argument("--reshard", type=int, metavar="N", help="rewrite the contacts into N shard files and exit")
+    autosave.add_arguments(parser)
+    instrument.add_arguments(parser)
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
+    cache.settings["freeze"] = True
+    settings["pretty"] = args.pretty
     contacts = load_contacts()
+    if args.reshard is not None:
+        if args.reshard < 1:
+            print("The number of shards must be at least 1.")
+            return
+        reshard_contacts(args.reshard)
+        return
+
+    if args.find:
+        name = args.find.lower()
+        if name in contacts:
+            print(f"Name: {name}, Phone: {contacts[name]}")
+        else:
+            print(f"Contact {name} not found.")
+        return
+
+    if args.list:
+        view_contacts(contacts, args.offset, args.limit, page_size=None)
+        return
+
+    if args.import_file:
+        import_contacts(contacts, args.import_file, args.format)
+        return
+
+    index = load_index(contacts)
+    settings["autosave"] = autosave.AutoSaver(lambda: save_contacts(contacts, index),
+                                              args.autosave_delay, args.autosave_changes)
     while True:
         show_menu()
-        choice = input("Choose an option (1-5): ")
+        choice = input("Choose an option (1-7): ")
+        refresh_contacts(contacts, index)
         if choice == '1':
-            add_contact(contacts)
+            add_contact(contacts, index)
         elif choice == '2':
             view_contacts(contacts)
         elif choice == '3':
-            search_contact(contacts)
+            search_contact(contacts, index)
         elif choice == '4':
-            edit_contact(contacts)
+            edit_contact(contacts, index)
         elif choice == '5':
-            delete_contact(contacts)
+            delete_contact(contacts, index)
         elif choice == '6':
-            save_contacts(contacts)
+            lookup_contact(contacts, index)
+        elif choice == '7':
+            settings["autosave"].close()
+            save_index(index, contacts)
             print("Contacts saved. Exiting...")
             break
         else:
@@ -0,0 +1,68 @@
+from bisect import bisect_left, insort
+
+PRIORITIES = ('High', 'Medium', 'Low')
+
+
+def bucket_name(priority):
+    # Unknown priorities are listed with Medium, as before
+    return priority if priority in PRIORITIES else 'Medium'
+
+
+class TaskList:
+    """Tasks keyed by stable id, with one id-ordered bucket per priority.
+
+    Listing walks the High, Medium and Low buckets in turn, which gives the
+    same order as sorting by priority and then by creation, without sorting.
+    Buckets are kept up to date as tasks are added, removed or reprioritized.
+    """
+
+    def __init__(self, tasks=()):
+        self.by_id = {}
+        self.buckets = {priority: [] for priority in PRIORITIES}
+        for task in tasks:
+            self.add(task)
+
+    def add(self, task):
+        self.by_id[task['id']] = task
+        insort(self.buckets[bucket_name(task.get('priority'))], task['id'])
+
+    def get(self, task_id):
+        return self.by_id.get(task_id)
+
+    def remove(self, task_id):
+        task = self.by_id.pop(task_id)
+        bucket = self.buckets[bucket_name(task.get('priority'))]
+        del bucket[bisect_left(bucket, task_id)]
+        return task
+
+    def set_priority(self, task, priority):
+        old_bucket = self.buckets[bucket_name(task.get('priority'))]
+        del old_bucket[bisect_left(old_bucket, task['id'])]
+        task['priority'] = priority
+        insort(self.buckets[bucket_name(priority)], task['id'])
+
+    def page(self, offset=0, limit=None):
+        # Tasks by priority (High first), oldest first within a priority, from
+        # `offset` on. Whole buckets before the offset are skipped by their
+        # length and the rest is yielded lazily, up to `limit` tasks.
+        remaining = limit
+        for priority in PRIORITIES:
+            bucket = self.buckets[priority]
+            if offset >= len(bucket):
+                offset -= len(bucket)
+                continue
+            end = len(bucket) if remaining is None else min(len(bucket), offset + remaining)
+            for position in range(offset, end):
+                yield self.by_id[bucket[position]]
+            if remaining is not None:
+                remaining -= end - offset
+                if remaining <= 0:
+                    return
+            offset = 0
+
+    def __iter__(self):
+        # Tasks in creation order
+        return iter(self.by_id.values())
+
+    def __len__(self):
+        return len(self.by_id)
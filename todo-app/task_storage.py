@@ -0,0 +1,393 @@
+import json
+import os
+from abc import ABC, abstractmethod
+
+from common import cache, codec, instrument
+from common.fileio import FileLock, file_version, snapshot_digest, write_file_atomic, write_temp
+
+CACHE_LAYOUT = "tasks 1"
+
+
+class TaskStorage(ABC):
+    """Interface for task persistence backends used by todo.py.
+
+    Changes go through the storage, which may be shared with other processes.
+    Every change it applies, ours or another process's, is first passed to
+    `on_change(entry)` so the caller can keep its own view of the tasks in step.
+    """
+
+    on_change = None
+
+    @abstractmethod
+    def load(self):
+        """Return the stored tasks as a list of dicts, each with an 'id'."""
+
+    @abstractmethod
+    def refresh(self):
+        """Pick up changes saved by other processes."""
+
+    @abstractmethod
+    def add_tasks(self, fields_list):
+        """Store new tasks built from dicts of fields and return them with their ids."""
+
+    @abstractmethod
+    def update_task(self, task_id, changes):
+        """Apply a dict of field changes; return the task, or None if it no longer exists."""
+
+    @abstractmethod
+    def delete_task(self, task_id):
+        """Remove a task; return it, or None if it no longer exists."""
+
+    def add_task(self, fields):
+        return self.add_tasks([fields])[0]
+
+
+class JsonLinesStorage(TaskStorage):
+    """tasks.json snapshot plus an append-only JSON-lines journal of changes.
+
+    Several processes may share the files. Each one remembers how far into
+    the journal it has read (its version). A change takes the lock, applies
+    the entries other processes appended since then, checks the change still
+    makes sense (the task may be gone), and appends one line. Updates carry
+    only the changed fields, so concurrent edits to different fields of a
+    task merge instead of overwriting each other.
+
+    Once the journal holds `compact_threshold` entries it is folded into a new
+    snapshot, on the autosave thread when there is one. The snapshot is
+    encoded and written outside the lock; the lock only covers swapping the
+    files in. The journal is swapped first: its header names the new
+    snapshot, how many of its entries that snapshot already holds, and the
+    previous snapshot, so readers of either snapshot know which entries to
+    replay if a crash lands between the two renames.
+    Plain tasks.json files from older versions are read as a snapshot with
+    an empty journal and are given ids on first load.
+    """
+
+    compact_threshold = 1000
+    pretty = False   # indent the snapshot for reading by hand
+    autosave = None  # AutoSaver that fsyncs and compacts the journal in the background; None does both inline
+
+    def __init__(self, filename, journal_filename):
+        self.filename = filename
+        self.journal_filename = journal_filename
+        self.lock = FileLock(journal_filename + ".lock")
+        self.tasks = {}
+        self.last_id = 0
+        self.snapshot_digest = None
+        self.header = None      # first line of the journal we follow, as read
+        self.position = 0       # bytes of that journal already applied
+        self.folded = 0         # journal entries already contained in our snapshot
+        self.lines_read = 0     # journal entries read so far, folded ones included
+
+    @property
+    def journal_entries(self):
+        # Entries applied on top of the snapshot
+        return self.lines_read - self.folded
+
+    def load(self):
+        snapshot, current = self._read()
+        if not current or needs_ids(snapshot):
+            # A journal left over from an older snapshot, or an old tasks.json
+            # without ids. Look again under the lock, so a compaction in progress
+            # or another process migrating the same file is not mistaken for either.
+            with self.lock:
+                snapshot, current = self._read()
+                if needs_ids(snapshot):
+                    # Migrate an old tasks.json: number the tasks in file order
+                    tasks = [task for task in snapshot if isinstance(task, dict)]
+                    for task_id, task in enumerate(tasks, start=1):
+                        task['id'] = task_id
+                    self._replace(tasks)
+                elif not current:
+                    self._start_journal()
+        return list(self.tasks.values())
+
+    @instrument.timed("refresh_tasks")
+    def refresh(self):
+        self._write(lambda: [])
+
+    @instrument.timed("save_tasks")
+    def add_tasks(self, fields_list):
+        def make_entries():
+            # Ids are handed out under the lock, so they are unique across processes
+            return [{'op': 'put', 'task': {'id': self._next_id(), **fields}} for fields in fields_list]
+        return [entry['task'] for entry in self._write(make_entries)]
+
+    @instrument.timed("save_tasks")
+    def update_task(self, task_id, changes):
+        def make_entries():
+            if task_id not in self.tasks:
+                return []
+            return [{'op': 'update', 'id': task_id, 'changes': changes}]
+        return self.tasks.get(task_id) if self._write(make_entries) else None
+
+    @instrument.timed("save_tasks")
+    def delete_task(self, task_id):
+        removed = []
+
+        def make_entries():
+            if task_id not in self.tasks:
+                return []
+            removed.append(self.tasks[task_id])
+            return [{'op': 'delete', 'id': task_id}]
+        self._write(make_entries)
+        return removed[0] if removed else None
+
+    @instrument.timed("compact_tasks")
+    def compact(self, background=False):
+        # Fold the journal into a new snapshot. In the background (the autosave
+        # thread) the tasks are snapshotted as far as this process has read, and
+        # never re-applied, so on_change is only ever called from the menu's thread.
+        with self.lock:
+            if not background and not self._sync():
+                return
+            if self.header is None:
+                return
+            base_header, base_position = self.header, self.position
+            base_digest, folded = self.snapshot_digest, self.folded
+            base_lines = self.lines_read
+            in_snapshot = self.journal_entries
+            # Copies: updates change task dicts in place while the snapshot is encoded
+            tasks = [dict(task) for task in self.tasks.values()]
+
+        # The slow part, without the lock
+        content = codec.dumps(tasks, pretty=self.pretty)
+        digest = snapshot_digest(content)
+        with open(self.journal_filename, 'rb') as file:
+            if file.readline() != base_header:
+                return
+            live = file.read(base_position - len(base_header)).splitlines(keepends=True)[folded:]
+        header = (json.dumps({'snapshot': digest, 'previous': base_digest, 'folded': in_snapshot}) + "\n").encode()
+        journal = header + b"".join(live)
+        snapshot_temp = write_temp(self.filename, content)
+        journal_temp = write_temp(self.journal_filename, journal)
+        instrument.count("tasks bytes written", len(content) + len(journal))
+
+        with self.lock:
+            with open(self.journal_filename, 'rb') as file:
+                if file.readline() != base_header:
+                    # Another process compacted first
+                    os.remove(snapshot_temp)
+                    os.remove(journal_temp)
+                    return
+                file.seek(base_position)
+                tail = file.read()
+            # Entries appended while the snapshot was being written carry over
+            tail = tail[:tail.rfind(b"\n") + 1]
+            if tail:
+                with open(journal_temp, 'ab') as file:
+                    file.write(tail)
+                    file.flush()
+                    os.fsync(file.fileno())
+            os.replace(journal_temp, self.journal_filename)
+            os.replace(snapshot_temp, self.filename)
+
+            # Entries this process read since the start are now in the tail of
+            # the new journal; anything later is picked up by the next sync
+            self.snapshot_digest = digest
+            self.header = header
+            self.position = len(journal) + self.position - base_position
+            self.lines_read = in_snapshot + self.lines_read - base_lines
+            self.folded = in_snapshot
+
+    def flush(self):
+        # fsync the journal; the autosave thread's save, covering every append since the last one.
+        # A journal grown past the threshold is compacted here too, off the menu's thread.
+        try:
+            fd = os.open(self.journal_filename, os.O_WRONLY | os.O_APPEND)   # never creates it
+        except FileNotFoundError:
+            return
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        if self.journal_entries >= self.compact_threshold:
+            self.compact(background=True)
+
+    def _next_id(self):
+        self.last_id += 1
+        return self.last_id
+
+    def _write(self, make_entries):
+        # Catch up with other processes, then build and append entries under the lock
+        while True:
+            with self.lock:
+                if self._sync():
+                    entries = make_entries()
+                    file = self._append(entries) if entries else None
+                    break
+            # Another process compacted the journal: start again from the new files
+            self._reload()
+
+        if file is not None:
+            # Other processes can already read the entries; only durability is left
+            if self.autosave is None:
+                os.fsync(file.fileno())
+            else:
+                self.autosave.changed(len(entries))
+            file.close()
+        if self.autosave is None and self.journal_entries >= self.compact_threshold:
+            # No background thread to leave it to
+            self.compact()
+        return entries
+
+    def _sync(self):
+        # Apply entries other processes appended. False if the journal was replaced.
+        try:
+            file = open(self.journal_filename, 'rb')
+        except FileNotFoundError:
+            return self.header is None
+        with file:
+            if file.readline() != self.header:
+                return False
+            file.seek(self.position)
+            data = file.read()
+            instrument.count("tasks bytes read", len(data))
+            self._apply_lines(data, notify=True)
+        return True
+
+    def _reload(self):
+        # Read everything again and report what changed
+        old_tasks = self.tasks
+        self.load()
+        if self.on_change is None:
+            return
+        for task_id in old_tasks:
+            if task_id not in self.tasks:
+                self.on_change({'op': 'delete', 'id': task_id})
+        for task_id, task in self.tasks.items():
+            if old_tasks.get(task_id) != task:
+                self.on_change({'op': 'put', 'task': task})
+
+    def _append(self, entries):
+        # Apply and append entries; returns the journal file, still open for fsync
+        if self.header is None:
+            self._start_journal()
+        for entry in entries:
+            self._apply(entry, notify=True)
+        data = b"".join(codec.dumps(entry) + b"\n" for entry in entries)
+
+        file = open(self.journal_filename, 'ab')
+        if file.tell() > self.position:
+            # Drop a torn line left by a process that crashed mid-append
+            file.truncate(self.position)
+        file.write(data)
+        file.flush()
+        instrument.count("tasks bytes written", len(data))
+        self.position += len(data)
+        self.lines_read += len(entries)
+        return file
+
+    def _apply(self, entry, notify):
+        if notify and self.on_change is not None:
+            self.on_change(entry)
+        if entry['op'] == 'put':
+            task = entry['task']
+            self.tasks[task['id']] = task
+            self.last_id = max(self.last_id, task['id'])
+        elif entry['op'] == 'update':
+            task = self.tasks.get(entry['id'])
+            if task is not None:
+                task.update(entry['changes'])
+        elif entry['op'] == 'delete':
+            self.tasks.pop(entry['id'], None)
+
+    def _apply_lines(self, data, notify):
+        # Apply the complete lines of data; a torn final line is left unread
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            self.lines_read += 1
+            if self.lines_read <= self.folded:
+                continue
+            try:
+                entry = codec.loads(line)
+            except ValueError:
+                continue
+            self._apply(entry, notify)
+        self.position += end
+
+    def _read(self):
+        # Load the snapshot and the journal written on top of it. Returns
+        # (snapshot, current); current is False if the journal belongs to
+        # another snapshot and was not applied.
+        self.tasks = {}
+        self.last_id = 0
+        self.header = None
+        self.position = self.folded = self.lines_read = 0
+
+        snapshot = self._read_snapshot()
+        for task in snapshot:
+            if isinstance(task, dict) and 'id' in task:
+                self.tasks[task['id']] = task
+                self.last_id = max(self.last_id, task['id'])
+
+        try:
+            file = open(self.journal_filename, 'rb')
+        except FileNotFoundError:
+            return snapshot, True
+        with file:
+            header_line = file.readline()
+            try:
+                header = json.loads(header_line)
+            except json.JSONDecodeError:
+                return snapshot, False
+            if not isinstance(header, dict):
+                return snapshot, False
+            if header.get('snapshot') == self.snapshot_digest:
+                self.folded = header.get('folded', 0)
+            elif 'previous' in header and header['previous'] == self.snapshot_digest:
+                # The compaction that wrote this journal stopped before renaming its snapshot
+                self.folded = 0
+            else:
+                return snapshot, False
+            self.header = header_line
+            self.position = len(header_line)
+            data = file.read()
+            instrument.count("tasks bytes read", len(header_line) + len(data))
+            self._apply_lines(data, notify=False)
+        return snapshot, True
+
+    def _read_snapshot(self):
+        # The parsed snapshot, from its startup cache when it has not changed
+        self.snapshot_digest = None
+        if not os.path.exists(self.filename):
+            return []
+        with open(self.filename, 'rb') as file:
+            cached = cache.load(self.filename, CACHE_LAYOUT, file)
+            if cached is not None:
+                tasks, self.snapshot_digest = cached
+                return tasks
+            stamp = file_version(file)
+            file.seek(0)
+            content = file.read()
+        instrument.count("tasks bytes read", len(content))
+        self.snapshot_digest = snapshot_digest(content)
+        try:
+            tasks = codec.loads(content)
+        except ValueError:
+            return []
+        if not isinstance(tasks, list):
+            return []
+        cache.save(self.filename, CACHE_LAYOUT, tasks, stamp, self.snapshot_digest)
+        return tasks
+
+    def _replace(self, tasks):
+        # Write tasks as the new snapshot with an empty journal (the lock is held)
+        content = codec.dumps(tasks, pretty=self.pretty)
+        write_file_atomic(self.filename, content)
+        instrument.count("tasks bytes written", len(content))
+        self.tasks = {task['id']: task for task in tasks}
+        self.last_id = max(self.tasks, default=0)
+        self.snapshot_digest = snapshot_digest(content)
+        self._start_journal()
+
+    def _start_journal(self):
+        # An empty journal for the current snapshot
+        self.header = (json.dumps({'snapshot': self.snapshot_digest}) + "\n").encode()
+        write_file_atomic(self.journal_filename, self.header)
+        self.position = len(self.header)
+        self.folded = self.lines_read = 0
+
+
+def needs_ids(snapshot):
+    return any(isinstance(task, dict) and 'id' not in task for task in snapshot)
@@ -1,35 +1,58 @@
-import json
+import argparse
 import os
+import sys
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 FILE_NAME = os.path.join(BASE_DIR, "tasks.json")
+JOURNAL_FILE = os.path.join(BASE_DIR, "tasks.jsonl")
+PAGE_SIZE = 25
 
+# The repository root holds the helpers shared by all projects
+sys.path.append(os.path.dirname(BASE_DIR))
+from common import autosave, cache, instrument
+from common.batch import FORMATS, field, import_file
+from common.render import non_negative_int, render
 
-def load_tasks():
-    if not os.path.exists(FILE_NAME):
-        return []
-    with open(FILE_NAME, 'r') as file:
-        try:
-            tasks = json.load(file)
-        except json.JSONDecodeError:
-            return []
+from task_list import PRIORITIES, TaskList
+from task_storage import JsonLinesStorage
+
+storage = JsonLinesStorage(FILE_NAME, JOURNAL_FILE)
 
-    if not isinstance(tasks, list):
-        return []
+
+@instrument.timed("load_tasks")
+def load_tasks():
+    tasks = storage.load()
+    instrument.count("tasks loaded", len(tasks))
 
     for task in tasks:
-        if not isinstance(task, dict):
-            continue
         if 'done' not in task and 'completed' in task:
             task['done'] = task['completed']
         if 'priority' not in task:
             task['priority'] = 'Medium'
+    tasks = TaskList(tasks)
+    storage.on_change = lambda entry: apply_change(tasks, entry)
     return tasks
 
 
-def save_tasks(tasks):
-    with open(FILE_NAME, 'w') as file:
-        json.dump(tasks, file, indent=4)
+def apply_change(tasks, entry):
+    # Keep the TaskList in step with every change the storage applies,
+    # including changes saved by other copies of the app
+    if entry['op'] == 'put':
+        task = entry['task']
+        if tasks.get(task['id']) is not None:
+            tasks.remove(task['id'])
+        tasks.add(task)
+    elif entry['op'] == 'update':
+        task = tasks.get(entry['id'])
+        if task is None:
+            return
+        changes = entry['changes']
+        if 'priority' in changes:
+            tasks.set_priority(task, changes['priority'])
+        task.update(changes)
+    elif entry['op'] == 'delete':
+        if tasks.get(entry['id']) is not None:
+            tasks.remove(entry['id'])
 
 
 def add_task(tasks):
@@ -56,66 +79,90 @@ def add_task(tasks):
         print("Invalid priority. Defaulting to Medium.")
         priority = "Medium"
 
-    tasks.append({'task': task, 'done': False, 'priority': priority})
-
-    save_tasks(tasks)
+    storage.add_task({'task': task, 'done': False, 'priority': priority})
     print('Task added successfully.')
 
 
-def view_tasks(tasks):
-    if not tasks:
-        print("No tasks found.")
-        return {}
-
-    priority_order = {'High': 1, 'Medium': 2, 'Low': 3}
-
-    sorted_tasks = sorted(
-        enumerate(tasks),
-        key=lambda x: priority_order.get(x[1].get('priority', 'Medium'), 2)
-    )
-
-    display_map = {}
-
-    for display_index, (original_index, task) in enumerate(sorted_tasks, start=1):
+def parse_priority(value):
+    # "High"/"Medium"/"Low" or the menu numbers 1-3; blank means Medium
+    name = str(value).strip().capitalize()
+    if name == "":
+        return "Medium"
+    if name in ("1", "2", "3"):
+        return PRIORITIES[int(name) - 1]
+    if name in PRIORITIES:
+        return name
+    raise ValueError(f"Invalid priority {value!r}. Use High, Medium, Low or 1-3.")
+
+
+def parse_done(value):
+    if isinstance(value, bool):
+        return value
+    value = str(value).strip().lower()
+    if value in ("", "0", "false", "no", "n"):
+        return False
+    if value in ("1", "true", "yes", "y", "x", "done"):
+        return True
+    raise ValueError(f"Invalid done value {value!r}. Use true or false.")
+
+
+def import_task_row(new_tasks, row):
+    # Columns: task, priority (optional), done (optional)
+    description = field(row, "task")
+    done = parse_done(row.get("done") or "")
+    priority = parse_priority(row.get("priority") or "")
+    new_tasks.append({'task': description, 'done': done, 'priority': priority})
+
+
+def import_tasks(filename, fmt=None):
+    # Validate the whole file first, then store every task in one write
+    new_tasks = []
+    imported, errors = import_file(filename, lambda row: import_task_row(new_tasks, row), fmt)
+    if new_tasks:
+        storage.add_tasks(new_tasks)
+    return imported, errors
+
+
+def task_lines(tasks, offset=0, limit=None):
+    for task in tasks.page(offset, limit):
         is_done = task.get("done", task.get("completed", False))
         status = "[x]" if is_done else "[ ]"
         priority = task.get("priority", "Medium")
-        print(f"{display_index}. {status} {task['task']} ({priority})")
-        display_map[display_index] = original_index
+        yield f"{task['id']}. {status} {task['task']} ({priority})"
+
 
-    return display_map
+def view_tasks(tasks, offset=0, limit=None, page_size=PAGE_SIZE):
+    # Tasks are listed by priority with their stable task numbers
+    if not tasks:
+        print("No tasks found.")
+        return False
+
+    render(task_lines(tasks, offset, limit), page_size=page_size)
+    return True
 
 
 def mark_task_done(tasks):
-    display_map = view_tasks(tasks)
-    if not display_map:
+    if not view_tasks(tasks):
         return
 
     try:
         choice = int(input("Enter the task number to mark as done: "))
-        if choice not in display_map:
+        if storage.update_task(choice, {"done": True, "completed": True}) is None:
             print("Invalid task number.")
             return
-
-        task = tasks[display_map[choice]]
-        task["done"] = True
-        task["completed"] = True
-        save_tasks(tasks)
         print("Task marked as completed.")
     except ValueError:
         print("Please enter a valid number.")
 
 
 def delete_task(tasks):
-    display_map = view_tasks(tasks)
-    if not display_map:
+    if not view_tasks(tasks):
         return
 
     try:
         choice = int(input("Enter the task number to delete: "))
-        if choice in display_map:
-            deleted_task = tasks.pop(display_map[choice])
-            save_tasks(tasks)
+        deleted_task = storage.delete_task(choice)
+        if deleted_task is not None:
             print(f'Task "{deleted_task["task"]}" deleted successfully.')
         else:
             print("Invalid task number.")
@@ -124,23 +171,23 @@ def delete_task(tasks):
 
 
 def edit_task(tasks):
-    display_map = view_tasks(tasks)
-
-    if not display_map:
+    if not view_tasks(tasks):
         return
 
     try:
         choice = int(input("Enter the task number to edit: "))
-        if choice not in display_map:
+        task = tasks.get(choice)
+        if task is None:
             print("Invalid task number.")
             return
 
-        task = tasks[display_map[choice]]
+        # Only the fields changed here are saved, so edits made elsewhere meanwhile are kept
+        changes = {}
         new_description = input(
             f"Enter new description (leave blank to keep '{task['task']}'): "
         ).strip()
         if new_description:
-            task['task'] = new_description
+            changes['task'] = new_description
 
         print("Select new priority (leave blank to keep current):")
         print("1. High")
@@ -149,26 +196,57 @@ def edit_task(tasks):
 
         priority_choice = input("Enter priority (1-3): ").strip()
         if priority_choice == "1":
-            task["priority"] = "High"
+            changes['priority'] = "High"
         elif priority_choice == "2":
-            task["priority"] = "Medium"
+            changes['priority'] = "Medium"
         elif priority_choice == "3":
-            task["priority"] = "Low"
+            changes['priority'] = "Low"
         elif priority_choice == "":
             pass
         else:
             print("Invalid choice. Keeping current priority.")
 
-        save_tasks(tasks)
+        if storage.update_task(choice, changes) is None:
+            print("Task was deleted by another user.")
+            return
         print("Task updated successfully.")
 
     except ValueError:
         print("Please enter a valid number.")
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Todo List Application")
+    parser.add_argument("--list", action="store_true", help="print the tasks and exit")
+    parser.add_argument("--offset", type=non_negative_int, default=0, help="skip this many tasks when listing")
+    parser.add_argument("--limit", type=non_negative_int, help="print at most this many tasks when listing")
+    parser.add_argument("--import", dest="import_file", metavar="FILE",
+                        help="add tasks from a CSV or JSON-lines file, save once and exit")
+    parser.add_argument("--format", choices=FORMATS, help="import file format (default: from extension)")
+    parser.add_argument("--pretty", action="store_true", help="write tasks.json indented instead of compact")
+    autosave.add_arguments(parser)
+    instrument.add_arguments(parser)
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
+    cache.settings["freeze"] = True
+    storage.pretty = args.pretty
     tasks = load_tasks()
 
+    if args.list:
+        view_tasks(tasks, args.offset, args.limit, page_size=None)
+        return
+
+    if args.import_file:
+        import_tasks(args.import_file, args.format)
+        return
+
+    # Each change is written to the journal at once; the fsync making it
+    # durable runs in the background, once per burst of changes
+    storage.autosave = autosave.AutoSaver(storage.flush, args.autosave_delay, args.autosave_changes)
+
     while True:
         print("\nTodo List Application")
         print("1. Add Task")
@@ -180,6 +258,8 @@ def main():
 
         choice = input("Choose an option (1-6): ")
         print("")
+        # Show and act on the latest tasks, including other users' changes
+        storage.refresh()
 
         if choice == '1':
             add_task(tasks)
@@ -192,6 +272,7 @@ def main():
         elif choice == '5':
             delete_task(tasks)
         elif choice == '6':
+            storage.autosave.close()
             print("Exiting the application.")
             break
         else: